@@ -0,0 +1,58 @@
+"""Compares `DefaultCostCalculator.estimate_cost_batch` with calling `estimate_cost` once per row.
+
+The rows are a synthetic what-if sweep: random distances, durations, traffic weights and fuel prices.
+
+Usage (from the repository root):
+
+    PYTHONPATH=src python benchmarks/bench_cost_batch.py --rows 1000000
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+
+from calculators.default_cost_calculator import DefaultCostCalculator
+
+
+def best_of(func, number: int, repeat: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    columns = (
+        rng.uniform(0, 2_000, args.rows),
+        rng.integers(1, 24 * 60, args.rows).astype(np.float64),
+        rng.choice([1.0, 1.2, 1.5], args.rows),
+        rng.uniform(4.5, 8.0, args.rows).round(2),
+    )
+    calculator = DefaultCostCalculator()
+    rows = list(zip(*(column.tolist() for column in columns)))
+
+    def scalar() -> list[float]:
+        return [calculator.estimate_cost(*row) for row in rows]
+
+    def batch() -> np.ndarray:
+        return calculator.estimate_cost_batch(*columns).total_cost
+
+    if not np.array_equal(batch(), scalar()):
+        raise SystemExit("Batch and scalar costs differ")
+
+    scalar_time = best_of(scalar, number=1, repeat=3)
+    batch_time = best_of(batch, number=5, repeat=5)
+    print(f"{args.rows:,} rows, batch and scalar totals are identical")
+    print(f"{'scalar':>8}: {scalar_time * 1e3:9.1f} ms  {args.rows / scalar_time / 1e6:8.2f} M rows/s")
+    print(
+        f"{'batch':>8}: {batch_time * 1e3:9.1f} ms  {args.rows / batch_time / 1e6:8.2f} M rows/s"
+        f" ({scalar_time / batch_time:.0f}x faster)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compares the targeted fuel price extraction of `CostParser` with the BeautifulSoup parse.
+
+The pages are synthetic copies of the Petrobras gasoline page layout (see `fixtures.petrobras_page`), one per state.
+
+Usage (from the repository root):
+
+    PYTHONPATH=src python benchmarks/bench_cost_parser.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import petrobras_page  # noqa: E402
+
+from models.cost_models import BRAZILIAN_STATES  # noqa: E402
+from parsers.cost_parsers import CostParser  # noqa: E402
+
+
+def best_of(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    parser = CostParser()
+    pages = [
+        petrobras_page(price=f"{5 + i / 10:.2f}".replace(".", ","), state=state)
+        for i, state in enumerate(BRAZILIAN_STATES)
+    ]
+    for page in pages:
+        assert parser.extract_price(page) == parser.parse_with_soup(page)
+
+    size = sum(map(len, pages)) / len(pages)
+    soup = best_of(lambda: [parser.parse_with_soup(page) for page in pages], number=3) / len(pages)
+    targeted = best_of(lambda: [parser.parse(page) for page in pages], number=50) / len(pages)
+    print(f"{len(pages)} pages, {size / 1024:.0f} KiB on average")
+    print(f"{'BeautifulSoup':>14}: {soup * 1e3:8.3f} ms/page")
+    print(f"{'targeted':>14}: {targeted * 1e3:8.3f} ms/page ({soup / targeted:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""End-to-end benchmark of `POST /travel/` against local stub upstreams.
+
+Starts `stub_upstreams.py` and the API (uvicorn `server:app`) as subprocesses, points the API's upstream URLs at the
+stubs and drives `/travel/` at increasing concurrency. For every level it reports latency percentiles, throughput,
+errors and how many upstream calls each request cost, which is what the caches and request coalescing reduce.
+
+All upstream data is synthetic (see `fixtures.py`); absolute numbers depend on the stub latency settings, so compare
+runs made with the same arguments.
+
+Usage (from the repository root):
+
+    PYTHONPATH=src python benchmarks/bench_e2e.py --concurrency 1 4 16 64 --requests 200 --distinct-places 12
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import PLACES  # noqa: E402
+from stub_upstreams import upstream_env  # noqa: E402
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCHMARKS_DIR.parent / "src"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_ready(session: aiohttp.ClientSession, url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(url) as response:
+                if response.status < 500:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+def tour_requests(distinct_places: int):
+    """Cycles over FindPlace requests between `distinct_places` fixture places, in a fixed order."""
+    names = [name for name, _, _ in PLACES]
+    queries = [f"{names[i % len(names)]} {i // len(names) or ''}".strip() for i in range(distinct_places)]
+    pairs = [(a, b) for a, b in itertools.permutations(queries, 2)] or [(queries[0], queries[0])]
+    for place_a, place_b in itertools.cycle(pairs):
+        yield {
+            "place_a": {"text_input": place_a, "inputtype": "textquery"},
+            "place_b": {"text_input": place_b, "inputtype": "textquery"},
+            "transportation_method": "CAR",
+        }
+
+
+async def run_level(
+    session: aiohttp.ClientSession, api_url: str, stub_url: str, concurrency: int, total: int, requests
+) -> dict:
+    async with session.post(f"{stub_url}/__reset"):
+        pass
+    latencies: list[float] = []
+    errors = 0
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal errors, issued
+        while issued < total:
+            issued += 1
+            body = next(requests)
+            start = time.perf_counter()
+            try:
+                async with session.post(f"{api_url}/travel/", json=body) as response:
+                    await response.read()
+                    ok = response.status == 200
+            except aiohttp.ClientError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    async with session.get(f"{stub_url}/__stats") as response:
+        stats = await response.json()
+    completed = len(latencies) + errors
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99 or [0.0] * 99
+    return {
+        "concurrency": concurrency,
+        "requests": completed,
+        "errors": errors,
+        "rps": completed / elapsed,
+        "p50": quantiles[49],
+        "p95": quantiles[94],
+        "p99": quantiles[98],
+        "upstream_per_request": {name: calls / completed for name, calls in sorted(stats["calls"].items())},
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    print(f"{'conc':>5} {'reqs':>6} {'errs':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  upstream/req")
+    for result in results:
+        upstream = ", ".join(f"{name}={calls:.2f}" for name, calls in result["upstream_per_request"].items())
+        print(
+            f"{result['concurrency']:>5} {result['requests']:>6} {result['errors']:>5} {result['rps']:>8.1f} "
+            f"{result['p50'] * 1000:>8.1f} {result['p95'] * 1000:>8.1f} {result['p99'] * 1000:>8.1f}  {upstream}"
+        )
+
+
+async def drive(args: argparse.Namespace, api_url: str, stub_url: str) -> list[dict]:
+    timeout = aiohttp.ClientTimeout(total=args.request_timeout)
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        await wait_until_ready(session, f"{stub_url}/__stats")
+        await wait_until_ready(session, f"{api_url}/docs")
+        requests = tour_requests(args.distinct_places)
+        if args.warmup:
+            await run_level(session, api_url, stub_url, 1, args.warmup, requests)
+        return [
+            await run_level(session, api_url, stub_url, concurrency, args.requests, requests)
+            for concurrency in args.concurrency
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level.")
+    parser.add_argument("--distinct-places", type=int, default=12, help="Distinct place queries to cycle through.")
+    parser.add_argument("--warmup", type=int, default=0, help="Sequential requests sent before measuring.")
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument(
+        "--stub-arg", action="append", default=[], help="Extra argument for stub_upstreams.py, e.g. --latency-ms=80."
+    )
+    args = parser.parse_args()
+
+    stub_port, api_port = free_port(), free_port()
+    stub_url, api_url = f"http://127.0.0.1:{stub_port}", f"http://127.0.0.1:{api_port}"
+    env = {**os.environ, **upstream_env(stub_url)}
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, str(BENCHMARKS_DIR / "stub_upstreams.py"), f"--port={stub_port}", *args.stub_arg]
+        ),
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "server:app",
+                f"--port={api_port}",
+                f"--workers={args.workers}",
+                "--log-level=warning",
+                "--no-access-log",
+            ],
+            cwd=SRC_DIR,
+            env=env,
+        ),
+    ]
+    try:
+        print_report(asyncio.run(drive(args, api_url, stub_url)))
+    finally:
+        for process in processes:
+            process.send_signal(signal.SIGINT)
+        for process in processes:
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compares the polyline decoding paths of `PolylineDecoder`.
+
+Usage (from the repository root):
+
+    PYTHONPATH=src python benchmarks/bench_polyline.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import GOOGLE_DOC_POLYLINE, route_polylines  # noqa: E402
+
+from models.utils_models import Coordinates, PolylineDecoder  # noqa: E402
+
+
+def legacy_decode(polyline: str) -> list[Coordinates]:
+    """The original decoder: one helper call per coordinate and one validated model per vertex."""
+    index, lat, lng = 0, 0, 0
+    coordinates = []
+    while index < len(polyline):
+        index, dlat = PolylineDecoder.decode_single_coordinate(polyline, index)
+        index, dlng = PolylineDecoder.decode_single_coordinate(polyline, index)
+        lat += dlat
+        lng += dlng
+        coordinates.append(Coordinates(latitude=lat / 1e5, longitude=lng / 1e5))
+    return coordinates
+
+
+def best_of(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    try:
+        import numpy  # noqa: F401
+
+        has_numpy = True
+    except ImportError:
+        has_numpy = False
+
+    polylines = {"google_doc": GOOGLE_DOC_POLYLINE, **route_polylines()}
+    header = f"{'route':<12}{'points':>8}{'legacy ms':>12}{'arrays ms':>12}{'speedup':>9}"
+    if has_numpy:
+        header += f"{'numpy ms':>12}{'speedup':>9}"
+    print(header)
+
+    for label, polyline in polylines.items():
+        decoder = PolylineDecoder(polyline)
+        latitudes, longitudes = decoder.decode_arrays()
+        legacy = legacy_decode(polyline)
+        assert [(c.latitude, c.longitude) for c in legacy] == list(zip(latitudes, longitudes))
+
+        number = max(1, 20_000 // max(len(latitudes), 1))
+        legacy_time = best_of(lambda: legacy_decode(polyline), number)
+        arrays_time = best_of(decoder.decode_arrays, number)
+        row = f"{label:<12}{len(latitudes):>8}{legacy_time * 1e3:>12.3f}{arrays_time * 1e3:>12.3f}"
+        row += f"{legacy_time / arrays_time:>8.1f}x"
+        if has_numpy:
+            numpy_time = best_of(decoder.decode_numpy, number)
+            row += f"{numpy_time * 1e3:>12.3f}{legacy_time / numpy_time:>8.1f}x"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Measures how much Douglas-Peucker simplification shrinks routes and the geometry work done on them.
+
+For every fixture route and tolerance it reports the vertices kept, the simplification time and the time of the
+geometry `TrafficFetcher` does per itinerary (flow point sampling and the incident corridor and tiles) on the full
+and on the simplified route.
+
+Fixture routes are synthetic (a random walk with 5-40 m steps, see `fixtures.py`); pass `--polyline` to measure
+encoded polylines taken from real Google Routes responses as well.
+
+Usage (from the repository root):
+
+    PYTHONPATH=src python benchmarks/bench_simplify.py --tolerance 5 10 25 --polyline "<encoded polyline>"
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fixtures import GOOGLE_DOC_POLYLINE, route_polylines  # noqa: E402
+
+from config import settings  # noqa: E402
+from models.utils_models import PolylineDecoder  # noqa: E402
+from utils.geometry import Corridor, sample_indices_by_distance, simplify_indices  # noqa: E402
+
+
+def best_of(func) -> float:
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def route_geometry(latitudes, longitudes) -> None:
+    sample_indices_by_distance(
+        latitudes, longitudes, settings.traffic_sample_spacing_meters, settings.traffic_max_samples
+    )
+    Corridor(latitudes, longitudes, settings.traffic_incident_corridor_meters).tiles(
+        settings.traffic_incident_tile_degrees
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tolerance", type=float, nargs="+", default=[5.0, 10.0, 25.0], help="Meters.")
+    parser.add_argument("--polyline", action="append", default=[], help="An encoded polyline to measure too.")
+    args = parser.parse_args()
+
+    polylines = {"google_doc": GOOGLE_DOC_POLYLINE, **route_polylines()}
+    polylines.update({f"polyline_{i}": polyline for i, polyline in enumerate(args.polyline)})
+    print(
+        f"{'route':<12}{'tol m':>7}{'points':>8}{'kept':>8}{'removed':>9}"
+        f"{'simplify ms':>13}{'geometry ms':>13}{'simplified':>12}"
+    )
+    for label, polyline in polylines.items():
+        latitudes, longitudes = PolylineDecoder(polyline).decode_arrays()
+        full_time = best_of(lambda: route_geometry(latitudes, longitudes))
+        for tolerance in args.tolerance:
+            indices = simplify_indices(latitudes, longitudes, tolerance)
+            kept_latitudes = [latitudes[i] for i in indices]
+            kept_longitudes = [longitudes[i] for i in indices]
+            simplify_time = best_of(lambda: simplify_indices(latitudes, longitudes, tolerance))
+            simplified_time = best_of(lambda: route_geometry(kept_latitudes, kept_longitudes))
+            removed = 1 - len(indices) / len(latitudes)
+            print(
+                f"{label:<12}{tolerance:>7g}{len(latitudes):>8}{len(indices):>8}{removed:>8.0%}"
+                f"{simplify_time * 1e3:>13.3f}{full_time * 1e3:>13.3f}{simplified_time * 1e3:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""Shared fixture data for the benchmarks.
+
+Routes are generated as road-like tracks around Goiânia: vertices a few meters to a few dozen meters apart, with
+slowly drifting headings and occasional turns, which is what Google's encoded polylines look like in practice.
+They are seeded, so every run benchmarks the same geometry.
+"""
+
+import math
+import random
+
+GOIANIA = (-16.6869, -49.2648)
+
+# Example polyline from Google's "Encoded Polyline Algorithm Format" documentation.
+GOOGLE_DOC_POLYLINE = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+
+ROUTE_SIZES = {"short": 150, "medium": 1_500, "long": 15_000, "very_long": 60_000}
+
+
+def encode_polyline(points: list[tuple[float, float]]) -> str:
+    """Encodes (latitude, longitude) pairs with Google's polyline algorithm (precision 5)."""
+    chunks: list[str] = []
+    prev_lat = prev_lng = 0
+    for latitude, longitude in points:
+        lat, lng = round(latitude * 1e5), round(longitude * 1e5)
+        for delta in (lat - prev_lat, lng - prev_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                chunks.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            chunks.append(chr(value + 63))
+        prev_lat, prev_lng = lat, lng
+    return "".join(chunks)
+
+
+def generate_route(points: int, seed: int = 0, origin: tuple[float, float] = GOIANIA) -> list[tuple[float, float]]:
+    rng = random.Random(seed)
+    latitude, longitude = origin
+    heading = rng.uniform(0, 2 * math.pi)
+    route = [(latitude, longitude)]
+    for _ in range(points - 1):
+        if rng.random() < 0.02:
+            heading += rng.choice((-1, 1)) * math.pi / 2
+        heading += rng.gauss(0, 0.05)
+        step = rng.uniform(5, 40) / 111_320
+        latitude += step * math.cos(heading)
+        longitude += step * math.sin(heading) / math.cos(math.radians(latitude))
+        route.append((latitude, longitude))
+    return route
+
+
+def route_polylines() -> dict[str, str]:
+    """Encoded fixture routes keyed by size label."""
+    return {label: encode_polyline(generate_route(size, seed=i)) for i, (label, size) in enumerate(ROUTE_SIZES.items())}
+
+
+PLACES = [
+    ("Palácio Pedro Ludovico", -16.6799, -49.2556),
+    ("Goiania Shopping", -16.7104, -49.2396),
+    ("Parque Vaca Brava", -16.7108, -49.2692),
+    ("Flamboyant Shopping", -16.7107, -49.2386),
+    ("Estádio Serra Dourada", -16.7036, -49.2330),
+    ("Mercado Central de Goiânia", -16.6812, -49.2577),
+    ("Bosque dos Buritis", -16.6839, -49.2620),
+    ("Catedral Metropolitana de Goiânia", -16.6797, -49.2571),
+    ("Parque Areião", -16.7018, -49.2585),
+    ("Centro Cultural Oscar Niemeyer", -16.6997, -49.2427),
+    ("Aeroporto de Goiânia", -16.6323, -49.2207),
+    ("Rodoviária de Goiânia", -16.6617, -49.2645),
+]
+
+
+def place_result(index: int) -> dict:
+    """A Places API result, as returned by findplacefromtext/textsearch/nearbysearch."""
+    name, latitude, longitude = PLACES[index % len(PLACES)]
+    return {
+        "place_id": f"ChIJ-bench-{index:04d}",
+        "name": name,
+        "formatted_address": f"{name}, Goiânia - GO, Brasil",
+        "geometry": {"location": {"lat": latitude, "lng": longitude}},
+        "types": ["tourist_attraction", "point_of_interest", "establishment"],
+        "user_ratings_total": 1200 + index,
+        "rating": 4.6,
+        "business_status": "OPERATIONAL",
+        "plus_code": {"compound_code": "8793+2Q Goiânia, GO, Brasil"},
+        "opening_hours": {
+            "open_now": True,
+            "periods": [
+                {"open": {"day": day, "time": "0800"}, "close": {"day": day, "time": "1800"}} for day in range(7)
+            ],
+        },
+        "photos": [{"photo_reference": f"bench-photo-{index}-{i}", "width": 4032, "height": 3024} for i in range(10)],
+    }
+
+
+def route_response(polyline: str, points: list[tuple[float, float]]) -> dict:
+    """A Routes API computeRoutes response for the given geometry."""
+    start, end = points[0], points[-1]
+    return {
+        "routes": [
+            {
+                "legs": [
+                    {
+                        "startLocation": {"latLng": {"latitude": start[0], "longitude": start[1]}},
+                        "endLocation": {"latLng": {"latitude": end[0], "longitude": end[1]}},
+                        "steps": [{"distanceMeters": 25, "staticDuration": "3s"} for _ in range(len(points) // 10)],
+                    }
+                ],
+                "distanceMeters": 21_500,
+                "duration": "1860s",
+                "polyline": {"encodedPolyline": polyline},
+                "travelAdvisory": {"fuelConsumptionMicroliters": "1450000"},
+            }
+        ]
+    }
+
+
+def flow_segment_response(latitude: float, longitude: float) -> dict:
+    """A TomTom flowSegmentData response for a short segment through the queried point."""
+    return {
+        "flowSegmentData": {
+            "frc": "FRC2",
+            "currentSpeed": 38,
+            "freeFlowSpeed": 52,
+            "currentTravelTime": 74,
+            "freeFlowTravelTime": 54,
+            "confidence": 0.97,
+            "roadClosure": False,
+            "coordinates": {
+                "coordinate": [
+                    {"latitude": latitude + i * 0.0004, "longitude": longitude + i * 0.0003} for i in range(-4, 5)
+                ]
+            },
+        }
+    }
+
+
+def incidents_response(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> dict:
+    """A TomTom incidentDetails response with a couple of incidents inside the bounding box."""
+    lon, lat = (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+    return {
+        "incidents": [
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": [[lon, lat], [lon + 0.001, lat + 0.001]]},
+                "properties": {"iconCategory": 6},
+            },
+            {
+                "type": "Feature",
+                "geometry": {"type": "LineString", "coordinates": [[lon - 0.002, lat], [lon - 0.002, lat + 0.002]]},
+                "properties": {"iconCategory": 9},
+            },
+        ]
+    }
+
+
+def petrobras_page(price: str = "6,07", state: str = "GO") -> str:
+    """A page shaped like Petrobras' gasoline price page: a large portal layout with the price near the end."""
+    head = "".join(
+        f'<link rel="stylesheet" href="/o/portal-theme/css/{i}.css?t=1723050000"/>\n'
+        f'<script src="/o/frontend-js/{i}.js?browserId=chrome&amp;t=1723050000" type="text/javascript"></script>\n'
+        for i in range(60)
+    )
+    menu = "".join(
+        f'<li class="nav-item"><a class="nav-link" href="/web/precos-dos-combustiveis/w/{i}">Item {i}</a></li>\n'
+        for i in range(120)
+    )
+    composition = "".join(
+        f'<tr><td class="label">Componente {i}</td><td class="value">R$ {i % 3},{i:02d}</td></tr>\n' for i in range(40)
+    )
+    inline_script = "<script>" + ";".join(f"window.__portal_{i}={{id:{i},ready:!0}}" for i in range(400)) + "</script>"
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"/>'
+        f"<title>Gasolina - {state} | Preços dos combustíveis</title>\n{head}</head>\n"
+        f'<body class="portal"><header><nav><ul class="navbar-nav">\n{menu}</ul></nav></header>\n'
+        f"{inline_script}\n"
+        '<main><section class="composicao"><table class="table">\n'
+        f"{composition}</table></section>\n"
+        '<section class="telafinal"><div class="telafinal-estado">'
+        f'<span id="telafinal-estado">{state}</span></div>'
+        '<div class="telafinal-preco"><span class="moeda">R$</span>'
+        f'<span id="telafinal-precofinal" class="telafinal-precofinal">{price}</span></div></section></main>\n'
+        f'<footer><ul class="footer-links">\n{menu}</ul></footer></body></html>'
+    )
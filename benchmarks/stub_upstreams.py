@@ -0,0 +1,147 @@
+"""Local stub of every upstream tripestimator talks to: Google Places and Routes, TomTom flow and incidents, and the
+Petrobras gasoline page.
+
+Responses come from `fixtures.py`. Each upstream answers after a lognormal latency (median/sigma configurable) and
+fails with a 503 at a configurable rate. Call counts per upstream are served at `GET /__stats` and can be reset
+with `POST /__reset`.
+
+Usage:
+
+    python benchmarks/stub_upstreams.py --port 8900 --latency-ms 40 --error-rate 0.01 --upstream-latency tomtom_flow=80
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import fixtures  # noqa: E402
+
+UPSTREAMS = ("google_places", "google_routes", "tomtom_flow", "tomtom_incidents", "petrobras")
+
+
+class StubUpstreams:
+    def __init__(
+        self,
+        latency_ms: dict[str, float],
+        latency_sigma: float,
+        error_rate: dict[str, float],
+        route_points: int,
+        seed: int = 0,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.rng = random.Random(seed)
+        self.route_points = fixtures.generate_route(route_points, seed=seed)
+        self.route_body = json.dumps(
+            fixtures.route_response(fixtures.encode_polyline(self.route_points), self.route_points)
+        )
+        self.petrobras_body = fixtures.petrobras_page()
+
+    async def _respond(self, upstream: str, body: str, content_type: str = "application/json") -> web.Response:
+        self.calls[upstream] += 1
+        median = self.latency_ms[upstream]
+        if median > 0:
+            await asyncio.sleep(median * math.exp(self.rng.gauss(0, self.latency_sigma)) / 1000)
+        if self.rng.random() < self.error_rate[upstream]:
+            self.errors[upstream] += 1
+            return web.Response(status=503, text="stub upstream error")
+        return web.Response(text=body, content_type=content_type)
+
+    async def places(self, request: web.Request) -> web.Response:
+        text = request.query.get("input") or request.query.get("query") or request.query.get("keyword", "")
+        index = sum(map(ord, text))
+        results_key = "candidates" if request.match_info["query_type"] == "findplacefromtext" else "results"
+        count = 1 if results_key == "candidates" else 20
+        body = json.dumps({results_key: [fixtures.place_result(index + i) for i in range(count)], "status": "OK"})
+        return await self._respond("google_places", body)
+
+    async def routes(self, request: web.Request) -> web.Response:
+        await request.read()
+        return await self._respond("google_routes", self.route_body)
+
+    async def flow(self, request: web.Request) -> web.Response:
+        latitude, longitude = map(float, request.query["point"].split(","))
+        return await self._respond("tomtom_flow", json.dumps(fixtures.flow_segment_response(latitude, longitude)))
+
+    async def incidents(self, request: web.Request) -> web.Response:
+        bbox = tuple(map(float, request.query["bbox"].split(",")))
+        return await self._respond("tomtom_incidents", json.dumps(fixtures.incidents_response(*bbox)))
+
+    async def petrobras(self, request: web.Request) -> web.Response:
+        return await self._respond("petrobras", self.petrobras_body, content_type="text/html")
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"calls": dict(self.calls), "errors": dict(self.errors)})
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.calls.clear()
+        self.errors.clear()
+        return web.json_response({})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/maps/api/place/{query_type}/json", self.places)
+        app.router.add_post("/directions/v2:computeRoutes", self.routes)
+        app.router.add_get("/traffic/services/4/flowSegmentData/absolute/10/json", self.flow)
+        app.router.add_get("/traffic/services/5/incidentDetails", self.incidents)
+        app.router.add_get("/web/precos-dos-combustiveis/w/gasolina/{state}", self.petrobras)
+        app.router.add_get("/__stats", self.stats)
+        app.router.add_post("/__reset", self.reset)
+        return app
+
+
+def upstream_env(base_url: str) -> dict[str, str]:
+    """Environment variables pointing tripestimator's settings at a stub server listening on `base_url`."""
+    return {
+        "GOOGLE_PLACES_URL": f"{base_url}/maps/api/place",
+        "GOOGLE_ROUTES_URL": f"{base_url}/directions/v2:computeRoutes",
+        "TOMTOM_URL": base_url,
+        "PETROBRAS_FUEL_URL": f"{base_url}/web/precos-dos-combustiveis/w/gasolina/",
+    }
+
+
+def parse_overrides(values: list[str], default: float) -> dict[str, float]:
+    overrides = {upstream: default for upstream in UPSTREAMS}
+    for value in values:
+        upstream, _, number = value.partition("=")
+        if upstream not in overrides:
+            raise SystemExit(f"Unknown upstream '{upstream}'. Choose from: {', '.join(UPSTREAMS)}")
+        overrides[upstream] = float(number)
+    return overrides
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Median latency of every upstream.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sigma of the lognormal latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of a 503 on every upstream.")
+    parser.add_argument("--upstream-latency", action="append", default=[], metavar="UPSTREAM=MS")
+    parser.add_argument("--upstream-error-rate", action="append", default=[], metavar="UPSTREAM=RATE")
+    parser.add_argument("--route-points", type=int, default=1_500, help="Vertices of the route polyline.")
+    args = parser.parse_args()
+
+    stubs = StubUpstreams(
+        latency_ms=parse_overrides(args.upstream_latency, args.latency_ms),
+        latency_sigma=args.latency_sigma,
+        error_rate=parse_overrides(args.upstream_error_rate, args.error_rate),
+        route_points=args.route_points,
+    )
+    web.run_app(stubs.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,32 @@
+from typing import Optional
+
 from pydantic import ValidationError
 
 from calculators.default_cost_calculator import DefaultCostCalculator
 from fetchers.cost_fetcher import CostFetcher
-from models.cost_models import CostEstimate, CostEstimationParams
+from fetchers.session_pool import SessionPool
+from models.cost_models import CostEstimate, CostEstimationParams, FuelPrice
 from parsers.cost_parsers import CostParser
 from services.cost_service import CostService
+from utils.persistent_cache import PersistentCache
 
 
 class CostBuilder:
-    def __init__(self):
+    def __init__(self, session_pool: Optional[SessionPool] = None, persistent_cache: Optional[PersistentCache] = None):
         calculator = DefaultCostCalculator()
         parser = CostParser()
-        fetcher = CostFetcher()
-        self.cost_service = CostService(calculator, parser, fetcher)
+        fetcher = CostFetcher(session_pool)
+        self.cost_service = CostService(calculator, parser, fetcher, persistent_cache=persistent_cache)
+
+    async def prefetch_fuel_prices(self) -> None:
+        await self.cost_service.prefetch_fuel_prices()
+
+    async def get_fuel_price(self, state: str) -> FuelPrice:
+        return await self.cost_service.get_fuel_price(state)
 
-    async def build(self, **kwargs) -> CostEstimate:
+    async def build(self, fuel_price: Optional[FuelPrice] = None, **kwargs) -> CostEstimate:
         try:
             params = CostEstimationParams(**kwargs)
-            return await self.cost_service.estimate_cost(params)
+            return await self.cost_service.estimate_cost(params, fuel_price=fuel_price)
         except ValidationError as e:
             raise ValueError(f"Invalid cost parameters: {str(e)}") from e
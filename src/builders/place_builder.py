@@ -1,20 +1,30 @@
+from typing import Hashable, Optional
+
 from pydantic import ValidationError
 
 from fetchers.place_fetcher import PlaceFetcher
+from fetchers.session_pool import SessionPool
 from models.place_models import BaseQueryParams, PlaceInfo
 from parsers.place_parsers import PlaceParser
 from services.place_service import PlaceService
+from utils.persistent_cache import PersistentCache
 
 
 class PlaceBuilder:
-    def __init__(self):
-        fetcher = PlaceFetcher()
+    def __init__(self, session_pool: Optional[SessionPool] = None, persistent_cache: Optional[PersistentCache] = None):
+        fetcher = PlaceFetcher(session_pool)
         parser = PlaceParser()
-        self.place_service = PlaceService(fetcher, parser)
+        self.place_service = PlaceService(fetcher, parser, persistent_cache=persistent_cache)
+
+    def query_key(self, rich_details: bool = False, **kwargs) -> Hashable:
+        try:
+            return self.place_service.query_key(BaseQueryParams(**kwargs), rich_details=rich_details)
+        except ValidationError as e:
+            raise ValueError(f"Invalid place parameters: {str(e)}") from e
 
-    async def build(self, **kwargs) -> PlaceInfo:
+    async def build(self, rich_details: bool = False, **kwargs) -> PlaceInfo:
         try:
             params = BaseQueryParams(**kwargs)
-            return await self.place_service.fetch_places(params)
+            return await self.place_service.fetch_places(params, rich_details=rich_details)
         except ValidationError as e:
             raise ValueError(f"Invalid place parameters: {str(e)}") from e
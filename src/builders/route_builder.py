@@ -1,16 +1,20 @@
+from typing import Optional
+
 from pydantic import ValidationError
 
 from fetchers.route_fetcher import RouteFetcher
+from fetchers.session_pool import SessionPool
 from models.route_models import Route, RouteQueryParams
 from parsers.route_parsers import RouteParser
 from services.route_service import RouteService
+from utils.persistent_cache import PersistentCache
 
 
 class RouteBuilder:
-    def __init__(self):
-        fetcher = RouteFetcher()
+    def __init__(self, session_pool: Optional[SessionPool] = None, persistent_cache: Optional[PersistentCache] = None):
+        fetcher = RouteFetcher(session_pool)
         parser = RouteParser()
-        self.route_service = RouteService(fetcher, parser)
+        self.route_service = RouteService(fetcher, parser, persistent_cache=persistent_cache)
 
     async def build(self, **kwargs) -> Route:
         try:
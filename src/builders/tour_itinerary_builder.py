@@ -1,55 +1,258 @@
 import asyncio
+import logging
 from datetime import datetime, timedelta
+from typing import Any, AsyncGenerator, Final, Optional
 
 from builders.cost_builder import CostBuilder
 from builders.place_builder import PlaceBuilder
 from builders.route_builder import RouteBuilder
 from builders.traffic_builder import TrafficBuilder
-from models.place_models import PlaceQuery
-from models.route_models import TransportationMode
-from models.tour_itinerary_models import TourItinerary
-from models.traffic_models import TrafficCondition
+from config import settings
+from fetchers.session_pool import SessionPool
+from models.cost_models import CostEstimate, FuelPrice
+from models.place_models import PlaceInfo, PlaceQuery
+from models.route_models import Route, TransportationMode
+from models.tour_itinerary_models import (
+    BatchTourItem,
+    BatchTourResponse,
+    TourItinerary,
+    TourRequest,
+)
+from models.traffic_models import NEUTRAL_TRAFFIC_IMPACT, TrafficCondition
+from utils.deadline import DeadlineExceededError, deadline, remaining
+from utils.errors import error_status
+from utils.metrics import STAGE_DURATION, record_server_timing
+from utils.persistent_cache import PersistentCache
+from utils.resilience import start_request_retries
+from utils.stage_graph import Stage, StageCallback, StageGraph, StageTiming
+from utils.task_memo import TaskMemo
+
+logger = logging.getLogger(__name__)
+
+STREAMED_STAGES: Final[tuple[str, ...]] = ("start_point", "end_point", "route", "traffic", "cost_estimate", "itinerary")
 
 
 class TourItineraryBuilder:
-    def __init__(self):
-        self.place_builder = PlaceBuilder()
-        self.route_builder = RouteBuilder()
-        self.traffic_builder = TrafficBuilder()
-        self.cost_builder = CostBuilder()
+    def __init__(self, session_pool: Optional[SessionPool] = None, persistent_cache: Optional[PersistentCache] = None):
+        self.session_pool = session_pool or SessionPool()
+        self.place_builder = PlaceBuilder(self.session_pool, persistent_cache)
+        self.route_builder = RouteBuilder(self.session_pool, persistent_cache)
+        self.traffic_builder = TrafficBuilder(self.session_pool)
+        self.cost_builder = CostBuilder(self.session_pool, persistent_cache)
 
     async def build(
-        self, place_a: PlaceQuery, place_b: PlaceQuery, transportation_method: TransportationMode
+        self,
+        place_a: PlaceQuery,
+        place_b: PlaceQuery,
+        transportation_method: TransportationMode,
+        on_stage_complete: Optional[StageCallback] = None,
+        memo: Optional[TaskMemo] = None,
+        rich_place_details: bool = False,
+        deadline_seconds: Optional[float] = None,
     ) -> TourItinerary:
-        start_point, end_point = await asyncio.gather(
-            self.place_builder.build(**place_a.model_dump()), self.place_builder.build(**place_b.model_dump())
-        )
+        """Builds the itinerary within `deadline_seconds` (`request_deadline_seconds` by default).
 
-        route = await self.route_builder.build(
-            origin=start_point.place_id,
-            destination=end_point.place_id,
-            mode=transportation_method,
-        )
-        traffic_condition = await self.traffic_builder.build(
-            polyline=route.polyline, transportation_method=transportation_method
-        )
-        cost_estimate = await self.cost_builder.build(
-            distance=route.distance,
-            state=self._get_state_from_route(route),
-            time_estimated=int(route.duration),
-            # TODO: #3 Fix explicit conversion
-            traffic_condition=self._calculate_traffic_impact(traffic_condition),
+        The deadline reaches every stage and upstream call; past it, whatever is still running is cancelled and
+        `DeadlineExceededError` is raised.
+        """
+        if deadline_seconds is None:
+            deadline_seconds = settings.request_deadline_seconds
+        graph = self._build_stage_graph(place_a, place_b, transportation_method, memo, rich_place_details)
+        async with deadline(deadline_seconds):
+            stage_run = await graph.run(on_complete=on_stage_complete, on_timing=self._observe_stage)
+        logger.info(f"Itinerary built in {stage_run.total * 1000:.1f}ms: {stage_run.describe_timings()}")
+        return stage_run.results["itinerary"]
+
+    async def build_stream(
+        self,
+        place_a: PlaceQuery,
+        place_b: PlaceQuery,
+        transportation_method: TransportationMode,
+        rich_place_details: bool = False,
+        deadline_seconds: Optional[float] = None,
+    ) -> AsyncGenerator[tuple[str, Any], None]:
+        """Yields `(stage, result)` pairs as soon as each streamed stage completes, ending with the itinerary.
+
+        Errors of the underlying build are raised after the stages that did complete have been yielded. Closing the
+        iterator early cancels the build.
+        """
+        queue: asyncio.Queue[Optional[tuple[str, Any]]] = asyncio.Queue()
+
+        def on_stage_complete(name: str, result: Any) -> None:
+            if name in STREAMED_STAGES:
+                queue.put_nowait((name, result))
+
+        task = asyncio.create_task(
+            self.build(
+                place_a,
+                place_b,
+                transportation_method,
+                on_stage_complete=on_stage_complete,
+                rich_place_details=rich_place_details,
+                deadline_seconds=deadline_seconds,
+            )
         )
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (event := await queue.get()) is not None:
+                yield event
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def build_batch(self, tour_requests: list[TourRequest]) -> BatchTourResponse:
+        """Builds several itineraries, resolving each distinct place query and route only once.
+
+        Items run with bounded concurrency and fail independently: an error is reported on its own item. Each item gets
+        the upstream retry allowance of a single request.
+        """
+        memo = TaskMemo()
+        semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+        async def build_item(index: int, tour_request: TourRequest) -> BatchTourItem:
+            # gather runs every item in its own task, so this allowance is the item's alone.
+            start_request_retries(settings.upstream_retries_per_request)
+            async with semaphore:
+                try:
+                    itinerary = await self.build(
+                        tour_request.place_a,
+                        tour_request.place_b,
+                        tour_request.transportation_method,
+                        memo=memo,
+                        rich_place_details=tour_request.rich_place_details,
+                        deadline_seconds=tour_request.deadline_seconds,
+                    )
+                    return BatchTourItem(index=index, itinerary=itinerary)
+                except Exception as e:
+                    logger.warning(f"Batch item {index} failed: {e}")
+                    status, retry_after = error_status(e)
+                    return BatchTourItem(
+                        index=index, error=str(e) or e.__class__.__name__, status=status, retry_after=retry_after
+                    )
+
+        try:
+            items = await asyncio.gather(*(build_item(i, request) for i, request in enumerate(tour_requests)))
+        finally:
+            await memo.aclose()
+        logger.info(f"Batch of {len(tour_requests)} itineraries built with {len(memo)} distinct lookups.")
+        return BatchTourResponse(items=list(items))
 
-        return TourItinerary(
-            start_point=start_point,
-            end_point=end_point,
-            departure_time=datetime.now(),
-            arrival_time=datetime.now() + timedelta(seconds=route.duration),
-            cost_estimate=cost_estimate,
-            transportation_method=transportation_method,
+    async def _resolve_place(self, query: PlaceQuery, memo: Optional[TaskMemo], rich_details: bool) -> PlaceInfo:
+        if memo is None:
+            return await self.place_builder.build(rich_details=rich_details, **query.model_dump())
+        key = ("place", self.place_builder.query_key(rich_details=rich_details, **query.model_dump()))
+        return await memo.run(key, lambda: self.place_builder.build(rich_details=rich_details, **query.model_dump()))
+
+    async def _resolve_route(
+        self, origin: str, destination: str, mode: TransportationMode, memo: Optional[TaskMemo]
+    ) -> Route:
+        if memo is None:
+            return await self.route_builder.build(origin=origin, destination=destination, mode=mode)
+        key = ("route", origin, destination, mode)
+        return await memo.run(key, lambda: self.route_builder.build(origin=origin, destination=destination, mode=mode))
+
+    def _build_stage_graph(
+        self,
+        place_a: PlaceQuery,
+        place_b: PlaceQuery,
+        transportation_method: TransportationMode,
+        memo: Optional[TaskMemo] = None,
+        rich_place_details: bool = False,
+    ) -> StageGraph:
+        """Describes the itinerary pipeline as stages wired by their inputs.
+
+        places ─> route ─┬─> traffic ────┬─> cost_estimate ─> itinerary
+                         └─> fuel_price ─┘
+        """
+
+        async def start_point() -> PlaceInfo:
+            return await self._resolve_place(place_a, memo, rich_place_details)
+
+        async def end_point() -> PlaceInfo:
+            return await self._resolve_place(place_b, memo, rich_place_details)
+
+        async def route(start_point: PlaceInfo, end_point: PlaceInfo) -> Route:
+            return await self._resolve_route(start_point.place_id, end_point.place_id, transportation_method, memo)
+
+        async def traffic(route: Route) -> TrafficCondition:
+            # Traffic only refines the estimate. It gets what is left of the deadline minus a reserve for the stages
+            # after it, and falls back to a neutral impact rather than fail the request when that is not enough.
+            left = remaining()
+            if left is None:
+                return await self.traffic_builder.build(
+                    polyline=route.polyline, transportation_method=transportation_method
+                )
+            if left < settings.traffic_min_budget_seconds:
+                logger.info(f"Skipping traffic with {left:.2f}s left before the deadline.")
+                return TrafficCondition(traffic_impact=NEUTRAL_TRAFFIC_IMPACT, degraded=True)
+            try:
+                async with deadline(left - settings.traffic_reserved_seconds):
+                    return await self.traffic_builder.build(
+                        polyline=route.polyline, transportation_method=transportation_method
+                    )
+            except DeadlineExceededError:
+                logger.warning("Traffic did not finish within its share of the deadline, using a neutral impact.")
+                return TrafficCondition(traffic_impact=NEUTRAL_TRAFFIC_IMPACT, degraded=True)
+
+        async def fuel_price(route: Route) -> FuelPrice:
+            return await self.cost_builder.get_fuel_price(self._get_state_from_route(route))
+
+        async def cost_estimate(route: Route, traffic: TrafficCondition, fuel_price: FuelPrice) -> CostEstimate:
+            return await self.cost_builder.build(
+                fuel_price=fuel_price,
+                distance=route.distance,
+                state=fuel_price.state,
+                time_estimated=int(route.duration),
+                # TODO: #3 Fix explicit conversion
+                traffic_condition=self._calculate_traffic_impact(traffic),
+            )
+
+        async def itinerary(
+            start_point: PlaceInfo,
+            end_point: PlaceInfo,
+            route: Route,
+            traffic: TrafficCondition,
+            fuel_price: FuelPrice,
+            cost_estimate: CostEstimate,
+        ) -> TourItinerary:
+            degraded_stages = [
+                name for name, result in (("traffic", traffic), ("fuel_price", fuel_price)) if result.degraded
+            ]
+            return TourItinerary(
+                start_point=start_point,
+                end_point=end_point,
+                departure_time=datetime.now(),
+                arrival_time=datetime.now() + timedelta(seconds=route.duration),
+                cost_estimate=cost_estimate,
+                transportation_method=transportation_method,
+                degraded=bool(degraded_stages),
+                degraded_stages=degraded_stages,
+            )
+
+        return StageGraph(
+            [
+                self._stage(start_point),
+                self._stage(end_point),
+                self._stage(route, "start_point", "end_point"),
+                self._stage(traffic, "route"),
+                self._stage(fuel_price, "route"),
+                self._stage(cost_estimate, "route", "traffic", "fuel_price"),
+                self._stage(itinerary, "start_point", "end_point", "route", "traffic", "fuel_price", "cost_estimate"),
+            ]
         )
 
+    def _stage(self, run, *depends_on: str) -> Stage:
+        name = run.__name__
+        timeout = settings.stage_timeouts_seconds.get(name, settings.stage_default_timeout_seconds)
+        return Stage(name=name, run=run, depends_on=depends_on, timeout=timeout)
+
+    @staticmethod
+    def _observe_stage(timing: StageTiming) -> None:
+        STAGE_DURATION.observe(timing.duration, stage=timing.name, status=timing.status)
+        record_server_timing(f"stage.{timing.name}", timing.duration)
+
     def _get_state_from_route(self, route) -> str:
         # TODO: #4 Implement actual logic to determine the state from the route.
         return "GO"
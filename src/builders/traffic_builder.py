@@ -1,5 +1,8 @@
+from typing import Optional
+
 from pydantic import ValidationError
 
+from fetchers.session_pool import SessionPool
 from fetchers.traffic_fetcher import TrafficFetcher
 from models.traffic_models import TrafficCondition, TrafficQueryParams
 from parsers.traffic_parser import TrafficParser
@@ -7,8 +10,8 @@ from services.traffic_service import TrafficService
 
 
 class TrafficBuilder:
-    def __init__(self):
-        fetcher = TrafficFetcher()
+    def __init__(self, session_pool: Optional[SessionPool] = None):
+        fetcher = TrafficFetcher(session_pool)
         parser = TrafficParser()
         self.traffic_service = TrafficService(parser, fetcher)
 
@@ -1,4 +1,22 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import numpy.typing as npt
+
+
+@dataclass
+class CostBatch:
+    """Costs of every row of a batch, as float64 arrays of the batch length.
+
+    `total_cost` is always set. The components it adds up are filled in by calculators that compute them separately.
+    """
+
+    total_cost: np.ndarray
+    base_cost: Optional[np.ndarray] = None
+    fuel_cost: Optional[np.ndarray] = None
+    time_cost: Optional[np.ndarray] = None
 
 
 class BaseCostCalculator(ABC):
@@ -8,6 +26,34 @@ class BaseCostCalculator(ABC):
     ) -> float:
         pass
 
+    def estimate_cost_batch(
+        self,
+        distances: npt.ArrayLike,
+        times_estimated: npt.ArrayLike,
+        traffic_weights: npt.ArrayLike,
+        fuel_prices: npt.ArrayLike,
+    ) -> CostBatch:
+        """Estimates the cost of every row of columnar inputs, e.g. for what-if sweeps over prices and distances.
+
+        Each input is a 1-D array-like (NumPy array, list, pandas column...) or a scalar shared by every row. This
+        default calls `estimate_cost` row by row; calculators override it with a vectorized version that returns the
+        same values.
+        """
+        columns = self._batch_columns(distances, times_estimated, traffic_weights, fuel_prices)
+        rows = zip(*(column.tolist() for column in columns))
+        total_cost = np.fromiter((self.estimate_cost(*row) for row in rows), dtype=np.float64, count=len(columns[0]))
+        return CostBatch(total_cost=total_cost)
+
+    @staticmethod
+    def _batch_columns(*columns: npt.ArrayLike) -> list[np.ndarray]:
+        arrays = [np.asarray(column, dtype=np.float64) for column in columns]
+        if any(array.ndim > 1 for array in arrays):
+            raise ValueError("Batch inputs must be one-dimensional")
+        try:
+            return [np.atleast_1d(array) for array in np.broadcast_arrays(*arrays)]
+        except ValueError as e:
+            raise ValueError(f"Batch inputs must have the same length: {e}") from e
+
     @property
     @abstractmethod
     def BASE_COST(self):
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -8,5 +9,129 @@ dotenv = os.path.join(os.path.dirname(__file__), ".env")
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=dotenv, env_file_encoding="utf-8", extra="allow")
 
+    # Production launcher (`python src/server.py`). The number of workers defaults to the number of CPUs.
+    server_host: str = "0.0.0.0"
+    server_port: int = 50051
+    server_workers: Optional[int] = None
+    server_graceful_shutdown_seconds: int = 30
+    # Opens a connection to every upstream host before a worker takes traffic.
+    warmup_connections: bool = False
+
+    # Upstream endpoints. Overridable to point the service at staging or stub servers.
+    google_places_url: str = "https://maps.googleapis.com/maps/api/place"
+    google_routes_url: str = "https://routes.googleapis.com/directions/v2:computeRoutes"
+    tomtom_url: str = "https://api.tomtom.com"
+    petrobras_fuel_url: str = "https://precos.petrobras.com.br/web/precos-dos-combustiveis/w/gasolina/"
+
+    # HTTP connection pooling (one session per upstream host).
+    http_limit_per_host: int = 20
+    http_limits_by_host: dict[str, int] = {}
+    http_keepalive_timeout: float = 30.0
+    http_dns_cache_ttl: int = 300
+
+    # Upstream retries (idempotent requests only) and hedged GETs. Each one needs a token from the upstream's budget,
+    # which every first attempt tops up by the ratio, and one of the incoming request's retries.
+    upstream_max_retries: int = 2
+    upstream_retry_backoff_seconds: float = 0.1
+    upstream_retry_max_backoff_seconds: float = 1.0
+    upstream_retry_budget_ratio: float = 0.1
+    upstream_retry_burst: float = 10.0
+    upstream_retries_per_request: int = 4
+    upstream_hedge_after_seconds: dict[str, float] = {
+        "google_places": 1.0,
+        "tomtom_flow": 0.5,
+        "tomtom_incidents": 1.0,
+    }
+
+    # Deadlines. A /travel/ request (or batch item) that does not set its own deadline gets the default one. Upstream
+    # calls get what is left of it, capped by the upstream timeout. Traffic is skipped when less than its minimum
+    # budget is left, and otherwise must be done before the last reserved seconds, kept for the cost estimate.
+    request_deadline_seconds: float = 10.0
+    request_deadline_max_seconds: float = 60.0
+    upstream_timeout_seconds: float = 5.0
+    traffic_min_budget_seconds: float = 2.0
+    traffic_reserved_seconds: float = 0.5
+
+    # Per-upstream circuit breakers: open after this many consecutive failures, then let one probe through per reset
+    # interval until the upstream answers again.
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_reset_seconds: float = 30.0
+
+    # TomTom flow sampling along the route. The route is simplified first; a tolerance of 0 keeps every vertex. Encoded
+    # polylines from this many characters up (a few thousand vertices) are decoded and simplified in a worker thread.
+    traffic_simplify_tolerance_meters: float = 10.0
+    traffic_simplify_thread_min_chars: int = 8000
+    traffic_sample_spacing_meters: float = 2000.0
+    traffic_max_samples: int = 25
+    traffic_max_concurrency: int = 5
+
+    # TomTom flow segments, reused for sampled points that fall on (or near) a segment fetched recently.
+    traffic_flow_cache_size: int = 4096
+    traffic_flow_cache_ttl_seconds: float = 60.0
+    traffic_flow_cache_tolerance_meters: float = 25.0
+
+    # TomTom incidents, fetched per tile of a fixed grid along the route and matched to the route locally.
+    traffic_incident_tile_degrees: float = 0.1
+    traffic_incident_max_tiles: int = 60
+    traffic_incident_corridor_meters: float = 200.0
+    traffic_incident_tile_cache_size: int = 2048
+    traffic_incident_tile_ttl_seconds: float = 2 * 60
+
+    # Petrobras fuel price cache.
+    fuel_price_ttl_seconds: float = 12 * 60 * 60
+    fuel_price_prefetch: bool = False
+
+    # Resolved places cache.
+    place_cache_size: int = 2048
+    place_cache_ttl_seconds: float = 24 * 60 * 60
+    place_negative_cache_ttl_seconds: float = 5 * 60
+    place_cache_location_precision: int = 4
+    place_cache_radius_step_meters: float = 100.0
+
+    # Route cache, keyed by place pair, transportation mode and departure time bucket.
+    route_cache_size: int = 4096
+    route_cache_default_bucket_seconds: float = 15 * 60
+    route_cache_default_ttl_seconds: float = 5 * 60
+    route_cache_bucket_seconds: dict[str, float] = {
+        "CAR": 15 * 60,
+        "BUS": 30 * 60,
+        "TRAIN": 30 * 60,
+        "BIKE": 24 * 60 * 60,
+        "WALK": 24 * 60 * 60,
+    }
+    route_cache_ttl_seconds: dict[str, float] = {
+        "CAR": 5 * 60,
+        "BUS": 15 * 60,
+        "TRAIN": 15 * 60,
+        "BIKE": 7 * 24 * 60 * 60,
+        "WALK": 7 * 24 * 60 * 60,
+    }
+
+    # On-disk cache (SQLite in WAL mode) behind the caches above, shared by the workers. Disabled while no path is set.
+    persistent_cache_path: Optional[str] = None
+    persistent_cache_max_entries: int = 100_000
+    persistent_cache_stale_retention_seconds: float = 24 * 60 * 60
+    persistent_cache_compaction_interval_seconds: float = 10 * 60
+
+    # Itinerary stage graph timeouts.
+    stage_default_timeout_seconds: float = 15.0
+    stage_timeouts_seconds: dict[str, float] = {
+        "start_point": 10.0,
+        "end_point": 10.0,
+        "route": 10.0,
+        "traffic": 10.0,
+        "fuel_price": 10.0,
+        "cost_estimate": 5.0,
+        "itinerary": 1.0,
+    }
+
+    # Batch itinerary endpoint.
+    batch_max_items: int = 200
+    batch_max_concurrency: int = 8
+
+    # Response compression. Bodies smaller than the minimum size are sent as they are.
+    gzip_minimum_size: int = 1000
+    gzip_compresslevel: int = 6
+
 
 settings = Settings()
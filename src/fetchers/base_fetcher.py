@@ -1,15 +1,40 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar
+from typing import Any, Awaitable, Callable, ClassVar, Generic, Optional, TypeVar
+
+import aiohttp
+
+from config import settings
+from fetchers.session_pool import SessionPool
+from utils import fast_json
+from utils.circuit_breaker import circuit_breaker
+from utils.deadline import DeadlineExceededError, expired, remaining
+from utils.metrics import (
+    UPSTREAM_DURATION,
+    UPSTREAM_ERRORS,
+    UPSTREAM_REQUESTS,
+    UPSTREAM_RETRIES,
+    record_server_timing,
+)
+from utils.resilience import backoff_delay, hedged, is_retryable, retry_budget, try_spend_retry
 
 T = TypeVar("T")
 
+logger = logging.getLogger(__name__)
+
 
 class BaseFetcher(ABC, Generic[T]):
-    def __init__(self):
+    # Label of the upstream API in metrics and Server-Timing entries.
+    UPSTREAM: ClassVar[str] = "upstream"
+
+    def __init__(self, session_pool: Optional[SessionPool] = None):
         self._source_url: str = ""
+        self.session_pool = session_pool or SessionPool()
 
     @abstractmethod
-    async def fetch(self, *args: Any, **kwargs: Any) -> str:
+    async def fetch(self, *args: Any, **kwargs: Any) -> T:
         pass
 
     @property
@@ -24,3 +49,128 @@ class BaseFetcher(ABC, Generic[T]):
     @source_url.setter
     def source_url(self, value: str):
         self._source_url = value
+
+    async def _request(
+        self, method: str, url: str, upstream: Optional[str] = None, idempotent: bool = False, **kwargs: Any
+    ) -> str:
+        """Sends a request through the pooled session of the target host and returns the body of a 200 response.
+
+        The duration and outcome are recorded under `upstream` (the fetcher's `UPSTREAM` by default). GETs, and
+        requests flagged `idempotent`, are retried on connection errors, timeouts and retryable statuses; slow GETs
+        are hedged. See `utils.resilience` for the budgets that bound both. While the upstream's circuit breaker is
+        open, the request fails fast with `CircuitOpenError`.
+
+        Every attempt is bounded by `upstream_timeout_seconds` and by what is left of the request deadline; once the
+        deadline has passed, the request fails with `DeadlineExceededError` and is neither retried nor counted
+        against the upstream.
+        """
+        return await self._send(method, url, upstream, aiohttp.ClientResponse.text, idempotent, **kwargs)
+
+    async def _request_json(
+        self, method: str, url: str, upstream: Optional[str] = None, idempotent: bool = False, **kwargs: Any
+    ) -> Any:
+        """Like `_request`, but decodes the JSON body straight from its bytes."""
+
+        async def read_json(response: aiohttp.ClientResponse) -> Any:
+            return fast_json.loads(await response.read())
+
+        return await self._send(method, url, upstream, read_json, idempotent, **kwargs)
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        upstream: Optional[str],
+        read: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        idempotent: bool,
+        **kwargs: Any,
+    ) -> Any:
+        upstream = upstream or self.UPSTREAM
+        if expired():
+            raise DeadlineExceededError()
+        breaker = circuit_breaker(upstream)
+        breaker.before_call()
+        retry_budget(upstream).record_request()
+        idempotent = idempotent or method in ("GET", "HEAD")
+        hedge_after = settings.upstream_hedge_after_seconds.get(upstream) if method == "GET" else None
+
+        def may_hedge() -> bool:
+            if not breaker.closed or not try_spend_retry(upstream):
+                return False
+            logger.info(f"Hedging slow {upstream} request after {hedge_after}s.")
+            UPSTREAM_RETRIES.inc(upstream=upstream, kind="hedge")
+            return True
+
+        retries = 0
+        while True:
+            try:
+                if hedge_after is None:
+                    result = await self._attempt(method, url, upstream, read, **kwargs)
+                else:
+                    result = await hedged(
+                        lambda: self._attempt(method, url, upstream, read, **kwargs), hedge_after, may_hedge
+                    )
+            except Exception as e:
+                if expired():
+                    raise DeadlineExceededError() from e
+                # Only failures that say the upstream is unhealthy count; a 4xx means it is up and answering.
+                if is_retryable(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if not idempotent or not is_retryable(e) or retries >= settings.upstream_max_retries:
+                    raise
+                if not breaker.closed:
+                    raise
+                delay = backoff_delay(retries + 1)
+                left = remaining()
+                if left is not None and left <= delay:
+                    raise
+                if not try_spend_retry(upstream):
+                    logger.warning(f"Not retrying {upstream} request: retry budget exhausted.")
+                    raise
+                retries += 1
+                logger.warning(
+                    f"Retrying {upstream} request in {delay:.2f}s ({retries}/{settings.upstream_max_retries})"
+                )
+                UPSTREAM_RETRIES.inc(upstream=upstream, kind="retry")
+                await asyncio.sleep(delay)
+            else:
+                breaker.record_success()
+                return result
+
+    async def _attempt(
+        self,
+        method: str,
+        url: str,
+        upstream: str,
+        read: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+        **kwargs: Any,
+    ) -> Any:
+        session = self.session_pool.get_session(url)
+        left = remaining()
+        total = settings.upstream_timeout_seconds if left is None else min(left, settings.upstream_timeout_seconds)
+        kwargs.setdefault("timeout", aiohttp.ClientTimeout(total=total))
+        status = "error"
+        started = time.perf_counter()
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                status = str(response.status)
+                if response.status == 200:
+                    logger.info(f"Successfully fetched raw data from {response.url.host}.")
+                    return await read(response)
+                logger.error(f"{self.__class__.__name__} raised for status: {response.status}")
+                raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status)
+        except aiohttp.ClientError as e:
+            logger.error(f"Request error for URL {url.split('?')[0]}: {e}")
+            raise
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_DURATION.observe(elapsed, upstream=upstream)
+            UPSTREAM_REQUESTS.inc(upstream=upstream, status=status)
+            if status not in ("200", "cancelled"):
+                UPSTREAM_ERRORS.inc(upstream=upstream)
+            record_server_timing(f"upstream.{upstream}", elapsed)
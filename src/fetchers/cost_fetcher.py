@@ -1,29 +1,23 @@
 import logging
 
-import aiohttp
-
+from config import settings
 from fetchers.base_fetcher import BaseFetcher
 
 logger = logging.getLogger(__name__)
 
 
-class CostFetcher(BaseFetcher):
+class CostFetcher(BaseFetcher[str]):
+    UPSTREAM = "petrobras"
+
     async def fetch(self, state: str) -> str:
-        endpoint = self.BASE_URL + state
+        endpoint = self.build_endpoint(state)
         self.source_url = endpoint
         logger.info(f"Fetching raw data from URL: {endpoint}")
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(endpoint) as response:
-                    if response.status == 200:
-                        logger.info("Successfully fetched raw data.")
-                        return await response.text()
-                    logger.error(f"{__name__} raised for status: {response.status}")
-                    raise
-            except aiohttp.ClientConnectionError as e:
-                logger.error(f"Request error for URL {endpoint}: {e}")
-                raise
+        return await self._request("GET", endpoint)
+
+    def build_endpoint(self, state: str) -> str:
+        return self.BASE_URL + state
 
     @property
     def BASE_URL(self):
-        return "https://precos.petrobras.com.br/web/precos-dos-combustiveis/w/gasolina/"
+        return settings.petrobras_fuel_url
@@ -2,41 +2,45 @@ import logging
 import urllib
 import urllib.parse
 
-import aiohttp
-
+from config import settings
 from fetchers.base_fetcher import BaseFetcher
 from models.utils_models import BaseQueryParams
 
 logger = logging.getLogger(__name__)
 
+# Basic Data fields, the ones a PlaceInfo is built from.
+BASIC_FIELDS = "place_id,name,formatted_address,geometry/location,plus_code,type"
+# TODO: #7 Fix 'reviews' keyword.
+RICH_FIELDS = BASIC_FIELDS + ",photos,opening_hours,business_status,rating,price_level,user_ratings_total"
+# The query types whose legacy endpoints honour `fields`. Text Search and Nearby Search ignore it and always return
+# their full result.
+FIELD_MASKED_QUERY_TYPES = frozenset({"findplacefromtext", "details"})
+
+
+class PlaceFetcher(BaseFetcher[str]):
+    UPSTREAM = "google_places"
+
+    async def fetch(self, params: BaseQueryParams, rich_details: bool = False) -> str:
+        """Queries Places for the fields `PlaceParser` reads, plus photos, ratings and hours when `rich_details`.
 
-class PlaceFetcher(BaseFetcher):
-    async def fetch(self, params: BaseQueryParams) -> str:
+        A `fields` list given in the query takes precedence. The field mask is only sent to the endpoints that honour
+        it (`FIELD_MASKED_QUERY_TYPES`).
+        """
         params_dict = params.model_dump(exclude_none=True)
         query_type = params_dict.pop("query_type")
         endpoint = self.BASE_URL.format(query_type=query_type)
+        fields = params_dict.pop("fields", None) or (RICH_FIELDS if rich_details else BASIC_FIELDS)
+        if query_type in FIELD_MASKED_QUERY_TYPES:
+            params_dict["fields"] = fields
         params_dict["key"] = params_dict.pop("api_key")
-        params_dict["input"] = params_dict.pop("text_input")
+        if "text_input" in params_dict:
+            params_dict["input"] = params_dict.pop("text_input")
         # TODO: #6 fix other type of place queries
         encoded_params = urllib.parse.urlencode(params_dict)
-        url = f"{endpoint}&{encoded_params}"
+        url = f"{endpoint}?{encoded_params}"
         self.source_url = url
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(url=url) as response:
-                    if response.status == 200:
-                        logger.info("Successfully fetched raw data.")
-                        return await response.text()
-                    logger.error(f"{__name__} raised for status: {response.status}")
-                    raise
-            except aiohttp.ClientConnectionError as e:
-                logger.error(f"Request error for URL {endpoint}: {e}")
-                raise e
+        return await self._request("GET", url)
 
     @property
     def BASE_URL(self):
-        return (
-            "https://maps.googleapis.com/maps/api/place/{query_type}/json?fields=formatted_address,name,geometry"
-            + ",opening_hours,business_status,place_id,plus_code,type,rating,photos,price_level,user_ratings_total"
-        )
-        # TODO: #7 Fix 'reviews' keyword.
+        return settings.google_places_url + "/{query_type}/json"
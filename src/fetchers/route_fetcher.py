@@ -1,37 +1,27 @@
 import logging
-from typing import Any, Dict
-
-import aiohttp
+from typing import Any
 
+from config import settings
 from fetchers.base_fetcher import BaseFetcher
 from models.route_models import RouteQueryParams, TransportationMode
 
 logger = logging.getLogger(__name__)
 
 
-class RouteFetcher(BaseFetcher):
+class RouteFetcher(BaseFetcher[str]):
+    UPSTREAM = "google_routes"
 
     async def fetch(self, params: RouteQueryParams) -> str:
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": params.api_key,  # type: ignore
-            "X-Goog-FieldMask": "routes.duration,routes.distanceMeters,routes.polyline.encodedPolyline,routes.legs,"
-            + "routes.travelAdvisory",
+            "X-Goog-FieldMask": self._field_mask(params.mode),
         }
 
         payload = self._build_payload(params)
         self.source_url = self.BASE_URL
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.post(url=self.BASE_URL, json=payload, headers=headers) as response:
-                    if response.status == 200:
-                        logger.info("Successfully fetched raw data.")
-                        return await response.text()
-                    logger.error(f"{__name__} raised for status: {response.status}")
-                    raise
-            except aiohttp.ClientConnectionError as e:
-                logger.error(f"Request error for URL {self.BASE_URL}: {e}")
-                raise e
+        # computeRoutes only reads, so it is safe to retry despite being a POST.
+        return await self._request("POST", self.BASE_URL, idempotent=True, json=payload, headers=headers)
 
     def _build_payload(self, params: RouteQueryParams) -> dict[str, Any]:
         payload = {
@@ -54,6 +44,21 @@ class RouteFetcher(BaseFetcher):
 
         return payload
 
+    def _field_mask(self, mode: TransportationMode) -> str:
+        """Only the fields `RouteParser` reads: leg endpoints instead of whole legs with all their steps."""
+        fields = [
+            "routes.duration",
+            "routes.distanceMeters",
+            "routes.polyline.encodedPolyline",
+            "routes.legs.startLocation",
+            "routes.legs.endLocation",
+        ]
+        if self._get_travel_mode(mode) == "TRANSIT":
+            fields.append("routes.travelAdvisory.transitFare")
+        if self._get_travel_mode(mode) == "DRIVE":
+            fields.append("routes.travelAdvisory.fuelConsumptionMicroliters")
+        return ",".join(fields)
+
     def _get_travel_mode(self, mode: TransportationMode) -> str:
         mode_mapping = {
             TransportationMode.CAR: "DRIVE",
@@ -66,4 +71,4 @@ class RouteFetcher(BaseFetcher):
 
     @property
     def BASE_URL(self):
-        return "https://routes.googleapis.com/directions/v2:computeRoutes"
+        return settings.google_routes_url
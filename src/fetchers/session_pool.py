@@ -0,0 +1,74 @@
+import asyncio
+import logging
+from typing import Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Google APIs only gzip their responses when the user agent also mentions gzip.
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate", "User-Agent": "tripestimator (gzip)"}
+
+
+class SessionPool:
+    """Keeps one long-lived aiohttp session per upstream host, so TCP/TLS connections are reused across requests."""
+
+    def __init__(
+        self,
+        limit_per_host: Optional[int] = None,
+        limits_by_host: Optional[dict[str, int]] = None,
+        keepalive_timeout: Optional[float] = None,
+        dns_cache_ttl: Optional[int] = None,
+    ) -> None:
+        self.limit_per_host = limit_per_host or settings.http_limit_per_host
+        self.limits_by_host = limits_by_host if limits_by_host is not None else settings.http_limits_by_host
+        self.keepalive_timeout = keepalive_timeout or settings.http_keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl or settings.http_dns_cache_ttl
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    def get_session(self, url: str) -> aiohttp.ClientSession:
+        """Returns the pooled session for the host of `url`, creating it on first use."""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            session = self._create_session(host)
+            self._sessions[host] = session
+        return session
+
+    def _create_session(self, host: str) -> aiohttp.ClientSession:
+        limit = self.limits_by_host.get(host, self.limit_per_host)
+        logger.info(f"Opening pooled session for {host} (limit={limit})")
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+            enable_cleanup_closed=True,
+        )
+        return aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS)
+
+    async def warm_up(self, urls: Iterable[str], timeout: float = 5.0) -> None:
+        """Opens a connection to the host of every URL, so the first requests skip DNS, TCP and TLS setup.
+
+        Any answer, even an error status, leaves a pooled connection behind. Hosts that cannot be reached are logged.
+        """
+
+        async def connect(url: str) -> None:
+            try:
+                session = self.get_session(url)
+                async with session.head(url, allow_redirects=False, timeout=aiohttp.ClientTimeout(total=timeout)):
+                    pass
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Could not warm up a connection to {urlsplit(url).netloc}: {e!r}")
+
+        await asyncio.gather(*(connect(url) for url in urls))
+
+    async def close(self) -> None:
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+        logger.info(f"Closed {len(sessions)} pooled session(s).")
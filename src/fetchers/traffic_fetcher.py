@@ -1,67 +1,221 @@
 import asyncio
-import json
+import functools
 import logging
-from typing import Optional
-
-import aiohttp
+from typing import Any, Optional, Sequence
 
+from config import settings
 from fetchers.base_fetcher import BaseFetcher
-from models.traffic_models import TrafficQueryParams
-from models.utils_models import Coordinates
+from fetchers.session_pool import SessionPool
+from models.traffic_models import TrafficQueryParams, TrafficResponse
+from models.utils_models import Coordinates, PolylineDecoder
+from utils.cache import TTLCache
+from utils.circuit_breaker import CircuitOpenError
+from utils.geometry import (
+    Cell,
+    Corridor,
+    geojson_positions,
+    sample_indices_by_distance,
+    simplify_indices,
+    tile_bbox,
+)
+from utils.metrics import ROUTE_POINTS
+from utils.single_flight import SingleFlight
+from utils.spatial_cache import SpatialCache
 
 logger = logging.getLogger(__name__)
 
 
-class TrafficFetcher(BaseFetcher):
+class TrafficFetcher(BaseFetcher[TrafficResponse]):
+    UPSTREAM = "tomtom_flow"
+    INCIDENTS_UPSTREAM = "tomtom_incidents"
+
+    def __init__(
+        self,
+        session_pool: Optional[SessionPool] = None,
+        sample_spacing_meters: Optional[float] = None,
+        max_samples: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        super().__init__(session_pool)
+        self.sample_spacing_meters = sample_spacing_meters or settings.traffic_sample_spacing_meters
+        self.max_samples = max_samples or settings.traffic_max_samples
+        self.max_concurrency = max_concurrency or settings.traffic_max_concurrency
+        self._in_flight: SingleFlight[str, Any] = SingleFlight("tomtom_flow")
+        self.flow_cache: SpatialCache[dict[str, Any]] = SpatialCache(
+            maxsize=settings.traffic_flow_cache_size,
+            ttl=settings.traffic_flow_cache_ttl_seconds,
+            cell_meters=settings.traffic_flow_cache_tolerance_meters,
+        )
+        self.incident_tile_cache: TTLCache[Cell, list[dict[str, Any]]] = TTLCache(
+            maxsize=settings.traffic_incident_tile_cache_size, ttl=settings.traffic_incident_tile_ttl_seconds
+        )
+        self._incidents_in_flight: SingleFlight[Cell, list[dict[str, Any]]] = SingleFlight("tomtom_incidents")
+
+    async def fetch(self, params: TrafficQueryParams) -> TrafficResponse:
+        tolerance = settings.traffic_simplify_tolerance_meters
+        if len(params.polyline) >= settings.traffic_simplify_thread_min_chars:
+            # Several milliseconds of work the first time a long route is seen; keep the event loop serving meanwhile.
+            latitudes, longitudes = await asyncio.to_thread(self._route_points, params.polyline, tolerance)
+        else:
+            latitudes, longitudes = self._route_points(params.polyline, tolerance)
+        unavailable: set[str] = set()
+        incidents, flow_segments = await asyncio.gather(
+            self._fetch_incidents(params.api_key, latitudes, longitudes, unavailable),
+            self._fetch_traffic_data(
+                self.BASE_URL.format(api_key=params.api_key),
+                self._sample_flow_points(latitudes, longitudes),
+                unavailable,
+            ),
+        )
+        return TrafficResponse(incidents=incidents, flow_segments=flow_segments, unavailable=sorted(unavailable))
+
+    async def _fetch_data(self, url: str, params: Optional[dict] = None, upstream: Optional[str] = None) -> Any:
+        return await self._request_json("GET", url, upstream=upstream, params=params)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _route_points(polyline: str, tolerance_meters: float) -> tuple[list[float], list[float]]:
+        """Decodes the route and drops the vertices within `tolerance_meters` of the simplified route.
+
+        Memoized: itineraries over a cached route send the same polyline again. The lists must not be modified.
+        """
+        latitudes, longitudes = PolylineDecoder(polyline).decode_arrays()
+        indices = simplify_indices(latitudes, longitudes, tolerance_meters)
+        ROUTE_POINTS.inc(len(latitudes), kind="decoded")
+        ROUTE_POINTS.inc(len(indices), kind="kept")
+        logger.debug(f"Simplified the route from {len(latitudes)} to {len(indices)} points.")
+        return [latitudes[i] for i in indices], [longitudes[i] for i in indices]
+
+    def _sample_flow_points(self, latitudes: Sequence[float], longitudes: Sequence[float]) -> list[Coordinates]:
+        """Selects the flow query points by distance along the route, bounded by `max_samples`.
+
+        Only the sampled points are turned into `Coordinates`, since they are the ones sent to TomTom.
+        """
+        indices = sample_indices_by_distance(latitudes, longitudes, self.sample_spacing_meters, self.max_samples)
+        logger.debug(f"Sampled {len(indices)} of {len(latitudes)} route points for flow queries.")
+        return [Coordinates(latitude=latitudes[i], longitude=longitudes[i]) for i in indices]
+
+    async def _fetch_incidents(
+        self,
+        api_key: str,
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        unavailable: Optional[set[str]] = None,
+    ) -> dict[str, Any]:
+        """Fetches the incidents of every grid tile along the route and keeps the ones in the route corridor.
+
+        Tiles belong to a fixed grid, so itineraries over the same area share cached and in-flight tiles. A failed
+        tile is logged and contributes no incidents; when an open circuit breaker failed it, the upstream is added to
+        `unavailable`. Incidents crossing a tile border are only kept once.
+        """
+        corridor = Corridor(latitudes, longitudes, settings.traffic_incident_corridor_meters)
+        tiles = self._limit_tiles(corridor.tiles(settings.traffic_incident_tile_degrees))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_tile(tile: Cell) -> list[dict[str, Any]]:
+            cached = self.incident_tile_cache.get(tile)
+            if cached is not None:
+                return cached
+            return await self._incidents_in_flight.run(tile, lambda: limited_fetch(tile))
 
-    async def fetch(self, params: TrafficQueryParams) -> str:
-        coordinates = params.get_coordinates()
-        bbox = f"{','.join(map(str, params.get_bounding_boxes_coords(coordinates)))}"
-        query_params = {
-            "key": params.api_key,
-            "bbox": bbox,
-            "fields": "{incidents{type,geometry{type,coordinates},properties{iconCategory}}}",
+        async def limited_fetch(tile: Cell) -> list[dict[str, Any]]:
+            async with semaphore:
+                data = await self._fetch_data(
+                    self.EXTRA_URL, params=self._incident_query(api_key, tile), upstream=self.INCIDENTS_UPSTREAM
+                )
+            incidents = data.get("incidents") or []
+            self.incident_tile_cache.set(tile, incidents)
+            return incidents
+
+        results = await asyncio.gather(*(fetch_tile(tile) for tile in tiles), return_exceptions=True)
+        self._report_failures("incident tiles", results, unavailable)
+
+        matched: dict[Any, dict[str, Any]] = {}
+        for result in results:
+            if isinstance(result, Exception):
+                continue
+            for incident in result:
+                key = incident.get("properties", {}).get("id") or repr(incident.get("geometry"))
+                if key not in matched and self._is_on_route(incident, corridor):
+                    matched[key] = incident
+        logger.debug(f"Matched {len(matched)} incidents to the route from {len(tiles)} tiles.")
+        return {"incidents": list(matched.values())}
+
+    @staticmethod
+    def _is_on_route(incident: dict[str, Any], corridor: Corridor) -> bool:
+        positions = geojson_positions(incident.get("geometry") or {})
+        return any(corridor.contains(latitude, longitude) for longitude, latitude in positions)
+
+    @staticmethod
+    def _limit_tiles(tiles: list[Cell]) -> list[Cell]:
+        """Keeps at most `traffic_incident_max_tiles` tiles, evenly spread along the route."""
+        limit = settings.traffic_incident_max_tiles
+        if len(tiles) <= limit:
+            return tiles
+        logger.warning(f"Route crosses {len(tiles)} incident tiles; querying {limit} of them.")
+        if limit <= 1:
+            return tiles[:limit]
+        return [tiles[round(i * (len(tiles) - 1) / (limit - 1))] for i in range(limit)]
+
+    @staticmethod
+    def _incident_query(api_key: str, tile: Cell) -> dict[str, str]:
+        return {
+            "key": api_key,
+            "bbox": ",".join(map(str, tile_bbox(tile, settings.traffic_incident_tile_degrees))),
+            "fields": "{incidents{type,geometry{type,coordinates},properties{id,iconCategory}}}",
             "language": "pt-PT",
             "t": "1111",
             "timeValidityFilter": "present",
         }
 
-        async with aiohttp.ClientSession() as session:
-            incidents_data = await self._fetch_data(session, self.EXTRA_URL, params=query_params)
-            traffic_data = await self._fetch_traffic_data(
-                session, self.BASE_URL.format(api_key=params.api_key), coordinates
-            )
-
-        return json.dumps({"incidents_data": incidents_data, "traffic_data": traffic_data})
-
-    async def _fetch_data(self, session: aiohttp.ClientSession, url: str, params: Optional[dict] = None) -> str:
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    logger.info(f"Successfully fetched data from {url}")
-                    return await response.text()
-                logger.error(f"{__name__} raised for status: {response.status}")
-                raise aiohttp.ClientResponseError(response.request_info, response.history, status=response.status)
-        except aiohttp.ClientError as e:
-            logger.error(f"Request error for URL {url}: {e}")
-            raise
-
     async def _fetch_traffic_data(
-        self, session: aiohttp.ClientSession, url: str, coordinates: list[Coordinates]
-    ) -> list:
+        self, url: str, coordinates: list[Coordinates], unavailable: Optional[set[str]] = None
+    ) -> list[Optional[dict[str, Any]]]:
+        """Fetches the flow segment of every point. A failed point is logged and left as None, and reported in
+        `unavailable` like a failed incident tile.
+
+        Points on (or near) a segment fetched recently are answered from the flow cache, and concurrent itineraries
+        over the same roads share the request of a point already in flight.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
         async def fetch_traffic(coordinates: Coordinates):
+            cached = self.flow_cache.get(coordinates.latitude, coordinates.longitude)
+            if cached is not None:
+                return cached
             endpoint = f"{url}{coordinates.latitude},{coordinates.longitude}"
-            return await self._fetch_data(session=session, url=endpoint)
+            return await self._in_flight.run(endpoint, lambda: limited_fetch(endpoint, coordinates))
+
+        async def limited_fetch(endpoint: str, coordinates: Coordinates):
+            async with semaphore:
+                data = await self._fetch_data(url=endpoint)
+            self._cache_flow_segment(coordinates, data)
+            return data
 
         tasks = [fetch_traffic(c) for c in coordinates]
         results = await asyncio.gather(*tasks, return_exceptions=True)
+        self._report_failures("flow requests", results, unavailable)
+        return [None if isinstance(result, Exception) else result for result in results]
+
+    @staticmethod
+    def _report_failures(kind: str, results: list[Any], unavailable: Optional[set[str]]) -> None:
+        failed = [result for result in results if isinstance(result, Exception)]
+        if failed:
+            logger.warning(f"{len(failed)} of {len(results)} {kind} failed, first error: {failed[0]!r}")
+        if unavailable is not None:
+            unavailable.update(error.upstream for error in failed if isinstance(error, CircuitOpenError))
 
-        return [str(result) if isinstance(result, Exception) else result for result in results]
+    def _cache_flow_segment(self, coordinates: Coordinates, data: dict[str, Any]) -> None:
+        """Indexes a flowSegmentData response along the segment geometry, or at the queried point without one."""
+        points = data.get("flowSegmentData", {}).get("coordinates", {}).get("coordinate") or [
+            {"latitude": coordinates.latitude, "longitude": coordinates.longitude}
+        ]
+        self.flow_cache.set([point["latitude"] for point in points], [point["longitude"] for point in points], data)
 
     @property
     def BASE_URL(self):
-        return "https://api.tomtom.com/traffic/services/4/flowSegmentData/absolute/10/json?key={api_key}&point="
+        return settings.tomtom_url + "/traffic/services/4/flowSegmentData/absolute/10/json?key={api_key}&point="
 
     @property
     def EXTRA_URL(self):
-        return "https://api.tomtom.com/traffic/services/5/incidentDetails"
+        return settings.tomtom_url + "/traffic/services/5/incidentDetails"
@@ -12,6 +12,11 @@ TRAFFIC_CONDITION_WEIGHT: Final[dict[str, float]] = {
     "heavy": 1.5,
 }
 
+BRAZILIAN_STATES: Final[list[str]] = [
+    "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS", "MG", "PA",
+    "PB", "PR", "PE", "PI", "RJ", "RN", "RS", "RO", "RR", "SC", "SP", "SE", "TO",
+]  # fmt: skip
+
 
 class CostEstimationParams(BaseQueryParams):
     state: Annotated[
@@ -25,6 +30,17 @@ class CostEstimationParams(BaseQueryParams):
     ]
 
 
+class FuelPrice(BaseModel):
+    """Gasoline price collected for a state, along with the page it was scraped from."""
+
+    state: Annotated[str, Field(..., description="The state the price refers to.", examples=["GO", "RS", "SP"])]
+    price: Annotated[float, Field(..., gt=0, description="Price of fuel")]
+    source_url: Annotated[str, Field(default="", description="Endpoint source for the price.")]
+    degraded: Annotated[
+        bool, Field(default=False, description="Last known price, served while Petrobras is unavailable.")
+    ]
+
+
 class CostComponents(BaseModel):
     """The various components for calculating the total cost estimate for a car travel."""
 
@@ -3,7 +3,7 @@ from enum import Enum
 from typing import Annotated, Optional, Union
 
 import pendulum
-from pydantic import BaseModel, Field, ValidationInfo, field_serializer, field_validator
+from pydantic import BaseModel, Field, SerializationInfo, ValidationInfo, field_serializer, field_validator
 from pydantic_extra_types.pendulum_dt import DateTime
 
 from .utils_models import BaseQueryParams, Coordinates
@@ -121,7 +121,9 @@ class Route(BaseModel):
     transportation: Transportation
 
     @field_serializer("transportation")
-    def serialize_transportation(self, transportation: Transportation):
+    def serialize_transportation(self, transportation: Transportation, info: SerializationInfo):
+        if info.round_trip:
+            return transportation.model_dump(mode=info.mode)
         return transportation.mode.name
 
     @field_validator("origin", "destination")
@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import Annotated
+from typing import Annotated, Optional
 
 from pydantic import BaseModel, Field
 
+from config import settings
 from models.cost_models import CostEstimate
 from models.place_models import PlaceInfo, PlaceQuery
 from models.route_models import TransportationMode
@@ -15,6 +16,12 @@ class TourItinerary(BaseModel):
     arrival_time: datetime
     cost_estimate: CostEstimate
     transportation_method: TransportationMode
+    degraded: Annotated[
+        bool, Field(default=False, description="Built with fallback data because an upstream was unavailable.")
+    ]
+    degraded_stages: Annotated[
+        list[str], Field(default_factory=list, description="Stages that used fallback data, e.g. fuel_price.")
+    ]
 
     class Config:
         arbitrary_types_allowed = True
@@ -42,6 +49,25 @@ class TourRequest(BaseModel):
             description="The mode of transportation to use.",
         ),
     ]
+    rich_place_details: Annotated[
+        bool,
+        Field(
+            False,
+            description=(
+                "Also fetch photos, ratings and opening hours of FindPlace queries, at a higher Places tier. "
+                "NearbySearch and TextSearch return them anyway."
+            ),
+        ),
+    ]
+    deadline_seconds: Annotated[
+        Optional[float],
+        Field(
+            None,
+            gt=0,
+            le=settings.request_deadline_max_seconds,
+            description="Time budget of the request in seconds. Defaults to the server's request deadline.",
+        ),
+    ]
 
     class Config:
         schema_extra = {
@@ -92,3 +118,23 @@ class TourRequest(BaseModel):
                 },
             }
         }
+
+
+class BatchTourItem(BaseModel):
+    index: Annotated[int, Field(..., ge=0, description="Position of the request in the submitted batch.")]
+    itinerary: Annotated[
+        Optional[TourItinerary], Field(default=None, description="The itinerary, when it could be built.")
+    ]
+    error: Annotated[Optional[str], Field(default=None, description="Why the itinerary could not be built.")]
+    status: Annotated[
+        Optional[int],
+        Field(default=None, description="HTTP status of the error, as POST /travel/ would answer it."),
+    ]
+    retry_after: Annotated[
+        Optional[int],
+        Field(default=None, description="Seconds to wait before retrying, when the error is an unavailable upstream."),
+    ]
+
+
+class BatchTourResponse(BaseModel):
+    items: Annotated[list[BatchTourItem], Field(default_factory=list, description="One result per request, in order.")]
@@ -1,5 +1,7 @@
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Annotated, Optional
+from typing import Annotated, Any, Final, Optional
 
 from pydantic import BaseModel, Field
 from pydantic_extra_types.pendulum_dt import DateTime
@@ -17,20 +19,29 @@ class TrafficQueryParams(BaseQueryParams):
     transportation_method: TransportationMode
     departure_time: Optional[DateTime] = None
 
-    def get_bounding_boxes_coords(self, coordinates: list[Coordinates]) -> tuple[float, float, float, float]:
-        points = len(coordinates)
-        middle = int(points / 2)
-        latitude, longitude = coordinates[middle].model_dump().values()
-        delta = 0.01
-        min_lat = latitude - delta
-        max_lat = latitude + delta
-        min_lon = longitude - delta
-        max_lon = longitude + delta
-        return min_lon, min_lat, max_lon, max_lat
-
     def get_coordinates(self) -> list[Coordinates]:
         return PolylineDecoder(self.polyline).decode_polyline()
 
+    def get_coordinate_arrays(self) -> tuple[array, array]:
+        return PolylineDecoder(self.polyline).decode_arrays()
+
+
+# Impact used when the traffic data is missing or incomplete: travel time is taken as is.
+NEUTRAL_TRAFFIC_IMPACT: Final[float] = 1.0
+
+
+@dataclass
+class TrafficResponse:
+    """Decoded TomTom payloads handed from `TrafficFetcher` to `TrafficParser`.
+
+    `flow_segments` holds one flowSegmentData response per sampled point, or None where that request failed.
+    `unavailable` lists the upstreams whose open circuit breaker left part of the data out.
+    """
+
+    incidents: dict[str, Any]
+    flow_segments: list[Optional[dict[str, Any]]]
+    unavailable: list[str] = field(default_factory=list)
+
 
 class IncidentType(str, Enum):
     UNKNOWN = "Unknown"
@@ -81,6 +92,9 @@ class TrafficCondition(BaseModel):
     traffic_impact: Annotated[Optional[float], Field(default=1.0)]
     flow_segments: Annotated[list[FlowSegment], Field(default_factory=list)]
     incidents: Annotated[list[Incident], Field(default_factory=list)]
+    degraded: Annotated[
+        bool, Field(default=False, description="TomTom was unavailable: the impact is neutral and data may be missing.")
+    ]
 
     class Config:
         populate_by_name = True
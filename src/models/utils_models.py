@@ -1,4 +1,5 @@
-from typing import Annotated, Optional
+from array import array
+from typing import Annotated, Any, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -79,12 +80,53 @@ class PolylineDecoder:
 
     def decode_polyline(self) -> list[Coordinates]:
         """Decodes a polyline encoded string into a list of Coordinates."""
-        index, lat, lng = 0, 0, 0
-        coordinates = []
-        while index < len(self.polyline):
-            index, dlat = self.decode_single_coordinate(self.polyline, index)
-            index, dlng = self.decode_single_coordinate(self.polyline, index)
-            lat += dlat
-            lng += dlng
-            coordinates.append(Coordinates(latitude=lat / 1e5, longitude=lng / 1e5))
-        return coordinates
+        latitudes, longitudes = self.decode_arrays()
+        return [Coordinates(latitude=lat, longitude=lng) for lat, lng in zip(latitudes, longitudes)]
+
+    def decode_arrays(self) -> tuple[array, array]:
+        """Decodes the polyline into parallel latitude/longitude float arrays, without a model per vertex."""
+        data = self.polyline.encode("ascii")
+        latitudes, longitudes = array("d"), array("d")
+        index, length, lat, lng = 0, len(data), 0, 0
+        while index < length:
+            result, shift = 0, 0
+            while True:
+                b = data[index] - 63
+                index += 1
+                result |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            lat += ~(result >> 1) if (result & 1) else (result >> 1)
+
+            result, shift = 0, 0
+            while True:
+                b = data[index] - 63
+                index += 1
+                result |= (b & 0x1F) << shift
+                shift += 5
+                if b < 0x20:
+                    break
+            lng += ~(result >> 1) if (result & 1) else (result >> 1)
+
+            latitudes.append(lat / 1e5)
+            longitudes.append(lng / 1e5)
+        return latitudes, longitudes
+
+    def decode_numpy(self) -> Any:
+        """Decodes the polyline into a NumPy `(n, 2)` array of (latitude, longitude) in a vectorized pass.
+
+        Requires NumPy, which is an optional dependency.
+        """
+        import numpy as np
+
+        chunks = np.frombuffer(self.polyline.encode("ascii"), dtype=np.uint8).astype(np.int64) - 63
+        if chunks.size == 0:
+            return np.empty((0, 2), dtype=np.float64)
+        ends = np.flatnonzero(chunks < 0x20)
+        starts = np.concatenate(([0], ends[:-1] + 1))
+        group = np.repeat(np.arange(ends.size), ends - starts + 1)
+        shifts = 5 * (np.arange(chunks.size) - starts[group])
+        values = np.bincount(group, weights=(chunks & 0x1F) << shifts, minlength=ends.size).astype(np.int64)
+        deltas = np.where(values & 1, ~(values >> 1), values >> 1).reshape(-1, 2)
+        return np.cumsum(deltas, axis=0) / 1e5
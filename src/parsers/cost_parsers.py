@@ -1,4 +1,6 @@
 import logging
+import re
+from typing import Optional
 
 from bs4 import BeautifulSoup
 
@@ -6,9 +8,42 @@ from models.cost_models import TRAFFIC_CONDITION_WEIGHT
 
 logger = logging.getLogger(__name__)
 
+# Opening tag of the price element up to its first text node, e.g. `id="telafinal-precofinal" class="x">6,07<`.
+PRICE_ELEMENT_PATTERN = re.compile(r"""id=(["'])telafinal-precofinal\1[^<>]*>([^<]*)<""")
+PRICE_TEXT_PATTERN = re.compile(r"\d+(?:[.,]\d+)?")
+
 
 class CostParser:
     def parse(self, response: str) -> float:
+        """Reads the fuel price from the Petrobras page.
+
+        A targeted scan for the price element handles the usual page; anything it does not recognize (missing
+        element, nested markup, entities, malformed prices) goes through the full BeautifulSoup parse, which also
+        produces the error messages.
+        """
+        price = self.extract_price(response)
+        if price is not None:
+            logger.info(f"Successfully parsed fuel price: {price}")
+            return price
+        logger.debug("Targeted fuel price extraction failed, falling back to BeautifulSoup.")
+        return self.parse_with_soup(response)
+
+    @staticmethod
+    def extract_price(response: str) -> Optional[float]:
+        """Returns the price when the element's text is a plain number, or None when it cannot tell."""
+        # The pattern starts with a literal so the regex engine can skip ahead quickly; attributes merely ending in
+        # "id" (such as data-id) are filtered here instead.
+        match = PRICE_ELEMENT_PATTERN.search(response)
+        while match is not None and not response[match.start() - 1 : match.start()].isspace():
+            match = PRICE_ELEMENT_PATTERN.search(response, match.end())
+        if match is None:
+            return None
+        price_txt = match.group(2).strip()
+        if not PRICE_TEXT_PATTERN.fullmatch(price_txt):
+            return None
+        return float(price_txt.replace(",", "."))
+
+    def parse_with_soup(self, response: str) -> float:
         try:
             soup = BeautifulSoup(response, "html.parser")
             price_element = soup.find(id="telafinal-precofinal")
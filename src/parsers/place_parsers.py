@@ -1,39 +1,53 @@
-import json
-from json import JSONDecodeError
-from typing import Any, Dict, List
+from typing import Any, Optional
 
 import pendulum
 from pydantic_core import Url
 
 from models.place_models import DAYS_OF_WEEK, Location, Picture, PlaceInfo, Review
 from models.utils_models import Coordinates
+from utils import fast_json
+
+RESULTS_KEYS = {"textsearch": "results", "nearbysearch": "results", "findplacefromtext": "candidates"}
 
 
 class PlaceParser:
     @staticmethod
     def parse(response: str, response_type: str) -> list[PlaceInfo]:
-        try:
-            json_response = json.loads(response)
-            if response_type == "textsearch" or response_type == "nearbysearch":
-                return [PlaceParser._parse_place(place) for place in json_response.get("results", [])]
-            elif response_type == "findplacefromtext":
-                return [PlaceParser._parse_place(place) for place in json_response.get("candidates", [])]
-            else:
-                raise ValueError(f"Unknown response type: {response_type}")  # Exception treated by builder?
-        except JSONDecodeError as e:
-            raise e
+        return [PlaceParser._parse_place(place) for place in PlaceParser._results(response, response_type)]
+
+    @staticmethod
+    def parse_first(response: str, response_type: str) -> Optional[PlaceInfo]:
+        """Parses only the first result, the one a lookup returns, or None when there are no results.
+
+        Text and nearby searches return up to 20 places; the others are left as decoded JSON.
+        """
+        results = PlaceParser._results(response, response_type)
+        return PlaceParser._parse_place(results[0]) if results else None
+
+    @staticmethod
+    def _results(response: str, response_type: str) -> list[dict[str, Any]]:
+        results_key = RESULTS_KEYS.get(response_type)
+        if results_key is None:
+            raise ValueError(f"Unknown response type: {response_type}")  # Exception treated by builder?
+        return fast_json.loads(response).get(results_key, [])
 
     @staticmethod
     def _parse_place(place: dict[str, Any]) -> PlaceInfo:
+        # Reviews, pictures and opening hours are only built when present; otherwise the model defaults apply.
+        optional_fields: dict[str, Any] = {}
+        if place.get("reviews"):
+            optional_fields["reviews"] = PlaceParser._parse_reviews(place["reviews"])
+        if place.get("photos"):
+            optional_fields["pictures"] = PlaceParser._parse_pictures(place["photos"])
+        if place.get("opening_hours"):
+            optional_fields["opening_hours"] = PlaceParser._parse_opening_hours(place["opening_hours"])
         return PlaceInfo(
             place_id=place.get("place_id", ""),
             name=place.get("name", ""),
             location=PlaceParser._parse_location(place),
             types=place.get("types", []),
-            reviews=PlaceParser._parse_reviews(place.get("reviews", [])),
-            pictures=PlaceParser._parse_pictures(place.get("photos", [])),
             ratings_total=place.get("user_ratings_total", 0),
-            opening_hours=PlaceParser._parse_opening_hours(place.get("opening_hours", {})),
+            **optional_fields,
         )
 
     @staticmethod
@@ -1,85 +1,78 @@
-import json
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from models.traffic_models import (
+    NEUTRAL_TRAFFIC_IMPACT,
     FlowSegment,
     Incident,
     IncidentType,
     RoadType,
     TrafficCondition,
+    TrafficResponse,
 )
 from models.utils_models import Coordinates
+from utils.geometry import geojson_positions
 
 logger = logging.getLogger(__name__)
 
 
 class TrafficParser:
     @staticmethod
-    def parse(response: str) -> TrafficCondition:
-        try:
-            response_json = json.loads(response)
-            incidents_json = json.loads(response_json["incidents_data"])
-            traffic_json = response_json.get("traffic_data", [])
-            return TrafficCondition(
-                traffic_impact=None,
-                incidents=TrafficParser._parse_incidents(incidents_json),
-                flow_segments=TrafficParser._parse_flow_segments(traffic_json),
-            )
-        except json.JSONDecodeError as json_e:
-            logger.error(f"Failed to parse to JSON: {json_e}")
-            raise json_e
+    def parse(response: TrafficResponse) -> TrafficCondition:
+        """Builds the traffic condition from already decoded TomTom payloads, skipping failed flow samples.
+
+        When an upstream was unavailable the condition is marked degraded and gets a neutral impact, since the data
+        it would be based on is incomplete.
+        """
+        degraded = bool(response.unavailable)
+        if degraded:
+            logger.warning(f"Traffic condition degraded, unavailable: {', '.join(response.unavailable)}")
+        return TrafficCondition(
+            traffic_impact=NEUTRAL_TRAFFIC_IMPACT if degraded else None,
+            incidents=TrafficParser._parse_incidents(response.incidents),
+            flow_segments=TrafficParser._parse_flow_segments(response.flow_segments),
+            degraded=degraded,
+        )
 
     @staticmethod
     def _parse_incidents(incidents_data: dict[str, Any]) -> list[Incident]:
         incidents = incidents_data.get("incidents", [])
-        return [
-            Incident(
-                type=IncidentType(TrafficParser._get_incident_type(inc["properties"]["iconCategory"])),
-                coordinates=Coordinates(
-                    latitude=inc["geometry"]["coordinates"][0][0], longitude=inc["geometry"]["coordinates"][0][1]
-                ),
-                icon_category=inc["properties"]["iconCategory"],
-            )
-            for inc in incidents
-        ]
+        return [TrafficParser._parse_incident(inc) for inc in incidents if geojson_positions(inc["geometry"])]
+
+    @staticmethod
+    def _parse_incident(inc: dict[str, Any]) -> Incident:
+        longitude, latitude = geojson_positions(inc["geometry"])[0]
+        return Incident(
+            type=IncidentType(TrafficParser._get_incident_type(inc["properties"]["iconCategory"])),
+            coordinates=Coordinates(latitude=latitude, longitude=longitude),
+            icon_category=inc["properties"]["iconCategory"],
+        )
+
+    @staticmethod
+    def _parse_flow_segments(flow_data: list[Optional[dict[str, Any]]]) -> list[FlowSegment]:
+        return [TrafficParser._parse_flow_segment(data) for data in flow_data if data is not None]
 
     @staticmethod
-    def _parse_flow_segments(flow_data: list[str]) -> list[FlowSegment]:
-        parsed_flow_data = [json.loads(data) for data in flow_data]
-        return [
-            FlowSegment(
-                frc=data.get("flowSegmentData", {}).get("frc", ""),
-                road_type=RoadType(TrafficParser._get_road_type(data.get("flowSegmentData", {}).get("frc", ""))),
-                current_speed=data.get("flowSegmentData", {}).get("currentSpeed", 0),
-                free_flow_speed=data.get("flowSegmentData", {}).get("freeFlowSpeed", 0),
-                confidence=data.get("flowSegmentData", {}).get("confidence", 0),
-                current_travel_time=data.get("flowSegmentData", {}).get("currentTravelTime", 0),
-                free_flow_travel_time=data.get("flowSegmentData", {}).get("freeFlowTravelTime", 0),
-                road_closure=data.get("flowSegmentData", {}).get("roadClosure", False),
-                start_point=Coordinates(
-                    latitude=data.get("flowSegmentData", {})
-                    .get("coordinates", {})
-                    .get("coordinate", [{}])[0]
-                    .get("latitude", 15),
-                    longitude=data.get("flowSegmentData", {})
-                    .get("coordinates", {})
-                    .get("coordinate", [{}])[0]
-                    .get("longitude", 30),
-                ),
-                end_point=Coordinates(
-                    latitude=data.get("flowSegmentData", {})
-                    .get("coordinates", {})
-                    .get("coordinate", [{}])[-1]
-                    .get("latitude", 15),
-                    longitude=data.get("flowSegmentData", {})
-                    .get("coordinates", {})
-                    .get("coordinate", [{}])[-1]
-                    .get("longitude", 30),
-                ),
-            )
-            for data in parsed_flow_data
-        ]
+    def _parse_flow_segment(data: dict[str, Any]) -> FlowSegment:
+        segment = data.get("flowSegmentData", {})
+        coordinates = segment.get("coordinates", {}).get("coordinate", [{}])
+        frc = segment.get("frc", "")
+        return FlowSegment(
+            frc=frc,
+            road_type=RoadType(TrafficParser._get_road_type(frc)),
+            current_speed=segment.get("currentSpeed", 0),
+            free_flow_speed=segment.get("freeFlowSpeed", 0),
+            confidence=segment.get("confidence", 0),
+            current_travel_time=segment.get("currentTravelTime", 0),
+            free_flow_travel_time=segment.get("freeFlowTravelTime", 0),
+            road_closure=segment.get("roadClosure", False),
+            start_point=Coordinates(
+                latitude=coordinates[0].get("latitude", 15), longitude=coordinates[0].get("longitude", 30)
+            ),
+            end_point=Coordinates(
+                latitude=coordinates[-1].get("latitude", 15), longitude=coordinates[-1].get("longitude", 30)
+            ),
+        )
 
     @staticmethod
     def _get_incident_type(ac_type):
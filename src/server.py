@@ -1,24 +1,231 @@
-from typing import Annotated
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, Any, AsyncGenerator, AsyncIterator
 
-from fastapi import Body, FastAPI, HTTPException
+import uvicorn
+from fastapi import Body, FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 
 from builders.tour_itinerary_builder import TourItineraryBuilder
-from models.tour_itinerary_models import TourItinerary, TourRequest
+from config import settings
+from fetchers.session_pool import SessionPool
+from models.route_models import Route
+from models.tour_itinerary_models import BatchTourResponse, TourItinerary, TourRequest
+from utils.compression import SelectiveGZipMiddleware
+from utils.errors import error_status
+from utils.metrics import (
+    REGISTRY,
+    render_cache_stats,
+    server_timing_header,
+    start_server_timing,
+)
+from utils.persistent_cache import PersistentCache
+from utils.resilience import start_request_retries
+from utils.single_flight import drain_in_flight
 
-app = FastAPI(title="TripEstimatorAPI")
+logger = logging.getLogger(__name__)
 
 
-tour_builder = TourItineraryBuilder()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    session_pool = SessionPool()
+    app.state.session_pool = session_pool
+    persistent_cache = compaction = None
+    if settings.persistent_cache_path is not None:
+        persistent_cache = PersistentCache(
+            settings.persistent_cache_path,
+            max_entries=settings.persistent_cache_max_entries,
+            stale_retention=settings.persistent_cache_stale_retention_seconds,
+        )
+        compaction = asyncio.create_task(
+            persistent_cache.run_compaction(settings.persistent_cache_compaction_interval_seconds)
+        )
+    app.state.tour_builder = tour_builder = TourItineraryBuilder(session_pool, persistent_cache)
+    # uvicorn only starts accepting connections once the lifespan startup is done.
+    warmups = []
+    if settings.warmup_connections:
+        upstream_urls = [
+            settings.google_places_url,
+            settings.google_routes_url,
+            settings.tomtom_url,
+            settings.petrobras_fuel_url,
+        ]
+        warmups.append(session_pool.warm_up(upstream_urls))
+    if settings.fuel_price_prefetch:
+        warmups.append(tour_builder.cost_builder.prefetch_fuel_prices())
+    await asyncio.gather(*warmups)
+    try:
+        yield
+    finally:
+        # Requests have finished by now; let detached work such as fuel price refreshes complete before closing.
+        still_running = await drain_in_flight(settings.server_graceful_shutdown_seconds)
+        if still_running:
+            logger.warning(f"Shutting down with {still_running} upstream call(s) still in flight.")
+        await session_pool.close()
+        if compaction is not None:
+            compaction.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await compaction
+        if persistent_cache is not None:
+            persistent_cache.close()
+
+
+app = FastAPI(title="TripEstimatorAPI", lifespan=lifespan)
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    excluded_paths={"/travel/stream"},
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=settings.gzip_compresslevel,
+)
+
+
+@app.middleware("http")
+async def track_request(request: Request, call_next):
+    """Collects the Server-Timing entries of the request and caps the upstream retries it may cause."""
+    start_request_retries(settings.upstream_retries_per_request)
+    timings = start_server_timing()
+    started = time.perf_counter()
+    response = await call_next(request)
+    # Streaming responses send their headers before the stages finish, so they only carry what ran until then.
+    timings.append(("total", time.perf_counter() - started))
+    response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
 
 
 @app.post("/travel/", response_model=TourItinerary, description="Returns a travel estimation between two routes.")
 async def build_tour(
+    request: Request,
     tour_request: Annotated[TourRequest, Body(openapi_examples=TourRequest.Config.schema_extra["examples"])],  # type: ignore
 ):
+    tour_builder: TourItineraryBuilder = request.app.state.tour_builder
     try:
         tour_itinerary = await tour_builder.build(
-            tour_request.place_a, tour_request.place_b, tour_request.transportation_method
+            tour_request.place_a,
+            tour_request.place_b,
+            tour_request.transportation_method,
+            rich_place_details=tour_request.rich_place_details,
+            deadline_seconds=tour_request.deadline_seconds,
         )
         return tour_itinerary
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        status_code, retry_after = error_status(e)
+        headers = None if retry_after is None else {"Retry-After": str(retry_after)}
+        raise HTTPException(status_code=status_code, detail=str(e), headers=headers)
+
+
+@app.post(
+    "/travel/stream",
+    response_class=StreamingResponse,
+    description=(
+        "Streams a travel estimation as NDJSON events, one per stage, as soon as each one is computed. A failed build "
+        "ends with an `error` event carrying the `status` (and `retry_after`) POST /travel/ would have answered with."
+    ),
+)
+async def stream_tour(
+    request: Request,
+    tour_request: Annotated[TourRequest, Body(openapi_examples=TourRequest.Config.schema_extra["examples"])],  # type: ignore
+):
+    tour_builder: TourItineraryBuilder = request.app.state.tour_builder
+    return StreamingResponse(
+        _stream_events(
+            tour_builder.build_stream(
+                tour_request.place_a,
+                tour_request.place_b,
+                tour_request.transportation_method,
+                rich_place_details=tour_request.rich_place_details,
+                deadline_seconds=tour_request.deadline_seconds,
+            )
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _stream_events(stages: AsyncGenerator[tuple[str, Any], None]) -> AsyncIterator[str]:
+    # Closing the stages when the client disconnects (or on any early exit) cancels the build behind them.
+    async with contextlib.aclosing(stages):
+        try:
+            async for stage, result in stages:
+                yield json.dumps({"event": stage, "data": _serialize_stage(result)}) + "\n"
+        except Exception as e:
+            # The response status was sent with the first event; the error event carries the one it stands for.
+            status_code, retry_after = error_status(e)
+            event = {"event": "error", "detail": str(e), "status": status_code, "retry_after": retry_after}
+            yield json.dumps(event) + "\n"
+
+
+def _serialize_stage(result: Any) -> Any:
+    if isinstance(result, Route):
+        # The encoded polyline is only an input for the traffic stage; clients get the route summary.
+        return result.model_dump(mode="json", exclude={"polyline"})
+    if isinstance(result, BaseModel):
+        return result.model_dump(mode="json")
+    return result
+
+
+@app.post(
+    "/travel/batch",
+    response_model=BatchTourResponse,
+    description=(
+        "Returns travel estimations for a list of tour requests, sharing the lookups they have in common. Failed items "
+        "carry the `status` (and `retry_after`) POST /travel/ would have answered with."
+    ),
+)
+async def build_tour_batch(
+    request: Request,
+    tour_requests: Annotated[list[TourRequest], Body(min_length=1, max_length=settings.batch_max_items)],
+):
+    tour_builder: TourItineraryBuilder = request.app.state.tour_builder
+    return await tour_builder.build_batch(tour_requests)
+
+
+@app.get("/cache/stats", description="Returns hit, miss and eviction counters of the in-process caches.")
+async def cache_stats(request: Request) -> dict[str, dict[str, int]]:
+    return _cache_stats(request.app.state.tour_builder)
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    description="Returns stage, upstream and cache metrics in the Prometheus text format.",
+)
+async def metrics(request: Request):
+    body = REGISTRY.render() + render_cache_stats(_cache_stats(request.app.state.tour_builder))
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
+def _cache_stats(tour_builder: TourItineraryBuilder) -> dict[str, dict[str, int]]:
+    return {
+        "places": tour_builder.place_builder.place_service.place_cache.stats.as_dict(),
+        "routes": tour_builder.route_builder.route_service.route_cache.stats.as_dict(),
+        "fuel_prices": tour_builder.cost_builder.cost_service.price_cache.stats.as_dict(),
+        "flow_segments": tour_builder.traffic_builder.traffic_service.fetcher.flow_cache.stats.as_dict(),
+        "incident_tiles": tour_builder.traffic_builder.traffic_service.fetcher.incident_tile_cache.stats.as_dict(),
+    }
+
+
+def main() -> None:
+    """Serves the API with `settings.server_workers` processes (one per CPU by default).
+
+    uvicorn picks uvloop and httptools when they are installed. On SIGTERM/SIGINT each worker stops accepting
+    connections, waits up to `server_graceful_shutdown_seconds` for open requests and then runs the lifespan shutdown.
+    """
+    uvicorn.run(
+        "server:app",
+        app_dir=os.path.dirname(os.path.abspath(__file__)),
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=settings.server_workers or os.cpu_count() or 1,
+        loop="auto",
+        http="auto",
+        timeout_graceful_shutdown=settings.server_graceful_shutdown_seconds,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,67 @@
+import asyncio
 import logging
+from typing import Iterable, Optional
 
 from calculators.base_cost_calculator import BaseCostCalculator
+from config import settings
 from fetchers.cost_fetcher import CostFetcher
 from models.cost_models import (
+    BRAZILIAN_STATES,
     CostComponents,
     CostEstimate,
     CostEstimationParams,
     Currency,
+    FuelPrice,
 )
 from parsers.cost_parsers import CostParser
+from utils.cache import TTLCache
+from utils.circuit_breaker import circuit_breaker
+from utils.metrics import PARSE_DURATION, timed
+from utils.persistent_cache import PersistentCache, PersistentNamespace
+from utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
 class CostService:
-    def __init__(self, calculator: BaseCostCalculator, parser: CostParser, fetcher: CostFetcher) -> None:
+    def __init__(
+        self,
+        calculator: BaseCostCalculator,
+        parser: CostParser,
+        fetcher: CostFetcher,
+        price_cache: Optional[TTLCache[str, FuelPrice]] = None,
+        persistent_cache: Optional[PersistentCache] = None,
+    ) -> None:
         self.fetcher = fetcher
         self.parser = parser
         self.calculator = calculator
+        if price_cache is None:
+            price_cache = TTLCache(
+                maxsize=len(BRAZILIAN_STATES),
+                ttl=settings.fuel_price_ttl_seconds,
+                persistent=(
+                    None
+                    if persistent_cache is None
+                    else PersistentNamespace(persistent_cache, "fuel_prices", FuelPrice)
+                ),
+            )
+        self.price_cache = price_cache
+        self._in_flight: SingleFlight[str, FuelPrice] = SingleFlight("fuel_prices")
 
-    async def estimate_cost(self, params: CostEstimationParams) -> CostEstimate:
+    async def estimate_cost(self, params: CostEstimationParams, fuel_price: Optional[FuelPrice] = None) -> CostEstimate:
         logger.info("Estimating cost")
 
-        raw_data = await self.fetcher.fetch(params.state)
-        fuel_price = self.parser.parse(raw_data)
+        if fuel_price is None:
+            fuel_price = await self.get_fuel_price(params.state)
         traffic_weight = self.parser.parse_traffic_condition(params.traffic_condition)
         final_cost = self.calculator.estimate_cost(
             distance=params.distance,
             time_estimated=params.time_estimated,
             traffic_weight=traffic_weight,
-            fuel_price=fuel_price,
+            fuel_price=fuel_price.price,
         )
         cost_components = CostComponents(
-            fuel_price=fuel_price,
+            fuel_price=fuel_price.price,
             traffic_adjustment=1.0,
             # TODO: #13 # Fix traffic_adjustment parser.
             #   assignees: IgorG-Monteiro
@@ -48,5 +77,49 @@ class CostService:
             estimated_cost=final_cost,
             currency=currency,
             cost_details=cost_components,
-            source_urls=self.fetcher.source_url,
+            source_urls=fuel_price.source_url,
         )
+
+    async def get_fuel_price(self, state: str) -> FuelPrice:
+        """Returns the cached price for `state`, refreshing stale entries in the background.
+
+        Only a cold cache makes the caller wait on Petrobras; a stale entry is served as-is while a single refresh
+        per state runs behind it. While the Petrobras circuit breaker is open, the stale entry is the last known price
+        and is marked degraded.
+        """
+        entry = await self.price_cache.lookup_async(state)
+        if entry is None:
+            return await asyncio.shield(self._refresh_fuel_price(state))
+        if not entry.is_fresh(self.price_cache.clock()):
+            logger.debug(f"Serving stale fuel price for {state} while refreshing.")
+            self._refresh_fuel_price(state)
+            if not circuit_breaker(self.fetcher.UPSTREAM).closed:
+                logger.warning(f"Petrobras is unavailable, serving the last known fuel price for {state}.")
+                return entry.value.model_copy(update={"degraded": True})
+        return entry.value
+
+    async def prefetch_fuel_prices(self, states: Iterable[str] = BRAZILIAN_STATES) -> None:
+        """Warms the price cache for `states` that have no fresh price yet, e.g. one left by another worker in the
+        persistent cache. Failures are logged and left for the next request to retry."""
+        states = [state for state in states if await self.price_cache.get_async(state) is None]
+        results = await asyncio.gather(*(self._refresh_fuel_price(state) for state in states), return_exceptions=True)
+        failed = [state for state, result in zip(states, results) if isinstance(result, BaseException)]
+        logger.info(f"Prefetched fuel prices for {len(states) - len(failed)} of {len(states)} states.")
+        if failed:
+            logger.warning(f"Could not prefetch fuel prices for: {', '.join(failed)}")
+
+    def _refresh_fuel_price(self, state: str) -> asyncio.Task[FuelPrice]:
+        """Starts (or joins) the single refresh of `state`, which completes even if every caller goes away."""
+        return self._in_flight.start(state, lambda: self._fetch_fuel_price(state))
+
+    async def _fetch_fuel_price(self, state: str) -> FuelPrice:
+        try:
+            raw_data = await self.fetcher.fetch(state)
+            with timed(PARSE_DURATION, "parse.cost", parser="cost"):
+                price = self.parser.parse(raw_data)
+        except Exception as e:
+            logger.error(f"Fuel price refresh for {state} failed: {e}")
+            raise
+        fuel_price = FuelPrice(state=state, price=price, source_url=self.fetcher.build_endpoint(state))
+        self.price_cache.set_in_background(state, fuel_price)
+        return fuel_price
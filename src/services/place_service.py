@@ -1,33 +1,118 @@
 import logging
+import unicodedata
+from typing import Any, Hashable, Optional
 
-from fetchers.place_fetcher import PlaceFetcher
+from config import settings
+from fetchers.place_fetcher import FIELD_MASKED_QUERY_TYPES, PlaceFetcher
 from models.place_models import BaseQueryParams, PlaceInfo, QueryParamsFactory
 from parsers.place_parsers import PlaceParser
+from utils.cache import TTLCache
+from utils.metrics import PARSE_DURATION, timed
+from utils.persistent_cache import PersistentCache, PersistentNamespace
+from utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
 class PlaceService:
-    def __init__(self, fetcher: PlaceFetcher, parser: PlaceParser) -> None:
+    def __init__(
+        self,
+        fetcher: PlaceFetcher,
+        parser: PlaceParser,
+        place_cache: Optional[TTLCache[Hashable, Optional[PlaceInfo]]] = None,
+        persistent_cache: Optional[PersistentCache] = None,
+    ) -> None:
         self.fetcher = fetcher
         self.parser = parser
+        if place_cache is None:
+            place_cache = TTLCache(
+                maxsize=settings.place_cache_size,
+                ttl=settings.place_cache_ttl_seconds,
+                persistent=(
+                    None
+                    if persistent_cache is None
+                    else PersistentNamespace(persistent_cache, "places", Optional[PlaceInfo])
+                ),
+            )
+        self.place_cache = place_cache
+        self._in_flight: SingleFlight[Hashable, PlaceInfo] = SingleFlight("places")
 
-    async def fetch_places(self, query_params: BaseQueryParams) -> PlaceInfo:
+    async def fetch_places(self, query_params: BaseQueryParams, rich_details: bool = False) -> PlaceInfo:
 
         factory = QueryParamsFactory(query_params.model_dump())
         query_params_instance = factory.create_query_model()
         query_type = self._get_query_type(query_params_instance)
         logger.debug(f"Query type determined: {query_type}")
 
+        cache_key = self.cache_key(query_type, query_params_instance, rich_details=rich_details)
+        entry = await self.place_cache.lookup_async(cache_key)
+        if entry is not None and entry.is_fresh(self.place_cache.clock()):
+            logger.debug("Place served from cache.")
+            if entry.value is None:
+                raise Exception("No places found!")
+            return entry.value
+
+        return await self._in_flight.run(
+            cache_key, lambda: self._fetch_place(query_type, query_params_instance, cache_key, rich_details)
+        )
+
+    async def _fetch_place(
+        self, query_type: str, query_params_instance: BaseQueryParams, cache_key: Hashable, rich_details: bool
+    ) -> PlaceInfo:
         query_params_instance.query_type = query_type  # type: ignore
 
-        response_data = await self.fetcher.fetch(query_params_instance)
+        response_data = await self.fetcher.fetch(query_params_instance, rich_details=rich_details)
         logger.debug("Response data received.")
-        places = self.parser.parse(response=response_data, response_type=query_type)
-        logger.info(f"Places parsed successfully. Found {len(places)} places.")
-        if not len(places):
+        with timed(PARSE_DURATION, "parse.place", parser="place"):
+            place = self.parser.parse_first(response=response_data, response_type=query_type)
+        if place is None:
+            self.place_cache.set_in_background(cache_key, None, ttl=settings.place_negative_cache_ttl_seconds)
             raise Exception("No places found!")
-        return places[0]
+        logger.info("Place parsed successfully.")
+        self.place_cache.set_in_background(cache_key, place)
+        return place
+
+    def query_key(self, query_params: BaseQueryParams, rich_details: bool = False) -> Hashable:
+        """Normalized key of a raw query, equal for queries that would share a cache entry."""
+        query_params_instance = QueryParamsFactory(query_params.model_dump()).create_query_model()
+        return self.cache_key(
+            self._get_query_type(query_params_instance), query_params_instance, rich_details=rich_details
+        )
+
+    def cache_key(self, query_type: str, query_model: BaseQueryParams, rich_details: bool = False) -> Hashable:
+        """Normalizes a query so that equivalent lookups share a cache entry.
+
+        Text is case- and accent-folded, locations are rounded to `place_cache_location_precision` decimal places
+        and radii to multiples of `place_cache_radius_step_meters`. The API key is left out. Rich and basic lookups are
+        kept apart only for the query types that honour the field mask; the others return the same fields either way.
+        """
+        params = query_model.model_dump(exclude_none=True, exclude={"api_key", "query_type"})
+        return (
+            query_type,
+            rich_details and query_type in FIELD_MASKED_QUERY_TYPES,
+            tuple(sorted((name, self._normalize(name, value)) for name, value in params.items())),
+        )
+
+    def _normalize(self, name: str, value: Any) -> Hashable:
+        precision = settings.place_cache_location_precision
+        if name == "location" and isinstance(value, dict):
+            return (round(value["latitude"], precision), round(value["longitude"], precision))
+        if name == "location" and isinstance(value, str):
+            try:
+                return tuple(round(float(part), precision) for part in value.split(","))
+            except ValueError:
+                pass
+        if name == "radius":
+            step = settings.place_cache_radius_step_meters
+            return round(float(value) / step) * step
+        if isinstance(value, str):
+            decomposed = unicodedata.normalize("NFKD", value.casefold())
+            return " ".join("".join(c for c in decomposed if not unicodedata.combining(c)).split())
+        if isinstance(value, dict):
+            return tuple(sorted((key, self._normalize(key, item)) for key, item in value.items()))
+        if isinstance(value, list):
+            return tuple(self._normalize(name, item) for item in value)
+        return value
 
     def _get_query_type(self, query_model: BaseQueryParams) -> str:
         query_type_mapping = {
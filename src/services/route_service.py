@@ -1,20 +1,51 @@
 import logging
+from typing import Hashable, Optional
 
+import pendulum
+
+from config import settings
 from fetchers.route_fetcher import RouteFetcher
-from models.route_models import Route, RouteQueryParams
+from models.route_models import Route, RouteQueryParams, TransportationMode
 from parsers.route_parsers import RouteParser
+from utils.cache import TTLCache
+from utils.metrics import PARSE_DURATION, timed
+from utils.persistent_cache import PersistentCache, PersistentNamespace
+from utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
 
 class RouteService:
-    def __init__(self, fetcher: RouteFetcher, parser: RouteParser) -> None:
+    def __init__(
+        self,
+        fetcher: RouteFetcher,
+        parser: RouteParser,
+        route_cache: Optional[TTLCache[Hashable, Route]] = None,
+        persistent_cache: Optional[PersistentCache] = None,
+    ) -> None:
         self.fetcher = fetcher
         self.parser = parser
+        if route_cache is None:
+            route_cache = TTLCache(
+                maxsize=settings.route_cache_size,
+                ttl=settings.route_cache_default_ttl_seconds,
+                persistent=None if persistent_cache is None else PersistentNamespace(persistent_cache, "routes", Route),
+            )
+        self.route_cache = route_cache
+        self._in_flight: SingleFlight[Hashable, Route] = SingleFlight("routes")
 
     async def get_route(self, query_params: RouteQueryParams) -> Route:
         logger.info(f"Fetching route with query params: {query_params}")
 
+        cache_key = self.cache_key(query_params)
+        cached_route = await self.route_cache.get_async(cache_key)
+        if cached_route is not None:
+            logger.debug("Route served from cache.")
+            return cached_route
+
+        return await self._in_flight.run(cache_key, lambda: self._fetch_route(query_params, cache_key))
+
+    async def _fetch_route(self, query_params: RouteQueryParams, cache_key: Hashable) -> Route:
         try:
             raw_data = await self.fetcher.fetch(query_params)
             logger.debug("Raw data fetched")
@@ -23,11 +54,32 @@ class RouteService:
             raise
 
         try:
-            route = self.parser.parse(raw_data, transportation_mode=query_params.mode)
+            with timed(PARSE_DURATION, "parse.route", parser="route"):
+                route = self.parser.parse(raw_data, transportation_mode=query_params.mode)
             logger.info("Route parsed successfully.")
         except Exception as e:
             logger.error(f"Error parsing route data: {e}")
             raise
 
+        self.route_cache.set_in_background(cache_key, route, ttl=self._ttl_for(query_params.mode))
         logger.debug(f"Returning route: {route}")
         return route
+
+    def cache_key(self, query_params: RouteQueryParams) -> Hashable:
+        """Keys a route on its place pair, mode and the time bucket of its departure (or arrival) time.
+
+        Requests without an explicit time are bucketed on the current time.
+        """
+        if query_params.arrive_by is not None:
+            anchor, reference = "arrive_by", query_params.arrive_by
+        else:
+            anchor, reference = "depart_at", query_params.depart_at or pendulum.now()
+        bucket_seconds = self._bucket_seconds_for(query_params.mode)
+        bucket = int(reference.timestamp() // bucket_seconds)
+        return (query_params.origin, query_params.destination, query_params.mode.value, anchor, bucket)
+
+    def _bucket_seconds_for(self, mode: TransportationMode) -> float:
+        return settings.route_cache_bucket_seconds.get(mode.value, settings.route_cache_default_bucket_seconds)
+
+    def _ttl_for(self, mode: TransportationMode) -> float:
+        return settings.route_cache_ttl_seconds.get(mode.value, settings.route_cache_default_ttl_seconds)
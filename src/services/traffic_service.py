@@ -1,6 +1,7 @@
 from fetchers.traffic_fetcher import TrafficFetcher
 from models.traffic_models import TrafficCondition, TrafficQueryParams
 from parsers.traffic_parser import TrafficParser
+from utils.metrics import PARSE_DURATION, timed
 
 
 class TrafficService:
@@ -10,4 +11,5 @@ class TrafficService:
 
     async def get_traffic_condition(self, params: TrafficQueryParams) -> TrafficCondition:
         raw_data = await self.fetcher.fetch(params=params)
-        return self.parser.parse(raw_data)
+        with timed(PARSE_DURATION, "parse.traffic", parser="traffic"):
+            return self.parser.parse(raw_data)
@@ -1,5 +1,7 @@
+import numpy as np
 import pytest
 
+from calculators.base_cost_calculator import BaseCostCalculator
 from calculators.default_cost_calculator import DefaultCostCalculator
 
 
@@ -21,3 +23,50 @@ def calculator():
 def test_estimate_cost(calculator, distance, time_estimated, traffic_condition, fuel_price, expected_cost) -> None:
     calculated_cost = calculator.estimate_cost(distance, time_estimated, traffic_condition, fuel_price)
     assert calculated_cost == pytest.approx(expected_cost, 0.01)
+
+
+class RowByRowCalculator(DefaultCostCalculator):
+    """Only overrides the scalar path, so batches go through the generic fallback."""
+
+    estimate_cost_batch = BaseCostCalculator.estimate_cost_batch
+
+
+@pytest.fixture
+def columns():
+    rng = np.random.default_rng(42)
+    rows = 10_000
+    return (
+        rng.uniform(0, 2_000, rows),
+        rng.integers(1, 24 * 60, rows),
+        rng.choice([0.5, 1.0, 1.2, 1.5, 1.8], rows),
+        rng.uniform(4.5, 8.0, rows).round(2),
+    )
+
+
+@pytest.mark.parametrize("batch_calculator", [DefaultCostCalculator(), RowByRowCalculator()])
+def test_estimate_cost_batch_matches_scalar_exactly(calculator, batch_calculator, columns) -> None:
+    batch = batch_calculator.estimate_cost_batch(*columns)
+    expected = [calculator.estimate_cost(*row) for row in zip(*(column.tolist() for column in columns))]
+
+    assert batch.total_cost.dtype == np.float64
+    assert np.array_equal(batch.total_cost, expected)
+
+
+def test_estimate_cost_batch_components(calculator, columns) -> None:
+    batch = calculator.estimate_cost_batch(*columns)
+
+    assert np.all(batch.base_cost == calculator.BASE_COST)
+    assert np.array_equal(batch.base_cost + batch.fuel_cost + batch.time_cost, batch.total_cost)
+
+
+def test_estimate_cost_batch_broadcasts_scalars(calculator) -> None:
+    batch = calculator.estimate_cost_batch([10, 16, 100], 30, [1.0, 1.2, 0.5], 5.72)
+
+    assert batch.total_cost.tolist() == [
+        calculator.estimate_cost(d, 30, w, 5.72) for d, w in [(10, 1.0), (16, 1.2), (100, 0.5)]
+    ]
+
+
+def test_estimate_cost_batch_rejects_mismatched_columns(calculator) -> None:
+    with pytest.raises(ValueError):
+        calculator.estimate_cost_batch([10, 16, 100], [30, 40], 1.0, 5.72)
@@ -53,3 +53,30 @@ class TestCostParser:
         """Test if the method raises a ValueError for unknown traffic conditions"""
         with pytest.raises(ValueError, match="Unknown traffic condition"):
             cost_parser.parse_traffic_condition("Extreme")
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            '<div id="telafinal-precofinal">5,67</div>',
+            "<span class='valor' id='telafinal-precofinal' data-x=\"1\"> 6.07 </span>",
+            '<body><p class="telafinal-precofinal">0,00</p><div data-id="telafinal-precofinal">1,00</div>'
+            '<section><span class="moeda">R$</span><span id="telafinal-precofinal">6,19</span></section></body>',
+        ],
+    )
+    def test_targeted_extraction_matches_soup(self, cost_parser, html):
+        """Test if the targeted scan and the BeautifulSoup parse read the same price"""
+        assert cost_parser.extract_price(html) == cost_parser.parse_with_soup(html)
+        assert cost_parser.parse(html) == cost_parser.parse_with_soup(html)
+
+    @pytest.mark.parametrize(
+        "html",
+        [
+            '<div id="telafinal-precofinal"><b>5,67</b></div>',
+            '<div id="telafinal-precofinal">&nbsp;5,67</div>',
+            '<div data-id="telafinal-precofinal">5,67</div>',
+            '<div id="telafinal-precofinal">invalid</div>',
+        ],
+    )
+    def test_targeted_extraction_defers_to_soup(self, cost_parser, html):
+        """Test if markup the targeted scan does not recognize is left to BeautifulSoup"""
+        assert cost_parser.extract_price(html) is None
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from calculators.default_cost_calculator import DefaultCostCalculator
+from fetchers.cost_fetcher import CostFetcher
+from parsers.cost_parsers import CostParser
+from services.cost_service import CostService
+from utils import circuit_breaker
+from utils.cache import TTLCache
+
+
+class FakeCostFetcher(CostFetcher):
+    def __init__(self, prices: dict[str, str]) -> None:
+        super().__init__()
+        self.prices = prices
+        self.calls: list[str] = []
+
+    async def fetch(self, state: str) -> str:
+        self.calls.append(state)
+        await asyncio.sleep(0)
+        if state not in self.prices:
+            raise ValueError(f"No price for {state}")
+        return f'<div id="telafinal-precofinal">{self.prices[state]}</div>'
+
+
+@pytest.fixture
+def fetcher():
+    return FakeCostFetcher({"GO": "5,67", "SP": "5,89"})
+
+
+@pytest.fixture
+def cost_service(fetcher, clock):
+    cache = TTLCache(maxsize=27, ttl=60, clock=clock)
+    return CostService(DefaultCostCalculator(), CostParser(), fetcher, price_cache=cache)
+
+
+class TestFuelPriceCache:
+
+    def test_cold_cache_fetches_once(self, cost_service, fetcher):
+        """Concurrent lookups on a cold cache share a single upstream fetch"""
+
+        async def scenario():
+            return await asyncio.gather(*(cost_service.get_fuel_price("GO") for _ in range(5)))
+
+        prices = asyncio.run(scenario())
+        assert {price.price for price in prices} == {5.67}
+        assert fetcher.calls == ["GO"]
+        assert prices[0].source_url.endswith("/gasolina/GO")
+
+    def test_warm_cache_skips_fetch(self, cost_service, fetcher):
+        """A fresh cached price is served without calling the fetcher"""
+
+        async def scenario():
+            await cost_service.get_fuel_price("GO")
+            return await cost_service.get_fuel_price("GO")
+
+        assert asyncio.run(scenario()).price == 5.67
+        assert fetcher.calls == ["GO"]
+
+    def test_stale_price_served_while_refreshing(self, cost_service, fetcher, clock):
+        """A stale price is returned immediately and refreshed in the background"""
+
+        async def scenario():
+            await cost_service.get_fuel_price("GO")
+            fetcher.prices["GO"] = "6,01"
+            clock.now += 61
+            stale = await cost_service.get_fuel_price("GO")
+            await cost_service._refresh_fuel_price("GO")
+            fresh = await cost_service.get_fuel_price("GO")
+            return stale, fresh
+
+        stale, fresh = asyncio.run(scenario())
+        assert stale.price == 5.67
+        assert fresh.price == 6.01
+        assert not stale.degraded
+        assert fetcher.calls == ["GO", "GO"]
+
+    def test_last_known_price_marked_degraded_while_circuit_is_open(self, cost_service, clock, monkeypatch):
+        """With the Petrobras circuit open, the stale price is served as a degraded last known price"""
+        monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+        async def scenario():
+            await cost_service.get_fuel_price("GO")
+            clock.now += 61
+            breaker = circuit_breaker.circuit_breaker("petrobras")
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+            return await cost_service.get_fuel_price("GO")
+
+        price = asyncio.run(scenario())
+        assert price.price == 5.67
+        assert price.degraded
+        assert not cost_service.price_cache.lookup("GO").value.degraded
+
+    def test_prefetch_tolerates_failures(self, cost_service, fetcher):
+        """Prefetching warms every reachable state and skips the ones that fail"""
+        asyncio.run(cost_service.prefetch_fuel_prices(["GO", "SP", "XX"]))
+        assert "GO" in cost_service.price_cache
+        assert "SP" in cost_service.price_cache
+        assert "XX" not in cost_service.price_cache
+
+    def test_prefetch_skips_fresh_prices(self, cost_service, fetcher):
+        """Prefetching leaves states that already have a fresh price alone"""
+        asyncio.run(cost_service.prefetch_fuel_prices(["GO"]))
+        asyncio.run(cost_service.prefetch_fuel_prices(["GO", "SP"]))
+        assert fetcher.calls == ["GO", "SP"]
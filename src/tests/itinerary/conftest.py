@@ -0,0 +1,112 @@
+import asyncio
+from collections import Counter
+from typing import Any, Hashable
+
+import pytest
+
+from builders.tour_itinerary_builder import TourItineraryBuilder
+from config import settings
+from models.cost_models import FuelPrice
+from models.place_models import FindPlaceQueryParams, Location, PlaceInfo
+from models.route_models import Route, Transportation, TransportationMode
+from models.traffic_models import TrafficCondition
+from models.utils_models import Coordinates
+
+POLYLINE = "fhuoFbkajWnFwBuA`GsDeB"
+
+
+def place_query(text: str) -> FindPlaceQueryParams:
+    return FindPlaceQueryParams(**place_body(text))
+
+
+def place_body(text: str) -> dict[str, str]:
+    return {"text_input": text, "inputtype": "textquery"}
+
+
+def tour_body(place_a: str = "A", place_b: str = "B", **fields: Any) -> dict[str, Any]:
+    return {"place_a": place_body(place_a), "place_b": place_body(place_b), "transportation_method": "CAR", **fields}
+
+
+class FakeStages:
+    """Stands in for the place, route, traffic and fuel price lookups of a `TourItineraryBuilder`.
+
+    Every lookup can be delayed (`delays`) or made to fail (`errors`), by stage or lookup key. Calls, the peak number
+    of concurrent calls and cancellations are recorded per stage.
+    """
+
+    def __init__(self, builder: TourItineraryBuilder) -> None:
+        self.calls: Counter[Hashable] = Counter()
+        self.delays: dict[Hashable, float] = {}
+        self.errors: dict[Hashable, Exception] = {}
+        self.cancelled: list[str] = []
+        self.in_flight: Counter[str] = Counter()
+        self.peak: Counter[str] = Counter()
+        builder.place_builder.build = self.place  # type: ignore[method-assign]
+        builder.route_builder.build = self.route  # type: ignore[method-assign]
+        builder.traffic_builder.build = self.traffic  # type: ignore[method-assign]
+        builder.cost_builder.get_fuel_price = self.fuel_price  # type: ignore[method-assign]
+
+    async def _run(self, stage: str, key: Hashable) -> None:
+        self.calls[key] += 1
+        self.in_flight[stage] += 1
+        self.peak[stage] = max(self.peak[stage], self.in_flight[stage])
+        try:
+            await asyncio.sleep(self.delays.get(key, self.delays.get(stage, 0)))
+        except asyncio.CancelledError:
+            self.cancelled.append(stage)
+            raise
+        finally:
+            self.in_flight[stage] -= 1
+        error = self.errors.get(key) or self.errors.get(stage)
+        if error is not None:
+            raise error
+
+    async def place(self, rich_details: bool = False, **query: Any) -> PlaceInfo:
+        name = query["text_input"]
+        await self._run("place", ("place", name))
+        coordinates = Coordinates(latitude=-16.68, longitude=-49.26)
+        return PlaceInfo(place_id=f"id-{name}", name=name, location=Location(coordinates=coordinates), ratings_total=0)
+
+    async def route(self, origin: str, destination: str, mode: TransportationMode) -> Route:
+        await self._run("route", ("route", origin, destination))
+        return Route(
+            origin=Coordinates(latitude=-16.68, longitude=-49.26),
+            destination=Coordinates(latitude=-16.71, longitude=-49.24),
+            polyline=POLYLINE,
+            duration=780,
+            distance=5.2,
+            transportation=Transportation(mode=mode),
+        )
+
+    async def traffic(self, polyline: str, transportation_method: TransportationMode) -> TrafficCondition:
+        await self._run("traffic", "traffic")
+        return TrafficCondition()
+
+    async def fuel_price(self, state: str) -> FuelPrice:
+        await self._run("fuel_price", "fuel_price")
+        return FuelPrice(state=state, price=5.67)
+
+
+@pytest.fixture
+def tour_builder() -> TourItineraryBuilder:
+    return TourItineraryBuilder()
+
+
+@pytest.fixture
+def stages(tour_builder) -> FakeStages:
+    return FakeStages(tour_builder)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """A client of the app whose builder runs `FakeStages` instead of calling the upstreams."""
+    from fastapi.testclient import TestClient
+
+    from server import app
+
+    monkeypatch.setattr(settings, "warmup_connections", False)
+    monkeypatch.setattr(settings, "fuel_price_prefetch", False)
+    monkeypatch.setattr(settings, "persistent_cache_path", None)
+    with TestClient(app) as client:
+        client.stages = FakeStages(app.state.tour_builder)
+        yield client
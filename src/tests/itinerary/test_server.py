@@ -0,0 +1,160 @@
+import asyncio
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from config import settings
+from models.cost_models import BRAZILIAN_STATES
+from models.route_models import TransportationMode
+from server import _stream_events, app, lifespan
+from utils.circuit_breaker import CircuitOpenError
+
+from .conftest import place_query, tour_body
+
+
+class TestBuildTour:
+
+    def test_itinerary(self, client):
+        response = client.post("/travel/", json=tour_body())
+
+        assert response.status_code == 200
+        assert response.json()["degraded"] is False
+
+    def test_deadline_exceeded_is_a_gateway_timeout(self, client):
+        client.stages.delays["route"] = 5
+
+        response = client.post("/travel/", json=tour_body(deadline_seconds=0.05))
+
+        assert response.status_code == 504
+        assert client.stages.cancelled == ["route"]
+
+
+def stream_events(response):
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+class TestStreamTour:
+
+    def test_events_in_stage_order(self, client):
+        with client.stream("POST", "/travel/stream", json=tour_body()) as response:
+            events = [event["event"] for event in stream_events(response)]
+
+        assert response.status_code == 200
+        assert sorted(events[:2]) == ["end_point", "start_point"]
+        assert events[2:] == ["route", "traffic", "cost_estimate", "itinerary"]
+
+    def test_error_event_after_failed_stage(self, client):
+        client.stages.errors["route"] = ValueError("No route found")
+
+        with client.stream("POST", "/travel/stream", json=tour_body()) as response:
+            events = stream_events(response)
+
+        assert [event["event"] for event in events[2:]] == ["error"]
+        assert events[-1]["detail"] == "No route found"
+
+    def test_closing_the_events_cancels_the_build(self, tour_builder, stages):
+        """What the response does when the client disconnects: the build behind the stream is cancelled"""
+        stages.delays["route"] = 5
+
+        async def scenario():
+            events = _stream_events(
+                tour_builder.build_stream(place_query("A"), place_query("B"), TransportationMode.CAR)
+            )
+            first = json.loads(await anext(events))
+            await events.aclose()
+            # Checked before the loop shuts down, which would close the abandoned stages anyway.
+            return first, list(stages.cancelled)
+
+        first, cancelled = asyncio.run(scenario())
+        assert first["event"] in ("start_point", "end_point")
+        assert cancelled == ["route"]
+
+
+class TestBuildTourBatch:
+
+    def test_items_in_order_with_their_own_errors(self, client):
+        client.stages.errors[("place", "X")] = ValueError("No places found!")
+
+        response = client.post("/travel/batch", json=[tour_body("A", "B"), tour_body("A", "X"), tour_body("A", "B")])
+
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert [(item["index"], item["error"]) for item in items] == [(0, None), (1, "No places found!"), (2, None)]
+        assert client.stages.calls[("route", "id-A", "id-B")] == 1
+
+
+class TestErrorStatus:
+    """The single, batch and streaming endpoints report an unavailable upstream and a missed deadline alike"""
+
+    def test_unavailable_upstream(self, client):
+        client.stages.errors["route"] = CircuitOpenError("google_routes", retry_after=11.2)
+
+        single = client.post("/travel/", json=tour_body())
+        item = client.post("/travel/batch", json=[tour_body()]).json()["items"][0]
+        with client.stream("POST", "/travel/stream", json=tour_body()) as response:
+            error = stream_events(response)[-1]
+
+        assert single.status_code == 503 and single.headers["Retry-After"] == "12"
+        assert (item["status"], item["retry_after"]) == (503, 12)
+        assert (error["event"], error["status"], error["retry_after"]) == ("error", 503, 12)
+
+    def test_deadline_exceeded(self, client):
+        client.stages.delays["route"] = 5
+        body = tour_body(deadline_seconds=0.05)
+
+        single = client.post("/travel/", json=body)
+        item = client.post("/travel/batch", json=[body]).json()["items"][0]
+        with client.stream("POST", "/travel/stream", json=body) as response:
+            error = stream_events(response)[-1]
+
+        assert single.status_code == 504 and "Retry-After" not in single.headers
+        assert (item["status"], item["retry_after"]) == (504, None)
+        assert (error["event"], error["status"], error["retry_after"]) == ("error", 504, None)
+
+    def test_other_errors(self, client):
+        client.stages.errors["route"] = ValueError("No route found")
+
+        item = client.post("/travel/batch", json=[tour_body()]).json()["items"][0]
+
+        assert client.post("/travel/", json=tour_body()).status_code == 500
+        assert (item["error"], item["status"]) == ("No route found", 500)
+
+
+class TestLifespan:
+
+    def test_startup_warms_connections_and_prefetches_fuel_prices(self, monkeypatch):
+        """Startup opens a connection to every upstream and fills the fuel price cache before serving"""
+        requests: list[tuple[str, str]] = []
+
+        async def handler(request: web.Request) -> web.Response:
+            requests.append((request.method, request.path))
+            return web.Response(text='<div id="telafinal-precofinal">5,67</div>', content_type="text/html")
+
+        upstream = web.Application()
+        upstream.router.add_route("*", "/{tail:.*}", handler)
+
+        async def scenario():
+            async with TestServer(upstream) as server:
+                for name, path in [
+                    ("google_places_url", "/places"),
+                    ("google_routes_url", "/routes"),
+                    ("tomtom_url", "/tomtom"),
+                    ("petrobras_fuel_url", "/fuel/"),
+                ]:
+                    monkeypatch.setattr(settings, name, str(server.make_url(path)))
+                async with lifespan(app):
+                    price_cache = app.state.tour_builder.cost_builder.cost_service.price_cache
+                    return sorted(requests), {state: price_cache.get(state) for state in BRAZILIAN_STATES}
+
+        monkeypatch.setattr(settings, "warmup_connections", True)
+        monkeypatch.setattr(settings, "fuel_price_prefetch", True)
+        monkeypatch.setattr(settings, "persistent_cache_path", None)
+        served, prices = asyncio.run(scenario())
+
+        warmed = [path for method, path in served if method == "HEAD"]
+        assert warmed == ["/fuel/", "/places", "/routes", "/tomtom"]
+        assert sorted(path for method, path in served if method == "GET") == [
+            f"/fuel/{state}" for state in sorted(BRAZILIAN_STATES)
+        ]
+        assert all(price is not None and price.price == 5.67 for price in prices.values())
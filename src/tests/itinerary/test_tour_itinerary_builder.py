@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+
+from config import settings
+from models.route_models import TransportationMode
+from models.tour_itinerary_models import TourRequest
+from utils.deadline import DeadlineExceededError
+from utils.resilience import start_request_retries, try_spend_retry
+
+from .conftest import place_query
+
+
+def build(tour_builder, deadline_seconds=None, place_a="A", place_b="B"):
+    return tour_builder.build(
+        place_query(place_a), place_query(place_b), TransportationMode.CAR, deadline_seconds=deadline_seconds
+    )
+
+
+class TestDeadline:
+
+    def test_traffic_skipped_when_budget_is_short(self, tour_builder, stages, monkeypatch):
+        """With less than the traffic minimum budget left, traffic is not called and the impact is neutral"""
+        monkeypatch.setattr(settings, "traffic_min_budget_seconds", 2.0)
+        itinerary = asyncio.run(build(tour_builder, deadline_seconds=1.0))
+
+        assert stages.calls["traffic"] == 0
+        assert itinerary.degraded
+        assert itinerary.degraded_stages == ["traffic"]
+
+    def test_slow_traffic_abandoned_before_the_deadline(self, tour_builder, stages, monkeypatch):
+        """Traffic still running when only the reserve is left is cancelled; the itinerary is built without it"""
+        monkeypatch.setattr(settings, "traffic_min_budget_seconds", 0.1)
+        monkeypatch.setattr(settings, "traffic_reserved_seconds", 0.2)
+        stages.delays["traffic"] = 5
+
+        itinerary = asyncio.run(build(tour_builder, deadline_seconds=0.4))
+
+        assert stages.cancelled == ["traffic"]
+        assert itinerary.degraded_stages == ["traffic"]
+        assert itinerary.cost_estimate.estimated_cost > 0
+
+    def test_deadline_cancels_required_stages(self, tour_builder, stages):
+        stages.delays["route"] = 5
+
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(build(tour_builder, deadline_seconds=0.05))
+        assert stages.cancelled == ["route"]
+
+
+async def collect(stream, limit=None):
+    events = []
+    async for stage, _ in stream:
+        events.append(stage)
+        if len(events) == limit:
+            break
+    return events
+
+
+class TestBuildStream:
+
+    def test_stages_in_dependency_order(self, tour_builder, stages):
+        stream = tour_builder.build_stream(place_query("A"), place_query("B"), TransportationMode.CAR)
+
+        events = asyncio.run(collect(stream))
+
+        assert sorted(events[:2]) == ["end_point", "start_point"]
+        assert events[2:] == ["route", "traffic", "cost_estimate", "itinerary"]
+
+    def test_error_raised_after_completed_stages(self, tour_builder, stages):
+        stages.errors["route"] = ValueError("No route found")
+        events = []
+
+        async def scenario():
+            stream = tour_builder.build_stream(place_query("A"), place_query("B"), TransportationMode.CAR)
+            async for stage, _ in stream:
+                events.append(stage)
+
+        with pytest.raises(ValueError, match="No route found"):
+            asyncio.run(scenario())
+        assert sorted(events) == ["end_point", "start_point"]
+
+    def test_closing_early_cancels_the_build(self, tour_builder, stages):
+        stages.delays["route"] = 5
+
+        async def scenario():
+            stream = tour_builder.build_stream(place_query("A"), place_query("B"), TransportationMode.CAR)
+            events = await collect(stream, limit=2)
+            await stream.aclose()
+            return events, list(stages.cancelled)
+
+        events, cancelled = asyncio.run(scenario())
+        assert len(events) == 2
+        assert cancelled == ["route"]
+
+
+def tour_request(place_a, place_b):
+    return TourRequest(place_a=place_query(place_a), place_b=place_query(place_b), transportation_method="CAR")
+
+
+class TestBuildBatch:
+
+    def test_shared_lookups_resolved_once(self, tour_builder, stages):
+        requests = [tour_request("A", "B"), tour_request("A", "B"), tour_request("B", "C")]
+
+        response = asyncio.run(tour_builder.build_batch(requests))
+
+        assert all(item.itinerary is not None for item in response.items)
+        assert [stages.calls[("place", name)] for name in "ABC"] == [1, 1, 1]
+        assert stages.calls[("route", "id-A", "id-B")] == 1
+        assert stages.calls[("route", "id-B", "id-C")] == 1
+
+    def test_failing_item_reports_its_own_error(self, tour_builder, stages):
+        stages.errors[("place", "X")] = ValueError("No places found!")
+        requests = [tour_request("A", "B"), tour_request("A", "X"), tour_request("B", "C")]
+
+        items = asyncio.run(tour_builder.build_batch(requests)).items
+
+        assert [item.error for item in items] == [None, "No places found!", None]
+        assert items[0].itinerary is not None and items[2].itinerary is not None
+        assert items[1].itinerary is None
+
+    def test_items_in_request_order(self, tour_builder, stages):
+        stages.delays[("place", "A")] = 0.05
+        requests = [tour_request("A", "B"), tour_request("C", "D"), tour_request("E", "F")]
+
+        items = asyncio.run(tour_builder.build_batch(requests)).items
+
+        assert [item.index for item in items] == [0, 1, 2]
+        assert [item.itinerary.start_point.name for item in items] == ["A", "C", "E"]
+
+    def test_concurrency_is_bounded(self, tour_builder, stages, monkeypatch):
+        monkeypatch.setattr(settings, "batch_max_concurrency", 2)
+        stages.delays["route"] = 0.02
+        requests = [tour_request(f"A{i}", f"B{i}") for i in range(6)]
+
+        asyncio.run(tour_builder.build_batch(requests))
+
+        assert stages.peak["route"] == 2
+
+    def test_each_item_gets_its_own_retry_allowance(self, tour_builder, stages, monkeypatch):
+        """Items do not share the allowance of the HTTP request that carried the batch"""
+        monkeypatch.setattr(settings, "upstream_retries_per_request", 2)
+        monkeypatch.setattr(settings, "upstream_retry_burst", 100.0)
+        retries: list[int] = []
+        traffic = stages.traffic
+
+        async def spending_traffic(*args, **kwargs):
+            spent = 0
+            while try_spend_retry("batch_item_retries_test"):
+                spent += 1
+            retries.append(spent)
+            return await traffic(*args, **kwargs)
+
+        tour_builder.traffic_builder.build = spending_traffic
+
+        async def scenario():
+            start_request_retries(settings.upstream_retries_per_request)
+            await tour_builder.build_batch([tour_request(f"A{i}", f"B{i}") for i in range(3)])
+
+        asyncio.run(scenario())
+
+        assert retries == [2, 2, 2]
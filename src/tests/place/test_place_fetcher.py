@@ -0,0 +1,48 @@
+import asyncio
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from fetchers.place_fetcher import BASIC_FIELDS, RICH_FIELDS, PlaceFetcher
+from models.place_models import FindPlaceQueryParams, TextSearchQueryParams
+
+
+class RecordingPlaceFetcher(PlaceFetcher):
+    async def _request(self, method, url, upstream=None, **kwargs) -> str:
+        self.url = url
+        return '{"candidates": []}'
+
+
+def requested_query(rich_details: bool = False, **params) -> dict[str, list[str]]:
+    query = FindPlaceQueryParams(text_input="Bosque dos Buritis", inputtype="textquery", api_key="key", **params)
+    return request(query, "findplacefromtext", rich_details)
+
+
+def request(query, query_type: str, rich_details: bool = False) -> dict[str, list[str]]:
+    fetcher = RecordingPlaceFetcher()
+    query.query_type = query_type  # type: ignore
+    asyncio.run(fetcher.fetch(query, rich_details=rich_details))
+    return parse_qs(urlsplit(fetcher.url).query)
+
+
+@pytest.mark.parametrize("rich_details, fields", [(False, BASIC_FIELDS), (True, RICH_FIELDS)])
+def test_field_mask(rich_details, fields) -> None:
+    query = requested_query(rich_details)
+
+    assert query["fields"] == [fields]
+    assert query["input"] == ["Bosque dos Buritis"]
+    assert query["key"] == ["key"]
+
+
+def test_query_fields_take_precedence() -> None:
+    assert requested_query(fields="name,geometry")["fields"] == ["name,geometry"]
+
+
+@pytest.mark.parametrize("rich_details", [False, True])
+def test_no_field_mask_where_places_ignores_it(rich_details) -> None:
+    query = TextSearchQueryParams(query="Bosque dos Buritis", radius=500, api_key="key")  # type: ignore
+
+    params = request(query, "textsearch", rich_details)
+
+    assert "fields" not in params
+    assert params["query"] == ["Bosque dos Buritis"]
@@ -163,3 +163,26 @@ class TestPlaceParser:
             "Tuesday": "Closed",
             "Wednesday": "Closed",
         }
+
+    def test_parse_first_matches_parse(self, valid_textsearch_response):
+        """Tests that the first-result parse builds the same place as the full parse"""
+        assert (
+            PlaceParser.parse_first(valid_textsearch_response, "textsearch")
+            == PlaceParser.parse(valid_textsearch_response, "textsearch")[0]
+        )
+
+    def test_parse_first_empty_results(self):
+        """Tests that the first-result parse returns None when there are no results"""
+        assert PlaceParser.parse_first("""{"candidates": []}""", "findplacefromtext") is None
+
+    def test_parse_first_ignores_other_results(self):
+        """Tests that results after the first one are not built"""
+        response = """{
+        "results": [
+            {"place_id": "first", "geometry": {"location": {"lat": 1.0, "lng": 2.0}}},
+            {"place_id": "second", "reviews": [{"author_url": "not a url"}]}
+        ]
+    }"""
+        with pytest.raises(ValueError):
+            PlaceParser.parse(response, "textsearch")
+        assert PlaceParser.parse_first(response, "textsearch").place_id == "first"
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from fetchers.place_fetcher import PlaceFetcher
+from models.place_models import FindPlaceQueryParams, NearbySearchQueryParams
+from parsers.place_parsers import PlaceParser
+from services.place_service import PlaceService
+
+
+class FakePlaceFetcher(PlaceFetcher):
+    def __init__(self, candidates: list[dict]) -> None:
+        super().__init__()
+        self.candidates = candidates
+        self.calls = 0
+
+    async def fetch(self, params, rich_details: bool = False) -> str:
+        self.calls += 1
+        self.rich_details = rich_details
+        key = "candidates" if params.query_type == "findplacefromtext" else "results"
+        return json.dumps({key: self.candidates})
+
+
+@pytest.fixture
+def candidate():
+    return {
+        "place_id": "ChIJ-palacio",
+        "name": "Palácio Pedro Ludovico",
+        "geometry": {"location": {"lat": -16.6799, "lng": -49.2556}},
+    }
+
+
+@pytest.fixture
+def fetcher(candidate):
+    return FakePlaceFetcher([candidate])
+
+
+@pytest.fixture
+def place_service(fetcher):
+    return PlaceService(fetcher, PlaceParser())
+
+
+class TestPlaceCache:
+
+    def test_repeated_query_hits_cache(self, place_service, fetcher):
+        """Queries that only differ in case, accents and spacing share a cache entry"""
+        queries = [
+            FindPlaceQueryParams(text_input="Palácio Pedro Ludovico", inputtype="textquery"),
+            FindPlaceQueryParams(text_input="  palacio pedro  LUDOVICO", inputtype="textquery"),
+        ]
+
+        async def scenario():
+            return [await place_service.fetch_places(query) for query in queries]
+
+        first, second = asyncio.run(scenario())
+        assert first.place_id == second.place_id == "ChIJ-palacio"
+        assert fetcher.calls == 1
+        assert place_service.place_cache.stats.hits == 1
+
+    def test_rich_details_are_cached_apart(self, place_service, fetcher):
+        """Rich and basic lookups of the same query do not share a cache entry"""
+        query = FindPlaceQueryParams(text_input="Palácio Pedro Ludovico", inputtype="textquery")
+
+        async def scenario():
+            await place_service.fetch_places(query)
+            await place_service.fetch_places(query, rich_details=True)
+            await place_service.fetch_places(query, rich_details=True)
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 2
+        assert fetcher.rich_details is True
+
+    def test_rich_details_share_the_entry_where_places_ignores_the_field_mask(self, place_service, fetcher):
+        """Nearby Search answers rich and basic lookups alike, so they share a cache entry"""
+        query = NearbySearchQueryParams(location={"latitude": -16.6869, "longitude": -49.2648}, radius=1000)
+
+        async def scenario():
+            await place_service.fetch_places(query)
+            await place_service.fetch_places(query, rich_details=True)
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 1
+
+    def test_concurrent_queries_share_one_fetch(self, place_service, fetcher):
+        """Identical lookups in flight at the same time are sent upstream once"""
+        query = FindPlaceQueryParams(text_input="Palácio Pedro Ludovico", inputtype="textquery")
+
+        async def scenario():
+            return await asyncio.gather(*(place_service.fetch_places(query) for _ in range(5)))
+
+        places = asyncio.run(scenario())
+        assert {place.place_id for place in places} == {"ChIJ-palacio"}
+        assert fetcher.calls == 1
+
+    def test_nearby_location_and_radius_rounding(self, place_service, fetcher):
+        """Nearby locations within the rounding precision and similar radii share a cache entry"""
+        queries = [
+            NearbySearchQueryParams(location={"latitude": -16.68691, "longitude": -49.26481}, radius=1000),
+            NearbySearchQueryParams(location={"latitude": -16.68689, "longitude": -49.26479}, radius=1020),
+        ]
+
+        async def scenario():
+            for query in queries:
+                await place_service.fetch_places(query)
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 1
+
+    def test_different_queries_miss(self, place_service, fetcher):
+        """Different texts are cached separately"""
+        queries = [
+            FindPlaceQueryParams(text_input="Palácio Pedro Ludovico", inputtype="textquery"),
+            FindPlaceQueryParams(text_input="Goiania Shopping", inputtype="textquery"),
+        ]
+
+        async def scenario():
+            for query in queries:
+                await place_service.fetch_places(query)
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 2
+
+    def test_no_places_found_is_cached(self, place_service, fetcher):
+        """Empty results are cached and raise again without calling the API"""
+        fetcher.candidates = []
+        query = FindPlaceQueryParams(text_input="Lugar Inexistente", inputtype="textquery")
+
+        for _ in range(2):
+            with pytest.raises(Exception, match="No places found!"):
+                asyncio.run(place_service.fetch_places(query))
+        assert fetcher.calls == 1
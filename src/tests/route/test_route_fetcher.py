@@ -0,0 +1,22 @@
+import pytest
+
+from fetchers.route_fetcher import RouteFetcher
+from models.route_models import TransportationMode
+
+
+@pytest.mark.parametrize(
+    "mode, included, excluded",
+    [
+        (TransportationMode.CAR, "routes.travelAdvisory.fuelConsumptionMicroliters", "transitFare"),
+        (TransportationMode.BUS, "routes.travelAdvisory.transitFare", "fuelConsumptionMicroliters"),
+        (TransportationMode.WALK, "routes.legs.endLocation", "travelAdvisory"),
+    ],
+)
+def test_field_mask_only_requests_parsed_fields(mode, included, excluded) -> None:
+    fields = RouteFetcher()._field_mask(mode).split(",")
+
+    assert "routes.polyline.encodedPolyline" in fields
+    assert "routes.legs.startLocation" in fields
+    assert "routes.legs" not in fields
+    assert included in fields
+    assert not any(excluded in field for field in fields)
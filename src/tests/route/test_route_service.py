@@ -0,0 +1,123 @@
+import asyncio
+import json
+
+import pendulum
+import pytest
+
+from fetchers.route_fetcher import RouteFetcher
+from models.route_models import RouteQueryParams, TransportationMode
+from parsers.route_parsers import RouteParser
+from services.route_service import RouteService
+from utils.persistent_cache import PersistentCache
+
+
+class FakeRouteFetcher(RouteFetcher):
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+
+    async def fetch(self, params: RouteQueryParams) -> str:
+        self.calls += 1
+        return json.dumps(
+            {
+                "routes": [
+                    {
+                        "legs": [
+                            {
+                                "startLocation": {"latLng": {"latitude": -16.6799, "longitude": -49.2556}},
+                                "endLocation": {"latLng": {"latitude": -16.7104, "longitude": -49.2396}},
+                            }
+                        ],
+                        "distanceMeters": 5200,
+                        "duration": "780s",
+                        "polyline": {"encodedPolyline": "fhuoFbkajWnFwBuA`GsDeB"},
+                    }
+                ]
+            }
+        )
+
+
+@pytest.fixture
+def fetcher():
+    return FakeRouteFetcher()
+
+
+@pytest.fixture
+def route_service(fetcher):
+    return RouteService(fetcher, RouteParser())
+
+
+def route_params(mode=TransportationMode.CAR, **kwargs) -> RouteQueryParams:
+    return RouteQueryParams(origin="ChIJ-origin", destination="ChIJ-destination", mode=mode, **kwargs)  # type: ignore
+
+
+class TestRouteCache:
+
+    def test_same_bucket_hits_cache(self, route_service, fetcher):
+        departure = pendulum.now().add(days=1).start_of("hour")
+
+        async def scenario():
+            await route_service.get_route(route_params(depart_at=departure))
+            await route_service.get_route(route_params(depart_at=departure.add(minutes=5)))
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 1
+        assert route_service.route_cache.stats.hits == 1
+
+    def test_concurrent_requests_share_one_fetch(self, route_service, fetcher):
+        departure = pendulum.now().add(days=1).start_of("hour")
+
+        async def scenario():
+            return await asyncio.gather(*(route_service.get_route(route_params(depart_at=departure)) for _ in range(5)))
+
+        routes = asyncio.run(scenario())
+        assert all(route == routes[0] for route in routes)
+        assert fetcher.calls == 1
+
+    def test_different_bucket_misses(self, route_service, fetcher):
+        departure = pendulum.now().add(days=1).start_of("hour")
+
+        async def scenario():
+            await route_service.get_route(route_params(depart_at=departure))
+            await route_service.get_route(route_params(depart_at=departure.add(hours=2)))
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 2
+
+    @pytest.mark.parametrize("other_mode", [TransportationMode.WALK, TransportationMode.BIKE])
+    def test_mode_is_part_of_key(self, route_service, fetcher, other_mode):
+        async def scenario():
+            await route_service.get_route(route_params())
+            await route_service.get_route(route_params(mode=other_mode))
+
+        asyncio.run(scenario())
+        assert fetcher.calls == 2
+
+    def test_walk_and_bike_use_longer_buckets(self, route_service):
+        departure = pendulum.now("UTC").add(days=1).start_of("day").add(hours=8)
+        later = departure.add(hours=3)
+        assert route_service.cache_key(route_params(TransportationMode.WALK, depart_at=departure)) == (
+            route_service.cache_key(route_params(TransportationMode.WALK, depart_at=later))
+        )
+        assert route_service.cache_key(route_params(TransportationMode.CAR, depart_at=departure)) != (
+            route_service.cache_key(route_params(TransportationMode.CAR, depart_at=later))
+        )
+
+
+def test_route_stored_by_one_worker_is_served_to_another(tmp_path):
+    store = PersistentCache(str(tmp_path / "cache.sqlite3"), max_entries=100)
+    first_fetcher, second_fetcher = FakeRouteFetcher(), FakeRouteFetcher()
+    first = RouteService(first_fetcher, RouteParser(), persistent_cache=store)
+    second = RouteService(second_fetcher, RouteParser(), persistent_cache=store)
+    departure = pendulum.now().add(days=1).start_of("hour")
+
+    async def scenario():
+        return (
+            await first.get_route(route_params(depart_at=departure)),
+            await second.get_route(route_params(depart_at=departure)),
+        )
+
+    stored, loaded = asyncio.run(scenario())
+    store.close()
+    assert loaded == stored
+    assert (first_fetcher.calls, second_fetcher.calls) == (1, 0)
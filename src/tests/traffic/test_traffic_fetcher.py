@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from typing import Any, Optional
+
+import aiohttp
+
+from config import settings
+from fetchers.traffic_fetcher import TrafficFetcher
+from models.route_models import TransportationMode
+from models.traffic_models import TrafficQueryParams
+from models.utils_models import Coordinates
+
+
+class FakeTrafficFetcher(TrafficFetcher):
+    """Answers incidents and flow requests locally, failing the flow request of every other point."""
+
+    def __init__(self) -> None:
+        super().__init__(sample_spacing_meters=1.0, max_samples=4)
+        self.flow_requests = 0
+
+    async def _fetch_data(self, url: str, params: Optional[dict] = None, upstream: Optional[str] = None) -> Any:
+        if upstream == self.INCIDENTS_UPSTREAM:
+            return {"incidents": []}
+        self.flow_requests += 1
+        if self.flow_requests % 2 == 0:
+            raise aiohttp.ClientConnectionError("connection reset")
+        return {"flowSegmentData": {"frc": "FRC3", "point": url.rsplit("=", 1)[-1]}}
+
+
+def test_failed_flow_samples_are_marked_as_none() -> None:
+    fetcher = FakeTrafficFetcher()
+    params = TrafficQueryParams(
+        polyline="_p~iF~ps|U_ulLnnqC_mqNvxq`@", transportation_method=TransportationMode.CAR, api_key="key"
+    )
+
+    response = asyncio.run(fetcher.fetch(params))
+
+    assert response.incidents == {"incidents": []}
+    assert len(response.flow_segments) == fetcher.flow_requests == 2
+    assert sum(segment is None for segment in response.flow_segments) == 1
+    assert all(segment is None or segment["flowSegmentData"]["frc"] == "FRC3" for segment in response.flow_segments)
+
+
+def test_long_routes_are_simplified_in_a_worker_thread(monkeypatch) -> None:
+    threads: list[threading.Thread] = []
+
+    class RecordingFetcher(FakeTrafficFetcher):
+        @staticmethod
+        def _route_points(polyline: str, tolerance_meters: float) -> tuple[list[float], list[float]]:
+            threads.append(threading.current_thread())
+            return TrafficFetcher._route_points(polyline, tolerance_meters)
+
+    polyline = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    params = TrafficQueryParams(polyline=polyline, transportation_method=TransportationMode.CAR, api_key="key")
+    monkeypatch.setattr(settings, "traffic_simplify_thread_min_chars", len(polyline) + 1)
+    asyncio.run(RecordingFetcher().fetch(params))
+    monkeypatch.setattr(settings, "traffic_simplify_thread_min_chars", len(polyline))
+    asyncio.run(RecordingFetcher().fetch(params))
+
+    assert threads[0] is threading.main_thread()
+    assert threads[1] is not threading.main_thread()
+
+
+class FakeIncidentFetcher(TrafficFetcher):
+    """Answers every incident tile with an incident at its south-west corner, one at its center and one shared by
+    all tiles."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tiles: list[str] = []
+
+    async def _fetch_data(self, url: str, params: Optional[dict] = None, upstream: Optional[str] = None) -> Any:
+        assert params is not None and upstream == self.INCIDENTS_UPSTREAM
+        self.tiles.append(params["bbox"])
+        min_lon, min_lat, max_lon, max_lat = map(float, params["bbox"].split(","))
+        center = [round((min_lon + max_lon) / 2, 6), round((min_lat + max_lat) / 2, 6)]
+        return {
+            "incidents": [
+                {"geometry": {"type": "Point", "coordinates": [min_lon, min_lat]}, "properties": {"id": "corner"}},
+                {"geometry": {"type": "Point", "coordinates": center}, "properties": {"id": f"center {center}"}},
+                {"geometry": {"type": "Point", "coordinates": [-49.25, -16.6]}, "properties": {"id": "shared"}},
+            ]
+        }
+
+
+def test_incidents_are_fetched_per_tile_and_matched_locally() -> None:
+    fetcher = FakeIncidentFetcher()
+    # ~33 km heading north through the middle of a column of 0.1 degree tiles.
+    latitudes = [-16.75 + i * 0.01 for i in range(31)]
+    longitudes = [-49.25] * 31
+
+    incidents = asyncio.run(fetcher._fetch_incidents("key", latitudes, longitudes))["incidents"]
+
+    assert fetcher.tiles == [
+        "-49.3,-16.8,-49.2,-16.7",
+        "-49.3,-16.7,-49.2,-16.6",
+        "-49.3,-16.6,-49.2,-16.5",
+        "-49.3,-16.5,-49.2,-16.4",
+    ]
+    # Tile corners are ~5 km off the route and are left out; the shared incident is kept once.
+    assert [incident["properties"]["id"] for incident in incidents] == [
+        "center [-49.25, -16.75]",
+        "shared",
+        "center [-49.25, -16.65]",
+        "center [-49.25, -16.55]",
+        "center [-49.25, -16.45]",
+    ]
+
+    asyncio.run(fetcher._fetch_incidents("key", latitudes[:10], longitudes[:10]))
+    assert len(fetcher.tiles) == 4
+    assert fetcher.incident_tile_cache.stats.hits == 2
+
+
+class FakeFlowFetcher(TrafficFetcher):
+    """Answers every flow request with a ~440 m segment heading north-east from the queried point."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.flow_requests = 0
+
+    async def _fetch_data(self, url: str, params: Optional[dict] = None, upstream: Optional[str] = None) -> Any:
+        self.flow_requests += 1
+        latitude, longitude = map(float, url.rsplit("=", 1)[-1].split(","))
+        coordinates = [{"latitude": latitude + i * 0.001, "longitude": longitude + i * 0.001} for i in range(4)]
+        return {"flowSegmentData": {"frc": "FRC2", "coordinates": {"coordinate": coordinates}}}
+
+
+def test_points_on_a_cached_flow_segment_are_answered_locally() -> None:
+    fetcher = FakeFlowFetcher()
+    url = fetcher.BASE_URL.format(api_key="key")
+
+    async def scenario():
+        first = await fetcher._fetch_traffic_data(url, [Coordinates(latitude=-16.68, longitude=-49.256)])
+        nearby = await fetcher._fetch_traffic_data(url, [Coordinates(latitude=-16.6785, longitude=-49.2545)])
+        elsewhere = await fetcher._fetch_traffic_data(url, [Coordinates(latitude=-16.70, longitude=-49.256)])
+        return first, nearby, elsewhere
+
+    first, nearby, elsewhere = asyncio.run(scenario())
+    assert nearby == first
+    assert elsewhere != first
+    assert fetcher.flow_requests == 2
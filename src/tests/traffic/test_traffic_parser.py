@@ -0,0 +1,79 @@
+import pytest
+
+from models.traffic_models import IncidentType, RoadType, TrafficResponse
+from parsers.traffic_parser import TrafficParser
+
+
+def flow_segment(frc: str = "FRC2", current_speed: int = 38) -> dict:
+    return {
+        "flowSegmentData": {
+            "frc": frc,
+            "currentSpeed": current_speed,
+            "freeFlowSpeed": 52,
+            "currentTravelTime": 74,
+            "freeFlowTravelTime": 54,
+            "confidence": 0.97,
+            "roadClosure": False,
+            "coordinates": {
+                "coordinate": [
+                    {"latitude": -16.6799, "longitude": -49.2556},
+                    {"latitude": -16.6812, "longitude": -49.2577},
+                ]
+            },
+        }
+    }
+
+
+@pytest.fixture
+def response() -> TrafficResponse:
+    return TrafficResponse(
+        incidents={
+            "incidents": [
+                {
+                    "geometry": {"type": "LineString", "coordinates": [[-49.26, -16.68], [-49.27, -16.69]]},
+                    "properties": {"iconCategory": 6},
+                }
+            ]
+        },
+        flow_segments=[flow_segment(), None, flow_segment("FRC0", 90)],
+    )
+
+
+def test_parse_skips_failed_flow_samples(response):
+    traffic_condition = TrafficParser.parse(response)
+
+    assert [segment.road_type for segment in traffic_condition.flow_segments] == [RoadType.PRIMARY, RoadType.MOTORWAY]
+    assert traffic_condition.flow_segments[1].current_speed == 90
+
+
+def test_parse_flow_segment_fields(response):
+    segment = TrafficParser.parse(response).flow_segments[0]
+
+    assert segment.frc == "FRC2"
+    assert segment.free_flow_travel_time == 54
+    assert (segment.start_point.latitude, segment.start_point.longitude) == (-16.6799, -49.2556)
+    assert (segment.end_point.latitude, segment.end_point.longitude) == (-16.6812, -49.2577)
+
+
+def test_parse_incidents(response):
+    incidents = TrafficParser.parse(response).incidents
+
+    assert [incident.type for incident in incidents] == [IncidentType.CONGESTION]
+    assert incidents[0].icon_category == 6
+    assert (incidents[0].coordinates.latitude, incidents[0].coordinates.longitude) == (-16.68, -49.26)
+
+
+def test_parse_without_flow_data():
+    traffic_condition = TrafficParser.parse(TrafficResponse(incidents={}, flow_segments=[None, None]))
+
+    assert traffic_condition.flow_segments == []
+    assert traffic_condition.incidents == []
+
+
+def test_parse_with_unavailable_upstream(response):
+    response.unavailable = ["tomtom_flow"]
+    traffic_condition = TrafficParser.parse(response)
+
+    assert traffic_condition.degraded
+    assert traffic_condition.traffic_impact == 1.0
+    assert len(traffic_condition.incidents) == 1
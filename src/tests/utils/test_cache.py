@@ -0,0 +1,56 @@
+import pytest
+
+from utils.cache import TTLCache
+
+
+@pytest.fixture
+def cache(clock):
+    return TTLCache(maxsize=3, ttl=10, clock=clock)
+
+
+def test_get_fresh_value(cache) -> None:
+    cache.set("GO", 5.5)
+    assert cache.get("GO") == 5.5
+    assert "GO" in cache
+    assert cache.stats.hits == 1
+
+
+def test_get_missing_value(cache) -> None:
+    assert cache.get("GO") is None
+    assert cache.get("GO", default=0.0) == 0.0
+    assert cache.stats.misses == 2
+
+
+def test_expired_value_is_kept_as_stale(cache, clock) -> None:
+    cache.set("GO", 5.5)
+    clock.now += 11
+    assert cache.get("GO") is None
+    assert "GO" not in cache
+    entry = cache.lookup("GO")
+    assert entry is not None and entry.value == 5.5
+    assert not entry.is_fresh(clock())
+    assert cache.stats.stale_hits == 2
+
+
+def test_per_entry_ttl(cache, clock) -> None:
+    cache.set("short", 1, ttl=1)
+    cache.set("long", 2)
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_lru_eviction(cache) -> None:
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("d", "d")
+    assert cache.lookup("b") is None
+    assert cache.get("a") == "a"
+    assert cache.stats.evictions == 1
+    assert len(cache) == 3
+
+
+def test_invalid_maxsize() -> None:
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0, ttl=1)
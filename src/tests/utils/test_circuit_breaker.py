@@ -0,0 +1,49 @@
+import pytest
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("petrobras", failure_threshold=3, reset_timeout=30, clock=clock)
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.closed
+
+    breaker.record_failure()
+    assert not breaker.closed
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.before_call()
+    assert raised.value.upstream == "petrobras"
+    assert raised.value.retry_after == 30
+
+
+def test_lets_one_probe_through_per_reset_interval(breaker, clock):
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_failure()
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now += 1
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.closed
+    breaker.before_call()
@@ -0,0 +1,38 @@
+import asyncio
+import gzip
+
+from utils.compression import SelectiveGZipMiddleware
+
+BODY = b'{"event": "route"}\n' * 100
+
+
+async def app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def call(path: str) -> tuple[dict, bytes]:
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = SelectiveGZipMiddleware(app, excluded_paths={"/travel/stream"}, minimum_size=500)
+    scope = {"type": "http", "path": path, "headers": [(b"accept-encoding", b"gzip, deflate")]}
+    asyncio.run(middleware(scope, receive, send))
+    return dict(messages[0]["headers"]), b"".join(message.get("body", b"") for message in messages[1:])
+
+
+def test_compresses_responses() -> None:
+    headers, body = call("/travel/")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert gzip.decompress(body) == BODY
+
+
+def test_excluded_paths_are_sent_as_they_are() -> None:
+    headers, body = call("/travel/stream")
+    assert b"content-encoding" not in headers
+    assert body == BODY
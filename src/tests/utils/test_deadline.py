@@ -0,0 +1,143 @@
+import asyncio
+import functools
+
+import pytest
+
+from fetchers.base_fetcher import BaseFetcher
+from utils import circuit_breaker, resilience
+from utils import deadline as deadline_module
+from utils.deadline import DeadlineExceededError, deadline, expired, remaining
+from utils.resilience import start_request_retries
+from utils.single_flight import SingleFlight
+from utils.task_memo import TaskMemo
+
+
+class CountingFetcher(BaseFetcher[str]):
+    UPSTREAM = "counting"
+    BASE_URL = "https://example.com"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.attempts = 0
+
+    async def _attempt(self, method, url, upstream, read, **kwargs) -> str:
+        self.attempts += 1
+        return "ok"
+
+    async def fetch(self, *args, **kwargs) -> str:
+        raise NotImplementedError
+
+
+def test_deadline_cancels_work_in_flight() -> None:
+    cancelled = []
+
+    async def slow_stage():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        async with deadline(0.02):
+            await asyncio.gather(slow_stage(), slow_stage())
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(scenario())
+    assert cancelled == [True, True]
+
+
+def test_nested_deadline_cannot_extend_the_enclosing_one() -> None:
+    async def scenario():
+        assert remaining() is None
+        async with deadline(0.5):
+            outer = remaining()
+            async with deadline(10):
+                inner = remaining()
+            shorter_inside = None
+            async with deadline(0.1):
+                shorter_inside = remaining()
+        return outer, inner, shorter_inside, remaining()
+
+    outer, inner, shorter_inside, after = asyncio.run(scenario())
+    assert 0 < inner <= outer <= 0.5
+    assert shorter_inside <= 0.1
+    assert after is None
+
+
+def test_other_timeouts_are_not_reported_as_the_deadline() -> None:
+    async def scenario():
+        async with deadline(5):
+            await asyncio.wait_for(asyncio.sleep(1), 0.01)
+
+    with pytest.raises(TimeoutError) as raised:
+        asyncio.run(scenario())
+    assert not isinstance(raised.value, DeadlineExceededError)
+
+
+def test_fetcher_skips_upstream_once_the_deadline_has_passed(monkeypatch) -> None:
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    fetcher = CountingFetcher()
+
+    async def scenario():
+        assert await fetcher._request("GET", "https://example.com") == "ok"
+        # A deadline that has just passed, before the enclosing timeout got to cancel anything.
+        deadline_module._deadline.set(asyncio.get_running_loop().time())
+        assert expired()
+        await fetcher._request("GET", "https://example.com")
+
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(scenario())
+    assert fetcher.attempts == 1
+    assert circuit_breaker.circuit_breaker("counting").failures == 0
+
+
+class ScopeRecorder:
+    """A shared lookup that records the deadline and the retry allowance it runs under."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.seen: list[tuple] = []
+
+    async def __call__(self) -> str:
+        self.seen.append((remaining(), resilience._request_retries.get()))
+        await asyncio.sleep(self.delay)
+        return "ok"
+
+
+async def call_within(seconds: float, run) -> str:
+    start_request_retries(1)
+    async with deadline(seconds):
+        return await run()
+
+
+@pytest.mark.parametrize("shared", ["single_flight", "task_memo"])
+def test_shared_call_runs_without_the_deadline_of_its_first_caller(shared) -> None:
+    """A caller with a short deadline gives up on its own; the call it started completes for the other one"""
+    lookup = ScopeRecorder(delay=0.1)
+
+    async def scenario():
+        coalescer = SingleFlight("test") if shared == "single_flight" else TaskMemo()
+        run = functools.partial(coalescer.run, "key", lookup)
+        return await asyncio.gather(call_within(0.02, run), call_within(5, run), return_exceptions=True)
+
+    short, long = asyncio.run(scenario())
+    assert isinstance(short, DeadlineExceededError)
+    assert long == "ok"
+    assert lookup.seen == [(None, None)]
+
+
+def test_waiter_without_deadline_waits_for_the_shared_call() -> None:
+    lookup = ScopeRecorder(delay=0.02)
+
+    async def scenario():
+        flight = SingleFlight("test")
+        return await asyncio.gather(
+            call_within(0.01, functools.partial(flight.run, "key", lookup)),
+            flight.run("key", lookup),
+            return_exceptions=True,
+        )
+
+    short, unbounded = asyncio.run(scenario())
+    assert isinstance(short, DeadlineExceededError)
+    assert unbounded == "ok"
@@ -0,0 +1,15 @@
+import json
+
+import pytest
+
+from utils import fast_json
+
+
+@pytest.mark.parametrize("data", ['{"a": [1, 2.5, "três"]}', '{"a": [1, 2.5, "três"]}'.encode()])
+def test_loads_str_and_bytes(data) -> None:
+    assert fast_json.loads(data) == {"a": [1, 2.5, "três"]}
+
+
+def test_decode_errors_are_json_decode_errors() -> None:
+    with pytest.raises(json.JSONDecodeError):
+        fast_json.loads(b"Connection reset by peer")
@@ -0,0 +1,126 @@
+import pytest
+
+from utils.geometry import (
+    Corridor,
+    cumulative_distances,
+    geojson_positions,
+    haversine_meters,
+    sample_indices_by_distance,
+    simplify_indices,
+    tile_bbox,
+)
+
+
+@pytest.fixture
+def straight_route():
+    """A 101-point route heading north, ~111 m between consecutive points (~11.1 km total)."""
+    latitudes = [-16.7 + i * 0.001 for i in range(101)]
+    longitudes = [-49.25] * 101
+    return latitudes, longitudes
+
+
+def test_haversine_one_degree_latitude() -> None:
+    assert haversine_meters(0.0, 0.0, 1.0, 0.0) == pytest.approx(111_195, rel=1e-3)
+
+
+def test_cumulative_distances_monotonic(straight_route) -> None:
+    distances = cumulative_distances(*straight_route)
+    assert distances[0] == 0.0
+    assert all(b > a for a, b in zip(distances, distances[1:]))
+    assert distances[-1] == pytest.approx(11_119, rel=1e-2)
+
+
+def test_sample_keeps_both_ends(straight_route) -> None:
+    indices = sample_indices_by_distance(*straight_route, spacing_meters=1000, max_samples=50)
+    assert indices[0] == 0
+    assert indices[-1] == 100
+    assert indices == sorted(set(indices))
+
+
+def test_sample_respects_spacing(straight_route) -> None:
+    latitudes, longitudes = straight_route
+    indices = sample_indices_by_distance(latitudes, longitudes, spacing_meters=1000, max_samples=50)
+    distances = cumulative_distances(latitudes, longitudes)
+    gaps = [distances[b] - distances[a] for a, b in zip(indices[:-2], indices[1:-1])]
+    assert all(gap >= 1000 for gap in gaps)
+    assert len(indices) == 13
+
+
+@pytest.mark.parametrize("max_samples", [1, 2, 5, 10])
+def test_sample_capped_by_max_samples(straight_route, max_samples) -> None:
+    indices = sample_indices_by_distance(*straight_route, spacing_meters=10, max_samples=max_samples)
+    assert len(indices) <= max_samples
+
+
+@pytest.mark.parametrize(
+    "latitudes, longitudes, expected",
+    [
+        ([], [], []),
+        ([-16.7], [-49.25], [0]),
+        ([-16.7, -16.7], [-49.25, -49.25], [0]),
+    ],
+)
+def test_sample_degenerate_routes(latitudes, longitudes, expected) -> None:
+    assert sample_indices_by_distance(latitudes, longitudes, spacing_meters=1000, max_samples=10) == expected
+
+
+def test_corridor_contains_points_near_the_path(straight_route) -> None:
+    corridor = Corridor(*straight_route, width_meters=200)
+    assert corridor.contains(-16.65, -49.25)
+    assert corridor.contains(-16.65, -49.2515)  # ~160 m east
+    assert not corridor.contains(-16.65, -49.255)  # ~530 m east
+    assert not corridor.contains(-16.55, -49.25)  # past the end
+
+
+def test_corridor_covers_long_segments() -> None:
+    corridor = Corridor([-16.0, -17.0], [-49.0, -49.0], width_meters=200)
+    assert corridor.contains(-16.5, -49.0)
+
+
+def test_corridor_tiles_follow_a_fixed_grid(straight_route) -> None:
+    tiles = Corridor(*straight_route, width_meters=200).tiles(tile_degrees=0.1)
+    # The corridor reaches a little past both ends, over the tile borders at -16.7 and -16.6.
+    assert tiles == [(-168, -493), (-167, -493), (-166, -493)]
+    assert tile_bbox(tiles[1], 0.1) == (-49.3, -16.7, -49.2, -16.6)
+    # A shorter route over the same area gets a subset of the same tiles.
+    shorter = Corridor(straight_route[0][:30], straight_route[1][:30], width_meters=200).tiles(tile_degrees=0.1)
+    assert shorter == tiles[:2]
+
+
+def test_corridor_on_a_tile_border_takes_both_sides(straight_route) -> None:
+    # Longitude -49.25 is a border of the 0.05 degree grid.
+    columns = {column for _, column in Corridor(*straight_route, width_meters=200).tiles(tile_degrees=0.05)}
+    assert columns == {-986, -985}
+
+
+def test_geojson_positions_are_longitude_first() -> None:
+    assert geojson_positions({"type": "Point", "coordinates": [-49.25, -16.68]}) == [(-49.25, -16.68)]
+    assert geojson_positions({"type": "LineString", "coordinates": [[-49.25, -16.68], [-49.26, -16.69]]}) == [
+        (-49.25, -16.68),
+        (-49.26, -16.69),
+    ]
+    assert geojson_positions({}) == []
+
+
+def test_simplify_straight_route_keeps_the_ends(straight_route) -> None:
+    assert simplify_indices(*straight_route, tolerance_meters=1) == [0, 100]
+
+
+def test_simplify_keeps_corners() -> None:
+    # North for ~1.1 km, then east for ~1.1 km.
+    latitudes = [-16.7 + i * 0.001 for i in range(11)] + [-16.69] * 10
+    longitudes = [-49.25] * 11 + [-49.25 + i * 0.001 for i in range(1, 11)]
+    assert simplify_indices(latitudes, longitudes, tolerance_meters=10) == [0, 10, 20]
+
+
+def test_simplify_drops_only_points_within_tolerance() -> None:
+    # A ~15 m detour in the middle of a straight line.
+    latitudes = [-16.7 + i * 0.001 for i in range(5)]
+    longitudes = [-49.25, -49.25, -49.25 + 15 / 106_700, -49.25, -49.25]
+    assert simplify_indices(latitudes, longitudes, tolerance_meters=20) == [0, 4]
+    # Once the detour is kept, its neighbours are only ~7.5 m off the new segments.
+    assert simplify_indices(latitudes, longitudes, tolerance_meters=10) == [0, 2, 4]
+
+
+def test_simplify_with_zero_tolerance_keeps_everything(straight_route) -> None:
+    assert simplify_indices(*straight_route, tolerance_meters=0) == list(range(101))
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from utils.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    render_cache_stats,
+    server_timing_header,
+    start_server_timing,
+    timed,
+)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = Histogram("latency_seconds", "Latency.", ("upstream",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, upstream="places")
+
+    lines = histogram.render()
+
+    assert 'latency_seconds_bucket{upstream="places",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{upstream="places",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{upstream="places",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{upstream="places"} 4' in lines
+    assert 'latency_seconds_sum{upstream="places"} 4.05' in lines
+
+
+def test_counter_tracks_label_sets_separately() -> None:
+    counter = Counter("requests_total", "Requests.", ("upstream", "status"))
+    counter.inc(upstream="routes", status="200")
+    counter.inc(upstream="routes", status="200")
+    counter.inc(upstream="routes", status="503")
+
+    assert counter.value(upstream="routes", status="200") == 2
+    assert 'requests_total{upstream="routes",status="503"} 1' in counter.render()
+
+
+def test_registry_rejects_duplicated_names() -> None:
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.")
+    with pytest.raises(ValueError):
+        registry.histogram("requests_total", "Requests.")
+
+
+def test_server_timing_header_merges_repeated_entries() -> None:
+    header = server_timing_header(
+        [("stage.route", 0.012), ("upstream.tomtom_flow", 0.01), ("upstream.tomtom_flow", 0.02)]
+    )
+
+    assert header == 'stage.route;dur=12.0, upstream.tomtom_flow;desc="2x";dur=30.0'
+
+
+def test_timed_records_into_tasks_started_after_server_timing() -> None:
+    histogram = Histogram("parse_seconds", "Parse.", ("parser",))
+
+    async def parse() -> None:
+        with timed(histogram, "parse.place", parser="place"):
+            await asyncio.sleep(0)
+
+    async def scenario():
+        timings = start_server_timing()
+        await asyncio.gather(asyncio.create_task(parse()), asyncio.create_task(parse()))
+        return timings
+
+    timings = asyncio.run(scenario())
+
+    assert [name for name, _ in timings] == ["parse.place", "parse.place"]
+    assert histogram.count(parser="place") == 2
+
+
+def test_render_cache_stats() -> None:
+    body = render_cache_stats({"places": {"hits": 3, "misses": 1}, "routes": {"hits": 0, "misses": 2}})
+
+    assert 'tripestimator_cache_hits_total{cache="places"} 3' in body
+    assert 'tripestimator_cache_misses_total{cache="routes"} 2' in body
@@ -0,0 +1,168 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from utils.cache import TTLCache
+from utils.persistent_cache import PersistentCache, PersistentNamespace
+
+from ..conftest import FakeClock
+
+
+@pytest.fixture
+def wall_clock():
+    return FakeClock(1_700_000_000.0)
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+@pytest.fixture
+def store(path, wall_clock):
+    store = PersistentCache(path, max_entries=100, stale_retention=60, clock=wall_clock)
+    yield store
+    store.close()
+
+
+def test_uses_wal_journal(store, path) -> None:
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_entries_survive_reopening(store, path, wall_clock) -> None:
+    store.set("fuel_prices", "'GO'", b"5.5", ttl=10)
+    store.close()
+    reopened = PersistentCache(path, max_entries=100, clock=wall_clock)
+    entry = reopened.get("fuel_prices", "'GO'")
+    assert entry is not None and entry.value == b"5.5"
+    assert entry.expires_at - entry.stored_at == 10
+    reopened.close()
+
+
+def test_namespaces_are_separate(store) -> None:
+    store.set("places", "'GO'", b"1", ttl=10)
+    assert store.get("routes", "'GO'") is None
+
+
+def test_compaction_drops_entries_past_stale_retention(store, wall_clock) -> None:
+    store.set("places", "'old'", b"1", ttl=10)
+    store.set("places", "'stale'", b"2", ttl=50)
+    store.set("places", "'fresh'", b"3", ttl=1000)
+    wall_clock.now += 100
+    assert store.compact() == 1
+    assert store.get("places", "'old'") is None
+    assert store.get("places", "'stale'") is not None
+    assert len(store) == 2
+
+
+def test_compaction_evicts_entries_expiring_first(path, wall_clock) -> None:
+    store = PersistentCache(path, max_entries=2, clock=wall_clock)
+    for key, ttl in (("a", 30), ("b", 10), ("c", 20)):
+        store.set("routes", key, b"{}", ttl=ttl)
+    assert store.compact() == 1
+    assert store.get("routes", "b") is None
+    assert len(store) == 2
+    store.close()
+
+
+def test_invalid_max_entries(path) -> None:
+    with pytest.raises(ValueError):
+        PersistentCache(path, max_entries=0)
+
+
+def test_unreadable_entry_is_dropped(store) -> None:
+    namespace = PersistentNamespace(store, "fuel_prices", float)
+    store.set("fuel_prices", repr("GO"), b"not json", ttl=10)
+    assert namespace.lookup("GO") is None
+    assert store.get("fuel_prices", repr("GO")) is None
+
+
+def test_ttl_cache_reads_entries_written_by_another_process(store, wall_clock) -> None:
+    writer = TTLCache(maxsize=10, ttl=60, persistent=PersistentNamespace(store, "fuel_prices", float))
+    reader_clock = FakeClock(5.0)
+    reader = TTLCache(
+        maxsize=10, ttl=60, clock=reader_clock, persistent=PersistentNamespace(store, "fuel_prices", float)
+    )
+    writer.set(("GO", 1), 5.5)
+    wall_clock.now += 20
+
+    entry = reader.lookup(("GO", 1))
+    assert entry is not None and entry.value == 5.5
+    assert entry.stored_at == -15.0 and entry.expires_at == 45.0
+    assert reader.stats.persistent_hits == 1 and reader.stats.hits == 1
+
+    # Served from memory from now on.
+    assert reader.get(("GO", 1)) == 5.5
+    assert reader.stats.persistent_hits == 1
+
+
+def test_ttl_cache_replaces_stale_entry_with_fresher_persistent_one(store, wall_clock) -> None:
+    clock = FakeClock(0.0)
+    cache = TTLCache(maxsize=10, ttl=60, clock=clock, persistent=PersistentNamespace(store, "fuel_prices", float))
+    cache.set("GO", 5.5)
+    clock.now += 100
+    wall_clock.now += 100
+    store.set("fuel_prices", repr("GO"), b"6.0", ttl=60)
+    assert cache.get("GO") == 6.0
+
+
+def test_ttl_cache_invalidate_removes_persistent_entry(store) -> None:
+    cache = TTLCache(maxsize=10, ttl=60, persistent=PersistentNamespace(store, "fuel_prices", float))
+    cache.set("GO", 5.5)
+    cache.invalidate("GO")
+    assert cache.lookup("GO") is None
+    assert len(store) == 0
+
+
+def record_threads(store, method):
+    threads = []
+    original = getattr(store, method)
+
+    def recorded(*args):
+        threads.append(threading.current_thread().name)
+        return original(*args)
+
+    setattr(store, method, recorded)
+    return threads
+
+
+def test_background_writes_run_on_the_writer_thread(store, path, wall_clock) -> None:
+    threads = record_threads(store, "_put")
+    store.set_in_background("places", "'GO'", b"1", ttl=10)
+    store.delete_in_background("places", "'GO'")
+    store.set_in_background("places", "'GO'", b"2", ttl=10)
+    # Queued writes are read back right away, in the order they were queued.
+    assert store.get("places", "'GO'").value == b"2"
+    store.close()
+
+    assert threads and all(name.startswith("persistent-cache-writer") for name in threads)
+    reopened = PersistentCache(path, max_entries=100, clock=wall_clock)
+    assert reopened.get("places", "'GO'").value == b"2"
+    reopened.close()
+
+
+def test_async_reads_run_off_the_event_loop(store) -> None:
+    store.set("places", "'GO'", b"1", ttl=10)
+    threads = record_threads(store, "_connection")
+
+    async def scenario():
+        return await store.get_async("places", "'GO'"), threading.current_thread().name
+
+    entry, loop_thread = asyncio.run(scenario())
+    assert entry.value == b"1"
+    assert threads and loop_thread not in threads
+
+
+def test_ttl_cache_async_lookup_reads_other_workers_entries(store, wall_clock) -> None:
+    writer = TTLCache(maxsize=10, ttl=60, persistent=PersistentNamespace(store, "fuel_prices", float))
+    reader = TTLCache(maxsize=10, ttl=60, persistent=PersistentNamespace(store, "fuel_prices", float))
+    writer.set_in_background("GO", 5.5)
+
+    async def scenario():
+        return await reader.get_async("GO"), await reader.get_async("SP")
+
+    assert asyncio.run(scenario()) == (5.5, None)
+    assert reader.stats.persistent_hits == 1
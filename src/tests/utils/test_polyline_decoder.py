@@ -0,0 +1,47 @@
+import pytest
+
+from models.utils_models import Coordinates, PolylineDecoder
+
+GOOGLE_DOC_POLYLINE = "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+ROUTE_POLYLINE = "n~`gBzmnlHsDo@cAOeFq@kC]??DYJk@l@{C|@{EPy@L[Ry@h@qCd@iC?AXcBBKBKBI@KP}@r@aE"
+
+
+def reference_decode(polyline: str) -> list[tuple[float, float]]:
+    index, lat, lng = 0, 0, 0
+    points = []
+    while index < len(polyline):
+        index, dlat = PolylineDecoder.decode_single_coordinate(polyline, index)
+        index, dlng = PolylineDecoder.decode_single_coordinate(polyline, index)
+        lat += dlat
+        lng += dlng
+        points.append((lat / 1e5, lng / 1e5))
+    return points
+
+
+def test_decode_google_example() -> None:
+    coordinates = PolylineDecoder(GOOGLE_DOC_POLYLINE).decode_polyline()
+    assert coordinates == [
+        Coordinates(latitude=38.5, longitude=-120.2),
+        Coordinates(latitude=40.7, longitude=-120.95),
+        Coordinates(latitude=43.252, longitude=-126.453),
+    ]
+
+
+@pytest.mark.parametrize("polyline", [GOOGLE_DOC_POLYLINE, ROUTE_POLYLINE])
+def test_decode_arrays_matches_reference(polyline) -> None:
+    latitudes, longitudes = PolylineDecoder(polyline).decode_arrays()
+    assert list(zip(latitudes, longitudes)) == reference_decode(polyline)
+
+
+@pytest.mark.parametrize("polyline", [GOOGLE_DOC_POLYLINE, ROUTE_POLYLINE])
+def test_decode_numpy_matches_reference(polyline) -> None:
+    pytest.importorskip("numpy")
+    points = PolylineDecoder(polyline).decode_numpy()
+    assert points.shape == (len(reference_decode(polyline)), 2)
+    assert [tuple(point) for point in points.tolist()] == reference_decode(polyline)
+
+
+def test_decode_empty_polyline() -> None:
+    decoder = PolylineDecoder("")
+    assert decoder.decode_polyline() == []
+    assert list(decoder.decode_arrays()[0]) == []
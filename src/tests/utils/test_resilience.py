@@ -0,0 +1,157 @@
+import asyncio
+from typing import Any
+
+import aiohttp
+import pytest
+
+from config import settings
+from fetchers.base_fetcher import BaseFetcher
+from utils import circuit_breaker, resilience
+from utils.circuit_breaker import CircuitOpenError
+from utils.resilience import RetryBudget, hedged, is_retryable, start_request_retries, try_spend_retry
+
+
+@pytest.fixture(autouse=True)
+def fresh_budgets(monkeypatch):
+    monkeypatch.setattr(resilience, "_budgets", {})
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(settings, "upstream_retry_backoff_seconds", 0.0)
+
+
+def response_error(status: int) -> aiohttp.ClientResponseError:
+    return aiohttp.ClientResponseError(None, (), status=status)  # type: ignore[arg-type]
+
+
+class Attempts:
+    def __init__(self, outcomes: list[Any], delays: list[float] | None = None) -> None:
+        self.outcomes = outcomes
+        self.delays = delays or [0.0] * len(outcomes)
+        self.calls = 0
+
+    async def __call__(self) -> Any:
+        outcome, delay = self.outcomes[self.calls], self.delays[self.calls]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class FlakyFetcher(BaseFetcher[str]):
+    UPSTREAM = "flaky"
+    BASE_URL = "https://example.com"
+
+    def __init__(self, attempts: Attempts) -> None:
+        super().__init__()
+        self.attempts = attempts
+
+    async def _attempt(self, method, url, upstream, read, **kwargs) -> Any:
+        return await self.attempts()
+
+    async def fetch(self, *args, **kwargs) -> str:
+        raise NotImplementedError
+
+
+def test_retry_budget_refills_by_ratio_up_to_burst() -> None:
+    budget = RetryBudget(ratio=0.5, burst=2)
+    assert budget.try_spend() and budget.try_spend()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+    for _ in range(10):
+        budget.record_request()
+    assert budget.tokens == 2
+
+
+def test_request_allowance_caps_retries_across_upstreams() -> None:
+    async def scenario():
+        start_request_retries(2)
+        return [try_spend_retry(upstream) for upstream in ("a", "b", "a")]
+
+    assert asyncio.run(scenario()) == [True, True, False]
+    # The refused retry did not take a token from the upstream budget.
+    assert resilience.retry_budget("a").tokens == settings.upstream_retry_burst - 1
+
+
+@pytest.mark.parametrize(
+    "error, retryable",
+    [
+        (response_error(503), True),
+        (response_error(429), True),
+        (response_error(400), False),
+        (response_error(404), False),
+        (aiohttp.ServerDisconnectedError(), True),
+        (asyncio.TimeoutError(), True),
+        (ValueError("bad payload"), False),
+    ],
+)
+def test_is_retryable(error, retryable) -> None:
+    assert is_retryable(error) is retryable
+
+
+def test_hedge_wins_over_slow_attempt() -> None:
+    attempts = Attempts(["slow", "fast"], delays=[0.2, 0.0])
+    result = asyncio.run(hedged(attempts, delay=0.01, may_hedge=lambda: True))
+    assert result == "fast"
+    assert attempts.calls == 2
+
+
+def test_no_hedge_when_refused() -> None:
+    attempts = Attempts(["slow", "fast"], delays=[0.03, 0.0])
+    result = asyncio.run(hedged(attempts, delay=0.01, may_hedge=lambda: False))
+    assert result == "slow"
+    assert attempts.calls == 1
+
+
+def test_hedged_falls_back_to_the_attempt_that_succeeds() -> None:
+    attempts = Attempts(["slow", ConnectionError("reset")], delays=[0.03, 0.0])
+    assert asyncio.run(hedged(attempts, delay=0.01, may_hedge=lambda: True)) == "slow"
+
+
+def test_hedged_raises_when_every_attempt_fails() -> None:
+    attempts = Attempts([ConnectionError("first"), ConnectionError("second")], delays=[0.03, 0.0])
+    with pytest.raises(ConnectionError):
+        asyncio.run(hedged(attempts, delay=0.01, may_hedge=lambda: True))
+
+
+def test_fetcher_retries_idempotent_requests() -> None:
+    fetcher = FlakyFetcher(Attempts([response_error(503), aiohttp.ServerDisconnectedError(), "ok"]))
+    assert asyncio.run(fetcher._request("GET", "https://example.com")) == "ok"
+    assert fetcher.attempts.calls == 3
+
+
+def test_fetcher_does_not_retry_post_unless_idempotent() -> None:
+    fetcher = FlakyFetcher(Attempts([response_error(503), "ok"]))
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(fetcher._request("POST", "https://example.com"))
+
+    fetcher = FlakyFetcher(Attempts([response_error(503), "ok"]))
+    assert asyncio.run(fetcher._request("POST", "https://example.com", idempotent=True)) == "ok"
+
+
+def test_fetcher_stops_retrying_once_the_budget_is_spent(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "upstream_retry_burst", 1.0)
+    monkeypatch.setattr(settings, "upstream_retry_budget_ratio", 0.0)
+    fetcher = FlakyFetcher(Attempts([response_error(503)] * 3 + ["ok"]))
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(fetcher._request("GET", "https://example.com"))
+    assert fetcher.attempts.calls == 2
+
+
+def test_fetcher_fails_fast_once_the_circuit_opens(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "upstream_max_retries", 0)
+    monkeypatch.setattr(settings, "circuit_breaker_failure_threshold", 2)
+    fetcher = FlakyFetcher(Attempts([response_error(404), response_error(503), response_error(503), "ok"]))
+
+    async def scenario():
+        for _ in range(3):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await fetcher._request("GET", "https://example.com")
+        await fetcher._request("GET", "https://example.com")
+
+    # The 404 shows the upstream is up; the two 503s in a row open the circuit.
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(scenario())
+    assert fetcher.attempts.calls == 3
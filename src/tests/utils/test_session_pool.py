@@ -0,0 +1,48 @@
+import asyncio
+import logging
+import socket
+from urllib.parse import urlsplit
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetchers.session_pool import SessionPool
+
+
+def closed_port_url() -> str:
+    """A local URL nothing listens on, so connecting to it is refused."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/"
+
+
+def test_warm_up_leaves_a_pooled_connection_and_logs_unreachable_hosts(caplog) -> None:
+    """The connection opened by the warm-up serves the next request; an unreachable host does not fail it"""
+    peers: list[tuple[str, int]] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        peers.append(request.transport.get_extra_info("peername"))
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handler)
+    unreachable = closed_port_url()
+
+    async def scenario():
+        pool = SessionPool()
+        async with TestServer(app) as server:
+            url = str(server.make_url("/"))
+            try:
+                await pool.warm_up([url, unreachable], timeout=1)
+                async with pool.get_session(url).get(url) as response:
+                    assert response.status == 200
+            finally:
+                await pool.close()
+
+    with caplog.at_level(logging.WARNING, logger="fetchers.session_pool"):
+        asyncio.run(scenario())
+
+    assert len(peers) == 2
+    assert peers[0] == peers[1]
+    assert len(caplog.records) == 1
+    assert f"Could not warm up a connection to {urlsplit(unreachable).netloc}" in caplog.records[0].getMessage()
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight, drain_in_flight
+
+
+class Upstream:
+    def __init__(self, delay: float = 0.02, error: Exception | None = None) -> None:
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return f"result-{self.calls}"
+
+
+def test_concurrent_calls_share_one_flight() -> None:
+    upstream = Upstream()
+
+    async def scenario():
+        flight = SingleFlight("test")
+        results = await asyncio.gather(*(flight.run("key", upstream) for _ in range(5)))
+        return results, len(flight)
+
+    results, in_flight = asyncio.run(scenario())
+    assert results == ["result-1"] * 5
+    assert upstream.calls == 1
+    assert in_flight == 0
+
+
+def test_finished_calls_are_not_cached() -> None:
+    upstream = Upstream(delay=0)
+
+    async def scenario():
+        flight = SingleFlight("test")
+        return [await flight.run("key", upstream), await flight.run("key", upstream)]
+
+    assert asyncio.run(scenario()) == ["result-1", "result-2"]
+
+
+def test_errors_reach_every_caller() -> None:
+    upstream = Upstream(error=ValueError("No places found!"))
+
+    async def scenario():
+        flight = SingleFlight("test")
+        return await asyncio.gather(*(flight.run("key", upstream) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert upstream.calls == 1
+
+
+def test_cancelling_one_caller_keeps_the_flight_for_the_others() -> None:
+    upstream = Upstream()
+
+    async def scenario():
+        flight = SingleFlight("test")
+        first = asyncio.create_task(flight.run("key", upstream))
+        second = asyncio.create_task(flight.run("key", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "result-1"
+    assert not upstream.cancelled
+
+
+def test_cancelling_the_last_caller_cancels_the_flight() -> None:
+    upstream = Upstream()
+
+    async def scenario():
+        flight = SingleFlight("test")
+        caller = asyncio.create_task(flight.run("key", upstream))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0)
+        # A new caller starts over instead of joining the cancelled flight.
+        return await flight.run("key", upstream), len(flight)
+
+    assert asyncio.run(scenario()) == ("result-2", 0)
+    assert upstream.cancelled
+
+
+def test_detached_flight_outlives_its_callers() -> None:
+    upstream = Upstream()
+
+    async def scenario():
+        flight = SingleFlight("test")
+        task = flight.start("key", upstream)
+        caller = asyncio.create_task(flight.run("key", upstream))
+        await asyncio.sleep(0)
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        return await task
+
+    assert asyncio.run(scenario()) == "result-1"
+    assert upstream.calls == 1
+    assert not upstream.cancelled
+
+
+def test_drain_waits_for_calls_in_flight() -> None:
+    fast, slow = Upstream(delay=0.01), Upstream(delay=1.0)
+
+    async def scenario():
+        flight = SingleFlight("test")
+        task = flight.start("fast", fast)
+        flight.start("slow", slow)
+        still_running = await drain_in_flight(timeout=0.2)
+        return task.done(), still_running, len(flight)
+
+    assert asyncio.run(scenario()) == (True, 1, 1)
@@ -0,0 +1,48 @@
+import pytest
+
+from utils.spatial_cache import SpatialCache
+
+
+@pytest.fixture
+def cache(clock):
+    return SpatialCache(maxsize=3, ttl=60, cell_meters=25, clock=clock)
+
+
+def test_point_on_the_path_hits(cache) -> None:
+    # ~440 m segment heading north-east.
+    cache.set([-16.680, -16.677], [-49.256, -49.253], "segment")
+    assert cache.get(-16.6785, -49.2545) == "segment"
+    assert cache.stats.hits == 1
+
+
+def test_point_within_tolerance_hits(cache) -> None:
+    cache.set([-16.680], [-49.256], "segment")
+    assert cache.get(-16.68015, -49.256) == "segment"  # ~17 m south
+
+
+def test_point_away_from_the_path_misses(cache) -> None:
+    cache.set([-16.680, -16.677], [-49.256, -49.253], "segment")
+    assert cache.get(-16.6785, -49.2535) is None  # ~110 m off the segment
+    assert cache.stats.misses == 1
+
+
+def test_expired_entry_is_dropped(cache, clock) -> None:
+    cache.set([-16.680], [-49.256], "segment", ttl=10)
+    clock.now += 11
+    assert cache.get(-16.680, -49.256) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted(cache) -> None:
+    for i in range(3):
+        cache.set([-16.68 + i * 0.01], [-49.256], f"segment-{i}")
+    cache.get(-16.68, -49.256)
+    cache.set([-16.60], [-49.256], "segment-3")
+    assert cache.get(-16.67, -49.256) is None
+    assert cache.get(-16.68, -49.256) == "segment-0"
+    assert cache.stats.evictions == 1
+
+
+def test_invalid_maxsize() -> None:
+    with pytest.raises(ValueError):
+        SpatialCache(maxsize=0, ttl=1, cell_meters=25)
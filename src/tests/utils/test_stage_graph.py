@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+
+from utils.stage_graph import Stage, StageGraph, StageTimeoutError
+
+
+def sleeper(value, delay: float = 0.05):
+    async def run(**inputs):
+        await asyncio.sleep(delay)
+        return value if not inputs else (value, inputs)
+
+    return run
+
+
+def test_dependencies_receive_inputs() -> None:
+    graph = StageGraph(
+        [
+            Stage("a", sleeper(1, 0)),
+            Stage("b", sleeper(2, 0), depends_on=("a",)),
+        ]
+    )
+    stage_run = asyncio.run(graph.run())
+    assert stage_run.results == {"a": 1, "b": (2, {"a": 1})}
+    assert {timing.status for timing in stage_run.timings.values()} == {"ok"}
+
+
+def test_independent_stages_run_concurrently() -> None:
+    graph = StageGraph(
+        [
+            Stage("root", sleeper("root", 0)),
+            Stage("slow_a", sleeper("a", 0.1), depends_on=("root",)),
+            Stage("slow_b", sleeper("b", 0.1), depends_on=("root",)),
+            Stage("join", sleeper("join", 0), depends_on=("slow_a", "slow_b")),
+        ]
+    )
+    stage_run = asyncio.run(graph.run())
+    assert stage_run.total < 0.18
+    assert stage_run.timings["join"].start >= 0.1
+
+
+def test_stage_timeout() -> None:
+    graph = StageGraph([Stage("slow", sleeper("slow", 1), timeout=0.01)])
+    with pytest.raises(StageTimeoutError, match="Stage 'slow' timed out"):
+        asyncio.run(graph.run())
+
+
+def test_timeout_error_of_a_stage_is_not_a_stage_timeout() -> None:
+    async def wait_for_deadline():
+        raise TimeoutError("Request deadline exceeded")
+
+    graph = StageGraph([Stage("lookup", wait_for_deadline, timeout=1)])
+    with pytest.raises(TimeoutError) as raised:
+        asyncio.run(graph.run())
+    assert not isinstance(raised.value, StageTimeoutError)
+
+
+@pytest.mark.parametrize("steps", range(6))
+def test_cancellation_is_not_lost_as_a_stage_finishes(steps) -> None:
+    """Whenever the run is cancelled, stages with a timeout that are still running are cancelled with it"""
+    finished = []
+
+    async def slow(quick):
+        await asyncio.sleep(0.5)
+        finished.append("slow")
+
+    graph = StageGraph([Stage("quick", sleeper("quick", 0), timeout=1), Stage("slow", slow, ("quick",), timeout=1)])
+
+    async def scenario():
+        run = asyncio.create_task(graph.run())
+        for _ in range(steps):
+            await asyncio.sleep(0)
+        run.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await run
+
+    asyncio.run(scenario())
+    assert finished == []
+
+
+def test_failure_cancels_running_stages() -> None:
+    cancelled = asyncio.Event()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    graph = StageGraph(
+        [
+            Stage("fail", fail),
+            Stage("slow", slow),
+            Stage("after_fail", sleeper("after", 0), depends_on=("fail",)),
+        ]
+    )
+
+    async def scenario():
+        with pytest.raises(RuntimeError, match="upstream down"):
+            await graph.run()
+        return cancelled.is_set()
+
+    assert asyncio.run(scenario())
+
+
+def test_on_complete_callback_order() -> None:
+    completed = []
+    graph = StageGraph([Stage("a", sleeper(1, 0)), Stage("b", sleeper(2, 0), depends_on=("a",))])
+    asyncio.run(graph.run(on_complete=lambda name, result: completed.append(name)))
+    assert completed == ["a", "b"]
+
+
+def test_on_timing_reports_failed_stages() -> None:
+    async def fail():
+        raise RuntimeError("upstream down")
+
+    timings = []
+    graph = StageGraph([Stage("ok", sleeper(1, 0)), Stage("slow", sleeper(2, 1), timeout=0.01), Stage("fail", fail)])
+    with pytest.raises((RuntimeError, StageTimeoutError)):
+        asyncio.run(graph.run(on_timing=timings.append))
+    statuses = {timing.name: timing.status for timing in timings}
+    assert statuses["fail"] == "error"
+    assert statuses["slow"] in ("timeout", "cancelled")
+
+
+@pytest.mark.parametrize(
+    "stages, message",
+    [
+        ([Stage("a", sleeper(1)), Stage("a", sleeper(2))], "Duplicated stage"),
+        ([Stage("a", sleeper(1), depends_on=("missing",))], "unknown stage"),
+        ([Stage("a", sleeper(1), depends_on=("b",)), Stage("b", sleeper(2), depends_on=("a",))], "cycle"),
+    ],
+)
+def test_invalid_graphs(stages, message) -> None:
+    with pytest.raises(ValueError, match=message):
+        StageGraph(stages)
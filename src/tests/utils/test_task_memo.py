@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from utils.task_memo import TaskMemo
+
+
+def test_same_key_runs_once() -> None:
+    calls = []
+
+    async def lookup(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def scenario():
+        memo = TaskMemo()
+        results = await asyncio.gather(*(memo.run(key, lambda key=key: lookup(key)) for key in ["a", "b", "a", "a"]))
+        await memo.aclose()
+        return results
+
+    assert asyncio.run(scenario()) == ["A", "B", "A", "A"]
+    assert sorted(calls) == ["a", "b"]
+
+
+def test_errors_are_shared() -> None:
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        raise ValueError("No places found!")
+
+    async def scenario():
+        memo = TaskMemo()
+        results = await asyncio.gather(*(memo.run("key", failing) for _ in range(3)), return_exceptions=True)
+        await memo.aclose()
+        return results
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == 1
+
+
+def test_cancelled_caller_does_not_cancel_shared_task() -> None:
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        memo = TaskMemo()
+        first = asyncio.create_task(memo.run("key", slow))
+        second = asyncio.create_task(memo.run("key", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
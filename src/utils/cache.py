@@ -0,0 +1,163 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from utils.persistent_cache import PersistentNamespace
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass
+class CacheEntry(Generic[V]):
+    value: V
+    stored_at: float
+    expires_at: float
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    persistent_hits: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "persistent_hits": self.persistent_hits,
+        }
+
+
+class TTLCache(Generic[K, V]):
+    """In-process LRU cache whose entries expire after a TTL.
+
+    Expired entries are kept until they are evicted by size, so callers can still serve them as stale values
+    (stale-while-revalidate) through `lookup`.
+
+    With a `persistent` namespace, writes also go to the on-disk store shared by the worker processes, and lookups
+    that find nothing fresh in memory fall back to it. Entries read from the store keep their original age and TTL.
+    Code on the event loop uses `lookup_async`, `get_async` and `set_in_background`, which keep the store off the
+    loop.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        persistent: Optional[PersistentNamespace[V]] = None,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.persistent = persistent
+        self.stats = CacheStats()
+        self._entries: OrderedDict[K, CacheEntry[V]] = OrderedDict()
+
+    def lookup(self, key: K) -> Optional[CacheEntry[V]]:
+        """Returns the entry for `key`, fresh or stale, or None if it was never stored or was evicted."""
+        persistent = self.persistent
+        found = persistent.lookup(key) if persistent is not None and self._stale_in_memory(key) else None
+        return self._lookup(key, found)
+
+    async def lookup_async(self, key: K) -> Optional[CacheEntry[V]]:
+        """`lookup` that reads the persistent store in a worker thread."""
+        persistent = self.persistent
+        found = None
+        if persistent is not None and self._stale_in_memory(key):
+            found = await persistent.lookup_async(key)
+        return self._lookup(key, found)
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Returns the value for `key` only while it is fresh."""
+        return self._fresh_value(self.lookup(key), default)
+
+    async def get_async(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """`get` that reads the persistent store in a worker thread."""
+        return self._fresh_value(await self.lookup_async(key), default)
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self._set(key, value, ttl)
+        if self.persistent is not None:
+            self.persistent.set(key, value, ttl)
+
+    def set_in_background(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """`set` that queues the persistent write instead of waiting for it."""
+        ttl = self._set(key, value, ttl)
+        if self.persistent is not None:
+            self.persistent.set_in_background(key, value, ttl)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+        if self.persistent is not None:
+            self.persistent.invalidate(key)
+
+    def clear(self) -> None:
+        """Drops the in-process entries. The persistent store is shared with other processes and is left as is."""
+        self._entries.clear()
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[arg-type]
+        return entry is not None and entry.is_fresh(self.clock())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _stale_in_memory(self, key: K) -> bool:
+        # Another worker may have stored (or refreshed) the entry since this process last saw it.
+        entry = self._entries.get(key)
+        return entry is None or not entry.is_fresh(self.clock())
+
+    def _lookup(self, key: K, found: Optional[tuple[V, float, float]]) -> Optional[CacheEntry[V]]:
+        entry = self._entries.get(key)
+        if found is not None:
+            entry = self._load_persistent(key, found) or entry
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if entry.is_fresh(self.clock()):
+            self.stats.hits += 1
+        else:
+            self.stats.stale_hits += 1
+        return entry
+
+    def _fresh_value(self, entry: Optional[CacheEntry[V]], default: Optional[V]) -> Optional[V]:
+        if entry is None or not entry.is_fresh(self.clock()):
+            return default
+        return entry.value
+
+    def _set(self, key: K, value: V, ttl: Optional[float]) -> float:
+        ttl = self.ttl if ttl is None else ttl
+        now = self.clock()
+        self._store(key, CacheEntry(value=value, stored_at=now, expires_at=now + ttl))
+        return ttl
+
+    def _store(self, key: K, entry: CacheEntry[V]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def _load_persistent(self, key: K, found: tuple[V, float, float]) -> Optional[CacheEntry[V]]:
+        value, age, remaining_ttl = found
+        now = self.clock()
+        entry = CacheEntry(value=value, stored_at=now - age, expires_at=now + remaining_ttl)
+        current = self._entries.get(key)
+        if current is not None and current.expires_at >= entry.expires_at:
+            return None
+        self.stats.persistent_hits += 1
+        self._store(key, entry)
+        return entry
@@ -0,0 +1,77 @@
+import logging
+import time
+from typing import Callable, Optional
+
+from config import settings
+from utils.metrics import CIRCUIT_REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, upstream: str, retry_after: float) -> None:
+        super().__init__(f"Upstream '{upstream}' is unavailable, retry in {retry_after:.0f}s")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fails the calls to one upstream fast while it is down, instead of letting each of them wait for a timeout.
+
+    The breaker opens after `failure_threshold` consecutive failures. While open, calls raise `CircuitOpenError`
+    right away, except for one probe let through every `reset_timeout` seconds; the first success closes it again.
+    Breakers are per process, so each worker finds out on its own that an upstream is down.
+    """
+
+    def __init__(
+        self, name: str, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if failure_threshold <= 0:
+            raise ValueError("failure_threshold must be positive")
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        # When the next probe may go through; None while the breaker is closed.
+        self._probe_at: Optional[float] = None
+
+    @property
+    def closed(self) -> bool:
+        return self._probe_at is None
+
+    def before_call(self) -> None:
+        """Raises `CircuitOpenError` if the call must not reach the upstream."""
+        if self._probe_at is None:
+            return
+        now = self.clock()
+        if now < self._probe_at:
+            CIRCUIT_REJECTIONS.inc(upstream=self.name)
+            raise CircuitOpenError(self.name, self._probe_at - now)
+        self._probe_at = now + self.reset_timeout
+
+    def record_success(self) -> None:
+        if self._probe_at is not None:
+            logger.info(f"Circuit breaker of {self.name} closed: the upstream answered again.")
+        self.failures = 0
+        self._probe_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures < self.failure_threshold:
+            return
+        if self._probe_at is None:
+            logger.warning(f"Circuit breaker of {self.name} opened after {self.failures} consecutive failures.")
+        self._probe_at = self.clock() + self.reset_timeout
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def circuit_breaker(upstream: str) -> CircuitBreaker:
+    breaker = _breakers.get(upstream)
+    if breaker is None:
+        breaker = _breakers[upstream] = CircuitBreaker(
+            upstream, settings.circuit_breaker_failure_threshold, settings.circuit_breaker_reset_seconds
+        )
+    return breaker
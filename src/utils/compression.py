@@ -0,0 +1,22 @@
+from typing import Iterable
+
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """Starlette's GZip middleware, bypassed on `excluded_paths`.
+
+    Streamed bodies are written into the gzip compressor without flushing it, so small chunks such as NDJSON events
+    would be held back until the compressor fills up or the stream ends. Streaming endpoints are excluded instead.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: Iterable[str] = (), **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self.excluded_paths = frozenset(excluded_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
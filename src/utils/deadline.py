@@ -0,0 +1,72 @@
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Optional, TypeVar
+
+T = TypeVar("T")
+
+# Event loop time by which the current request must be done. Tasks created under a deadline inherit it.
+_deadline: ContextVar[Optional[float]] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(TimeoutError):
+    def __init__(self, seconds: Optional[float] = None) -> None:
+        super().__init__(
+            "Request deadline exceeded" if seconds is None else f"Request deadline of {seconds:g}s exceeded"
+        )
+        self.seconds = seconds
+
+
+@asynccontextmanager
+async def deadline(seconds: float) -> AsyncIterator[None]:
+    """Runs the block within `seconds`, or within the enclosing deadline if that one is sooner.
+
+    Work still in flight when the deadline passes, including the tasks started by the block, is cancelled and
+    `DeadlineExceededError` is raised.
+    """
+    at = asyncio.get_running_loop().time() + seconds
+    enclosing = _deadline.get()
+    if enclosing is not None:
+        at = min(at, enclosing)
+    token = _deadline.set(at)
+    timeout = asyncio.timeout_at(at)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError:
+        if timeout.expired():
+            raise DeadlineExceededError(seconds) from None
+        raise
+    finally:
+        _deadline.reset(token)
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Awaits `awaitable` until the current deadline at most, then raises `DeadlineExceededError`."""
+    at = _deadline.get()
+    if at is None:
+        return await awaitable
+    timeout = asyncio.timeout_at(at)
+    try:
+        async with timeout:
+            return await awaitable
+    except TimeoutError:
+        if timeout.expired():
+            raise DeadlineExceededError() from None
+        raise
+
+
+def clear_deadline() -> None:
+    """Removes the deadline from the current context, e.g. a task shared by requests with different deadlines."""
+    _deadline.set(None)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline (negative once it has passed), or None without a deadline."""
+    at = _deadline.get()
+    return None if at is None else at - asyncio.get_running_loop().time()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
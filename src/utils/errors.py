@@ -0,0 +1,17 @@
+"""HTTP status of the errors an itinerary build can end with, shared by the single, batch and streaming endpoints."""
+
+import math
+from typing import Optional
+
+from utils.circuit_breaker import CircuitOpenError
+from utils.deadline import DeadlineExceededError
+
+
+def error_status(error: Exception) -> tuple[int, Optional[int]]:
+    """Returns the status code for `error` and, when retrying later can help, the seconds to wait before it."""
+    if isinstance(error, CircuitOpenError):
+        # An upstream without a fallback (Places, Routes, or Petrobras with no price cached) is down.
+        return 503, math.ceil(error.retry_after)
+    if isinstance(error, DeadlineExceededError):
+        return 504, None
+    return 500, None
@@ -0,0 +1,19 @@
+"""JSON decoding through orjson when it is installed, falling back to the standard library.
+
+orjson decodes `bytes` directly, so upstream bodies are decoded without building an intermediate `str`. Its
+`JSONDecodeError` subclasses `json.JSONDecodeError`, so callers catch the latter with either backend.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
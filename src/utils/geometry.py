@@ -0,0 +1,194 @@
+import math
+from typing import Any, Final, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_METERS: Final[float] = 6_371_008.8
+METERS_PER_DEGREE_LATITUDE: Final[float] = math.pi * EARTH_RADIUS_METERS / 180
+
+Cell = tuple[int, int]
+
+
+def haversine_meters(lat_a: float, lon_a: float, lat_b: float, lon_b: float) -> float:
+    """Great-circle distance in meters between two points given in decimal degrees."""
+    phi_a, phi_b = math.radians(lat_a), math.radians(lat_b)
+    d_phi = phi_b - phi_a
+    d_lambda = math.radians(lon_b - lon_a)
+    h = math.sin(d_phi / 2) ** 2 + math.cos(phi_a) * math.cos(phi_b) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(h))
+
+
+def cumulative_distances(latitudes: Sequence[float], longitudes: Sequence[float]) -> list[float]:
+    """Distance in meters from the first vertex to every vertex of the path."""
+    distances = [0.0] * len(latitudes)
+    for i in range(1, len(latitudes)):
+        distances[i] = distances[i - 1] + haversine_meters(
+            latitudes[i - 1], longitudes[i - 1], latitudes[i], longitudes[i]
+        )
+    return distances
+
+
+def sample_indices_by_distance(
+    latitudes: Sequence[float], longitudes: Sequence[float], spacing_meters: float, max_samples: int
+) -> list[int]:
+    """Picks vertex indices roughly every `spacing_meters` along the path, always keeping both ends.
+
+    When the path is too long for `max_samples` points at the requested spacing, the spacing is widened so the
+    samples stay evenly spread over the whole route instead of being truncated.
+    """
+    points = len(latitudes)
+    if points == 0 or max_samples <= 0:
+        return []
+    if points == 1 or max_samples == 1:
+        return [0]
+
+    distances = cumulative_distances(latitudes, longitudes)
+    total = distances[-1]
+    spacing = max(spacing_meters, total / (max_samples - 1))
+    if total <= 0:
+        return [0]
+
+    indices = [0]
+    next_mark = spacing
+    for i in range(1, points - 1):
+        if distances[i] >= next_mark:
+            indices.append(i)
+            next_mark = distances[i] + spacing
+    if len(indices) >= max_samples:
+        indices = indices[: max_samples - 1]
+    indices.append(points - 1)
+    return indices
+
+
+def simplify_indices(latitudes: Sequence[float], longitudes: Sequence[float], tolerance_meters: float) -> list[int]:
+    """Indices of the vertices kept by Douglas-Peucker simplification, always including both ends.
+
+    Every dropped vertex lies within `tolerance_meters` of the simplified path. Distances are measured on a local
+    equirectangular projection around the middle vertex; over the length of a route its error stays a small
+    fraction of the tolerance.
+
+    All the spans still being split are handled together, one NumPy pass per level of the split tree, instead of a
+    Python loop over every vertex of every span.
+    """
+    points = len(latitudes)
+    if points <= 2 or tolerance_meters <= 0:
+        return list(range(points))
+
+    x_scale = METERS_PER_DEGREE_LATITUDE * math.cos(math.radians(latitudes[points // 2]))
+    xs = np.asarray(longitudes, dtype=np.float64) * x_scale
+    ys = np.asarray(latitudes, dtype=np.float64) * METERS_PER_DEGREE_LATITUDE
+    tolerance_squared = tolerance_meters * tolerance_meters
+    keep = np.zeros(points, dtype=bool)
+    keep[0] = keep[-1] = True
+    # The vertices of the spans still being split, with the ends of their span. Spans never overlap, so the
+    # vertices of a span stay contiguous.
+    inner = np.arange(1, points - 1)
+    first = np.zeros(points - 2, dtype=np.intp)
+    last = np.full(points - 2, points - 1, dtype=np.intp)
+    while inner.size:
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        px, py = xs[inner] - ax, ys[inner] - ay
+        length_squared = dx * dx + dy * dy
+        # Projection onto the segment, clamped to its ends; a span whose ends coincide measures from its start.
+        t = np.clip(np.divide(px * dx + py * dy, length_squared, out=np.zeros_like(px), where=length_squared > 0), 0, 1)
+        qx, qy = px - t * dx, py - t * dy
+        distances = qx * qx + qy * qy
+
+        starts = np.flatnonzero(np.r_[True, first[1:] != first[:-1]])
+        sizes = np.diff(np.r_[starts, inner.size])
+        farthest_distances = np.maximum.reduceat(distances, starts)
+        # The first vertex at the largest distance of each span, as the sequential algorithm picks it.
+        at_max = np.flatnonzero(distances == np.repeat(farthest_distances, sizes))
+        farthest = at_max[np.unique(np.searchsorted(starts, at_max, side="right") - 1, return_index=True)[1]]
+        split = farthest_distances > tolerance_squared
+        pivots = inner[farthest[split]]
+        keep[pivots] = True
+
+        pivot = np.repeat(np.where(split, inner[farthest], -1), sizes)
+        remaining = split.repeat(sizes) & (inner != pivot)
+        inner, first, last, pivot = inner[remaining], first[remaining], last[remaining], pivot[remaining]
+        before = inner < pivot
+        last = np.where(before, pivot, last)
+        first = np.where(before, first, pivot)
+    return np.flatnonzero(keep).tolist()
+
+
+def path_cells(
+    latitudes: Sequence[float], longitudes: Sequence[float], cell_latitude: float, cell_longitude: float
+) -> dict[Cell, None]:
+    """`(row, column)` of the grid cells a path crosses, in path order.
+
+    The path is walked in steps of at most half a cell, so cells are not skipped between distant vertices.
+    """
+    cells: dict[Cell, None] = {}
+    for i in range(len(latitudes)):
+        if i == 0:
+            cells[(math.floor(latitudes[0] / cell_latitude), math.floor(longitudes[0] / cell_longitude))] = None
+            continue
+        lat_a, lon_a, lat_b, lon_b = latitudes[i - 1], longitudes[i - 1], latitudes[i], longitudes[i]
+        steps = math.ceil(max(abs(lat_b - lat_a) / cell_latitude, abs(lon_b - lon_a) / cell_longitude) * 2)
+        for step in range(1, steps + 1):
+            fraction = step / steps
+            latitude = lat_a + (lat_b - lat_a) * fraction
+            longitude = lon_a + (lon_b - lon_a) * fraction
+            cells[(math.floor(latitude / cell_latitude), math.floor(longitude / cell_longitude))] = None
+    return cells
+
+
+class Corridor:
+    """Cells of a latitude/longitude grid along a path, for cheap "is this point near the route" checks.
+
+    Cells are about `width_meters` wide and every cell the path crosses is marked; a point is in the corridor when
+    its cell or one next to it is marked. That covers roughly `width_meters` on each side of the path, a bit more
+    towards the cell corners.
+    """
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float], width_meters: float) -> None:
+        self.cell_latitude = width_meters / METERS_PER_DEGREE_LATITUDE
+        reference = latitudes[len(latitudes) // 2] if len(latitudes) else 0.0
+        self.cell_longitude = self.cell_latitude / max(math.cos(math.radians(reference)), 0.01)
+        # Insertion-ordered, so cells (and the tiles derived from them) follow the path.
+        self.cells = path_cells(latitudes, longitudes, self.cell_latitude, self.cell_longitude)
+
+    def _cell(self, latitude: float, longitude: float) -> Cell:
+        return math.floor(latitude / self.cell_latitude), math.floor(longitude / self.cell_longitude)
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        row, column = self._cell(latitude, longitude)
+        return any((row + i, column + j) in self.cells for i in (-1, 0, 1) for j in (-1, 0, 1))
+
+    def tiles(self, tile_degrees: float) -> list[Cell]:
+        """`(row, column)` of the tiles of a global `tile_degrees` grid that overlap the corridor, in path order.
+
+        The grid does not depend on the path, so routes over the same area get the same tiles.
+        """
+        tiles: dict[Cell, None] = {}
+        for row, column in self.cells:
+            min_row = math.floor((row - 1) * self.cell_latitude / tile_degrees)
+            max_row = math.floor((row + 2) * self.cell_latitude / tile_degrees)
+            min_column = math.floor((column - 1) * self.cell_longitude / tile_degrees)
+            max_column = math.floor((column + 2) * self.cell_longitude / tile_degrees)
+            for tile_row in range(min_row, max_row + 1):
+                for tile_column in range(min_column, max_column + 1):
+                    tiles[(tile_row, tile_column)] = None
+        return list(tiles)
+
+
+def tile_bbox(tile: Cell, tile_degrees: float) -> tuple[float, float, float, float]:
+    """`(min_lon, min_lat, max_lon, max_lat)` of a tile returned by `Corridor.tiles`."""
+    row, column = tile
+    return (
+        round(column * tile_degrees, 6),
+        round(row * tile_degrees, 6),
+        round((column + 1) * tile_degrees, 6),
+        round((row + 1) * tile_degrees, 6),
+    )
+
+
+def geojson_positions(geometry: dict[str, Any]) -> list[tuple[float, float]]:
+    """`(longitude, latitude)` positions of a GeoJSON Point or LineString. GeoJSON puts the longitude first."""
+    coordinates = geometry.get("coordinates") or []
+    if geometry.get("type") == "Point":
+        return [(coordinates[0], coordinates[1])] if coordinates else []
+    return [(position[0], position[1]) for position in coordinates]
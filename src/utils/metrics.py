@@ -0,0 +1,207 @@
+import bisect
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = tuple[str, ...]
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0.0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (the last one is +Inf), sum and count.
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+        counts, totals = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labelnames))
+        return 0 if series is None else int(series[1][1])
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, (total, count)) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _format_labels(self.labelnames, key, extra=f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:g}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count:g}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-local metrics rendered in the Prometheus text exposition format.
+
+    Each worker process keeps its own values; scrape every worker (or run a single one) to get the full picture.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics.values() for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_DURATION = REGISTRY.histogram(
+    "tripestimator_stage_duration_seconds", "Duration of itinerary stages.", ("stage", "status")
+)
+UPSTREAM_DURATION = REGISTRY.histogram(
+    "tripestimator_upstream_request_duration_seconds", "Duration of requests to upstream APIs.", ("upstream",)
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "tripestimator_upstream_requests_total",
+    "Requests sent to upstream APIs, by response status.",
+    ("upstream", "status"),
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "tripestimator_upstream_errors_total", "Upstream requests that failed or did not return a 200.", ("upstream",)
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "tripestimator_upstream_retries_total", "Retries and hedged duplicates sent to upstream APIs.", ("upstream", "kind")
+)
+CIRCUIT_REJECTIONS = REGISTRY.counter(
+    "tripestimator_circuit_breaker_rejections_total",
+    "Upstream calls failed fast by an open circuit breaker.",
+    ("upstream",),
+)
+COALESCED_CALLS = REGISTRY.counter(
+    "tripestimator_coalesced_calls_total", "Lookups that joined an identical call already in flight.", ("lookup",)
+)
+PARSE_DURATION = REGISTRY.histogram(
+    "tripestimator_parse_duration_seconds", "Duration of parsing upstream responses.", ("parser",)
+)
+ROUTE_POINTS = REGISTRY.counter(
+    "tripestimator_route_points_total",
+    "Route vertices decoded and kept after simplification, before traffic sampling.",
+    ("kind",),
+)
+
+_server_timings: ContextVar[Optional[list[tuple[str, float]]]] = ContextVar("server_timings", default=None)
+
+
+def start_server_timing() -> list[tuple[str, float]]:
+    """Starts collecting `(name, seconds)` timings for the current request and returns the list they go into.
+
+    Tasks created afterwards inherit the same list, so timings recorded in concurrent stages are collected too.
+    """
+    timings: list[tuple[str, float]] = []
+    _server_timings.set(timings)
+    return timings
+
+
+def record_server_timing(name: str, seconds: float) -> None:
+    timings = _server_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+def server_timing_header(timings: list[tuple[str, float]]) -> str:
+    """Formats timings as a `Server-Timing` header value.
+
+    Repeated names (e.g. one per TomTom flow request) are merged: their durations are summed and the number of
+    occurrences goes into the description.
+    """
+    durations: dict[str, float] = {}
+    occurrences: dict[str, int] = {}
+    for name, seconds in timings:
+        durations[name] = durations.get(name, 0.0) + seconds
+        occurrences[name] = occurrences.get(name, 0) + 1
+    parts = []
+    for name, seconds in durations.items():
+        description = f';desc="{occurrences[name]}x"' if occurrences[name] > 1 else ""
+        parts.append(f"{name}{description};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+@contextmanager
+def timed(histogram: Histogram, timing_name: str, **labels: str) -> Iterator[None]:
+    """Observes the duration of the block in `histogram` and records it as a Server-Timing entry."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, **labels)
+        record_server_timing(timing_name, elapsed)
+
+
+def render_cache_stats(caches: dict[str, dict[str, int]]) -> str:
+    """Renders `CacheStats.as_dict()` of several caches as counters labelled by cache name."""
+    stat_names = list(dict.fromkeys(stat for stats in caches.values() for stat in stats))
+    lines = []
+    for stat in stat_names:
+        name = f"tripestimator_cache_{stat}_total"
+        lines += [f"# HELP {name} Cache {stat.replace('_', ' ')}.", f"# TYPE {name} counter"]
+        lines += [f'{name}{{cache="{cache}"}} {stats[stat]}' for cache, stats in caches.items() if stat in stats]
+    return "\n".join(lines) + "\n"
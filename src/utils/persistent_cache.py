@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+# Writers wait this long for another worker's write lock before giving up. A contended write is dropped rather than
+# holding up the writes queued behind it.
+BUSY_TIMEOUT_MS = 100
+# Size-based eviction runs on every Nth write, on top of the periodic compaction.
+EVICTION_CHECK_INTERVAL = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+"""
+
+
+@dataclass
+class StoredEntry:
+    value: bytes
+    stored_at: float
+    expires_at: float
+
+
+_NOT_PENDING = object()
+
+
+class PersistentCache:
+    """Key/value store in an SQLite database in WAL mode, shared by every worker process and kept across restarts.
+
+    Entries live in namespaces and carry wall-clock timestamps, so any process can tell how fresh they are. Expired
+    entries are kept for `stale_retention` seconds, to be served as stale values, before compaction drops them. Once
+    the store holds more than `max_entries`, the entries that expire first are evicted.
+
+    Every failure to read or write is logged and treated as a miss: the store only ever saves upstream calls.
+
+    `get`, `set` and `delete` block on SQLite. Code on the event loop uses `get_async`, which reads in a worker thread,
+    and `set_in_background`/`delete_in_background`, which queue the write for a single writer thread. Queued writes
+    are visible to the reads of this process right away.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        stale_retention: float = 0.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.path = path
+        self.max_entries = max_entries
+        self.stale_retention = stale_retention
+        self.clock = clock
+        self._writes = 0
+        # SQLite connections must not be used by two threads at once: every thread gets its own.
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # Writes queued for the writer thread, by (namespace, key); None stands for a deletion.
+        self._pending: dict[tuple[str, str], Optional[StoredEntry]] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistent-cache-writer")
+        self._connection()
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None, check_same_thread=check_same_thread
+        )
+        # Only takes effect on a new database, which is when it has to be set for incremental vacuum to work.
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Closed by `close`, from another thread.
+            conn = self._local.conn = self._connect(check_same_thread=False)
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[StoredEntry]:
+        with self._lock:
+            pending = self._pending.get((namespace, key), _NOT_PENDING)
+        if pending is not _NOT_PENDING:
+            return pending  # type: ignore[return-value]
+        try:
+            row = (
+                self._connection()
+                .execute(
+                    "SELECT value, stored_at, expires_at FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache read of {namespace}/{key} failed: {e}")
+            return None
+        return None if row is None else StoredEntry(*row)
+
+    async def get_async(self, namespace: str, key: str) -> Optional[StoredEntry]:
+        """`get` in a worker thread, off the event loop."""
+        return await asyncio.to_thread(self.get, namespace, key)
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: float) -> None:
+        now = self.clock()
+        self._put(namespace, key, StoredEntry(value, now, now + ttl))
+
+    def delete(self, namespace: str, key: str) -> None:
+        try:
+            self._connection().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache delete of {namespace}/{key} failed: {e}")
+
+    def set_in_background(self, namespace: str, key: str, value: bytes, ttl: float) -> None:
+        """Queues `set` for the writer thread and returns right away."""
+        now = self.clock()
+        self._queue(namespace, key, StoredEntry(value, now, now + ttl))
+
+    def delete_in_background(self, namespace: str, key: str) -> None:
+        """Queues `delete` for the writer thread and returns right away."""
+        self._queue(namespace, key, None)
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def compact(self) -> int:
+        """Drops entries expired for longer than the stale retention, evicts down to `max_entries`, returns the
+        freed pages to the file system and truncates the write-ahead log. Returns the number of entries removed.
+
+        Opens its own connection, so it can run in a worker thread while the event loop keeps using the store.
+        """
+        conn = self._connect()
+        try:
+            expired = conn.execute(
+                "DELETE FROM entries WHERE expires_at < ?", (self.clock() - self.stale_retention,)
+            ).rowcount
+            removed = expired + self._evict(conn)
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return removed
+        finally:
+            conn.close()
+
+    async def run_compaction(self, interval: float) -> None:
+        """Compacts the store every `interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await asyncio.to_thread(self.compact)
+                logger.info(f"Persistent cache compaction removed {removed} entries.")
+            except sqlite3.Error as e:
+                logger.warning(f"Persistent cache compaction failed: {e}")
+
+    def close(self) -> None:
+        """Waits for the queued writes, then closes every connection."""
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def _put(self, namespace: str, key: str, entry: StoredEntry) -> None:
+        conn = self._connection()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, entry.value, entry.stored_at, entry.expires_at),
+            )
+            self._writes += 1
+            if self._writes % EVICTION_CHECK_INTERVAL == 0:
+                self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Persistent cache write of {namespace}/{key} failed: {e}")
+
+    def _queue(self, namespace: str, key: str, entry: Optional[StoredEntry]) -> None:
+        with self._lock:
+            self._pending[(namespace, key)] = entry
+        try:
+            self._writer.submit(self._write_pending, namespace, key, entry)
+        except RuntimeError:
+            # The store is closed, e.g. a refresh finishing during shutdown.
+            logger.warning(f"Persistent cache is closed, dropping the write of {namespace}/{key}.")
+            self._forget_pending(namespace, key, entry)
+
+    def _write_pending(self, namespace: str, key: str, entry: Optional[StoredEntry]) -> None:
+        try:
+            if entry is None:
+                self.delete(namespace, key)
+            else:
+                self._put(namespace, key, entry)
+        finally:
+            self._forget_pending(namespace, key, entry)
+
+    def _forget_pending(self, namespace: str, key: str, entry: Optional[StoredEntry]) -> None:
+        with self._lock:
+            # Unless a later write of the same key was queued in the meantime.
+            if self._pending.get((namespace, key), _NOT_PENDING) is entry:
+                del self._pending[(namespace, key)]
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        excess = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess <= 0:
+            return 0
+        return conn.execute(
+            "DELETE FROM entries WHERE (namespace, key) IN "
+            "(SELECT namespace, key FROM entries ORDER BY expires_at LIMIT ?)",
+            (excess,),
+        ).rowcount
+
+
+class PersistentNamespace(Generic[V]):
+    """Typed view of one namespace of a `PersistentCache`.
+
+    Values are serialized to JSON through pydantic in round-trip mode and validated again when read. Keys are stored
+    as their `repr`, which is stable for the tuples of strings and numbers the services key on.
+    """
+
+    def __init__(self, store: PersistentCache, namespace: str, value_type: Any) -> None:
+        self.store = store
+        self.namespace = namespace
+        self._adapter: TypeAdapter[V] = TypeAdapter(value_type)
+
+    def lookup(self, key: Hashable) -> Optional[tuple[V, float, float]]:
+        """Returns `(value, age, remaining_ttl)` for `key`, or None. The remaining TTL is negative once expired."""
+        return self._decode(key, self.store.get(self.namespace, repr(key)))
+
+    async def lookup_async(self, key: Hashable) -> Optional[tuple[V, float, float]]:
+        """`lookup` that reads the store off the event loop."""
+        return self._decode(key, await self.store.get_async(self.namespace, repr(key)))
+
+    def set(self, key: Hashable, value: V, ttl: float) -> None:
+        self.store.set(self.namespace, repr(key), self._adapter.dump_json(value, round_trip=True), ttl)
+
+    def set_in_background(self, key: Hashable, value: V, ttl: float) -> None:
+        self.store.set_in_background(self.namespace, repr(key), self._adapter.dump_json(value, round_trip=True), ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.store.delete(self.namespace, repr(key))
+
+    def _decode(self, key: Hashable, stored: Optional[StoredEntry]) -> Optional[tuple[V, float, float]]:
+        if stored is None:
+            return None
+        try:
+            value = self._adapter.validate_json(stored.value)
+        except ValueError as e:
+            logger.warning(f"Dropping unreadable persistent cache entry {self.namespace}/{key!r}: {e}")
+            self.store.delete_in_background(self.namespace, repr(key))
+            return None
+        now = self.store.clock()
+        return value, now - stored.stored_at, stored.expires_at - now
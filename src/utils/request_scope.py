@@ -0,0 +1,28 @@
+"""Tasks shared by several requests: coalesced lookups, batch memo entries and background refreshes.
+
+Request-scoped state (the deadline, the retry allowance) lives in contextvars, which a task copies from whoever
+creates it. A shared task must not run under the state of the request that happens to start it, or a request with a
+short deadline would fail the others waiting on the same call. Shared tasks therefore start with that state cleared,
+and each waiter applies its own deadline to its wait.
+"""
+
+import asyncio
+import contextvars
+from typing import Any, Callable, Coroutine, TypeVar
+
+from utils.deadline import clear_deadline, within_deadline
+from utils.resilience import clear_request_retries
+
+T = TypeVar("T")
+
+
+def start_shared_task(factory: Callable[[], Coroutine[Any, Any, T]]) -> "asyncio.Task[T]":
+    context = contextvars.copy_context()
+    context.run(clear_deadline)
+    context.run(clear_request_retries)
+    return asyncio.get_running_loop().create_task(factory(), context=context)
+
+
+async def wait_shared(task: "asyncio.Task[T]") -> T:
+    """Waits for a shared task within the caller's deadline. Giving up on it does not cancel it."""
+    return await within_deadline(asyncio.shield(task))
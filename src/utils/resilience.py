@@ -0,0 +1,110 @@
+"""Retries and hedged requests for upstream calls, bounded so they cannot multiply load during an outage.
+
+Every retry or hedge has to be allowed by two budgets:
+
+- the upstream's `RetryBudget`, a token bucket that every first attempt tops up by `ratio` tokens, so extra requests
+  stay below that fraction of the traffic once the initial burst is spent;
+- the allowance of the incoming API request (`start_request_retries`), shared by all its stages.
+"""
+
+import asyncio
+import random
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+
+from config import settings
+
+T = TypeVar("T")
+
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, burst: float) -> None:
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def record_request(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+_budgets: dict[str, RetryBudget] = {}
+_request_retries: ContextVar[Optional[list[int]]] = ContextVar("request_retries", default=None)
+
+
+def retry_budget(upstream: str) -> RetryBudget:
+    budget = _budgets.get(upstream)
+    if budget is None:
+        budget = _budgets[upstream] = RetryBudget(settings.upstream_retry_budget_ratio, settings.upstream_retry_burst)
+    return budget
+
+
+def start_request_retries(retries: int) -> None:
+    """Caps the retries and hedges of the current request (and the tasks it starts) at `retries`."""
+    _request_retries.set([retries])
+
+
+def clear_request_retries() -> None:
+    """Removes the request allowance from the current context, leaving only the upstream budgets."""
+    _request_retries.set(None)
+
+
+def try_spend_retry(upstream: str) -> bool:
+    """Takes one retry (or hedge) from the current request's allowance and the upstream's budget, if both allow."""
+    remaining = _request_retries.get()
+    if remaining is not None and remaining[0] <= 0:
+        return False
+    if not retry_budget(upstream).try_spend():
+        return False
+    if remaining is not None:
+        remaining[0] -= 1
+    return True
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_STATUSES
+    return isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+
+
+def backoff_delay(retry: int) -> float:
+    """Full-jitter exponential backoff before the `retry`-th retry (1-based)."""
+    ceiling = settings.upstream_retry_backoff_seconds * 2 ** (retry - 1)
+    return random.uniform(0, min(settings.upstream_retry_max_backoff_seconds, ceiling))
+
+
+async def hedged(attempt: Callable[[], Awaitable[T]], delay: float, may_hedge: Callable[[], bool]) -> T:
+    """Runs `attempt` and, if it has not finished after `delay` seconds and `may_hedge()` agrees, a duplicate of it.
+
+    Returns the first successful result and cancels the other attempt. Fails only once every attempt has failed, with
+    the last error.
+    """
+    tasks = [asyncio.ensure_future(attempt())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done or not may_hedge():
+            return await tasks[0]
+        tasks.append(asyncio.ensure_future(attempt()))
+        pending = set(tasks)
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Retrieve every failure before returning, so none is reported as never retrieved.
+            errors += [error for error in (task.exception() for task in done) if error is not None]
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                return succeeded[0].result()
+        raise errors[-1]
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
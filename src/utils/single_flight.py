@@ -0,0 +1,88 @@
+import asyncio
+import weakref
+from typing import Any, Callable, Coroutine, Generic, Hashable, TypeVar
+
+from utils.metrics import COALESCED_CALLS
+from utils.request_scope import start_shared_task, wait_shared
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class _Call(Generic[V]):
+    def __init__(self, task: "asyncio.Task[V]", detached: bool) -> None:
+        self.task = task
+        self.detached = detached
+        self.waiters = 0
+
+
+_instances: "weakref.WeakSet[SingleFlight]" = weakref.WeakSet()
+
+
+class SingleFlight(Generic[K, V]):
+    """Coalesces concurrent calls with the same key into a single in-flight task.
+
+    Every caller waiting on a key gets the result or the exception of the one shared call. The key is forgotten as
+    soon as the call finishes, so nothing is cached: later calls start a new one. A cancelled caller only cancels
+    the shared call when no one else is waiting on it, unless the call was started detached.
+
+    The shared call runs without the deadline of the caller that started it; every caller waits until its own.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[K, _Call[V]] = {}
+        _instances.add(self)
+
+    async def run(self, key: K, factory: Callable[[], Coroutine[Any, Any, V]]) -> V:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._start(key, factory, detached=False)
+        else:
+            COALESCED_CALLS.inc(lookup=self.name)
+        call.waiters += 1
+        try:
+            return await wait_shared(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.detached and not call.task.done():
+                self._forget(key, call)
+                call.task.cancel()
+
+    def start(self, key: K, factory: Callable[[], Coroutine[Any, Any, V]]) -> "asyncio.Task[V]":
+        """Returns the in-flight task for `key`, starting a detached one that runs to completion if there is none."""
+        call = self._calls.get(key)
+        if call is None:
+            return self._start(key, factory, detached=True).task
+        COALESCED_CALLS.inc(lookup=self.name)
+        call.detached = True
+        return call.task
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def _start(self, key: K, factory: Callable[[], Coroutine[Any, Any, V]], detached: bool) -> _Call[V]:
+        call = _Call(start_shared_task(factory), detached)
+        self._calls[key] = call
+        call.task.add_done_callback(lambda task: self._on_done(key, call))
+        return call
+
+    def _on_done(self, key: K, call: _Call[V]) -> None:
+        self._forget(key, call)
+        # Waiters receive the exception through the shield; mark it as retrieved for detached calls nobody awaited.
+        if not call.task.cancelled():
+            call.task.exception()
+
+    def _forget(self, key: K, call: _Call[V]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+
+async def drain_in_flight(timeout: float) -> int:
+    """Waits up to `timeout` seconds for the calls in flight in every `SingleFlight`, e.g. background fuel price
+    refreshes, and returns how many are still running."""
+    tasks = [call.task for flight in list(_instances) for call in flight._calls.values()]
+    if not tasks:
+        return 0
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    return len(pending)
@@ -0,0 +1,80 @@
+import itertools
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Optional, Sequence, TypeVar
+
+from utils.cache import CacheEntry, CacheStats
+from utils.geometry import METERS_PER_DEGREE_LATITUDE, Cell, path_cells
+
+V = TypeVar("V")
+
+
+class SpatialCache(Generic[V]):
+    """In-process cache of values covering a path on the ground, such as TomTom flow segments, looked up by point.
+
+    Paths are indexed on a fixed grid of cells `cell_meters` high (and a bit narrower away from the equator). A
+    point finds a value whose path crosses its own cell or, failing that, one next to it, so roughly within
+    `cell_meters` of the path. Entries expire after a TTL and the least recently used ones are evicted beyond
+    `maxsize`.
+    """
+
+    def __init__(
+        self, maxsize: int, ttl: float, cell_meters: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cell_degrees = cell_meters / METERS_PER_DEGREE_LATITUDE
+        self.clock = clock
+        self.stats = CacheStats()
+        self._entries: OrderedDict[int, tuple[CacheEntry[V], list[Cell]]] = OrderedDict()
+        self._index: dict[Cell, dict[int, None]] = {}
+        self._ids = itertools.count()
+
+    def get(self, latitude: float, longitude: float) -> Optional[V]:
+        """Returns a fresh value whose path passes by the point, or None. Expired entries found on the way are
+        dropped."""
+        row, column = math.floor(latitude / self.cell_degrees), math.floor(longitude / self.cell_degrees)
+        neighbours = [(row + i, column + j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i or j]
+        now = self.clock()
+        for cell in [(row, column), *neighbours]:
+            for entry_id in list(self._index.get(cell, ())):
+                entry, _ = self._entries[entry_id]
+                if not entry.is_fresh(now):
+                    self._remove(entry_id)
+                    continue
+                self._entries.move_to_end(entry_id)
+                self.stats.hits += 1
+                return entry.value
+        self.stats.misses += 1
+        return None
+
+    def set(
+        self, latitudes: Sequence[float], longitudes: Sequence[float], value: V, ttl: Optional[float] = None
+    ) -> None:
+        """Stores `value` for the path through the given points (a single point is fine)."""
+        now = self.clock()
+        cells = list(path_cells(latitudes, longitudes, self.cell_degrees, self.cell_degrees))
+        entry_id = next(self._ids)
+        self._entries[entry_id] = (
+            CacheEntry(value, stored_at=now, expires_at=now + (self.ttl if ttl is None else ttl)),
+            cells,
+        )
+        for cell in cells:
+            self._index.setdefault(cell, {})[entry_id] = None
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int) -> None:
+        _, cells = self._entries.pop(entry_id)
+        for cell in cells:
+            ids = self._index[cell]
+            del ids[entry_id]
+            if not ids:
+                del self._index[cell]
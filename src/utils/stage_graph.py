@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+StageCallback = Callable[[str, Any], Optional[Awaitable[None]]]
+
+
+class StageTimeoutError(TimeoutError):
+    def __init__(self, stage: str, timeout: float) -> None:
+        super().__init__(f"Stage '{stage}' timed out after {timeout:.2f}s")
+        self.stage = stage
+        self.timeout = timeout
+
+
+@dataclass
+class Stage:
+    """A unit of work that runs as soon as the stages it depends on have finished.
+
+    `run` is called with the results of `depends_on` as keyword arguments named after those stages.
+    """
+
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    depends_on: tuple[str, ...] = ()
+    timeout: Optional[float] = None
+
+
+@dataclass
+class StageTiming:
+    name: str
+    start: float
+    duration: float
+    status: str
+
+
+@dataclass
+class StageRun:
+    results: dict[str, Any] = field(default_factory=dict)
+    timings: dict[str, StageTiming] = field(default_factory=dict)
+    total: float = 0.0
+
+    def describe_timings(self) -> str:
+        ordered = sorted(self.timings.values(), key=lambda timing: timing.start)
+        return ", ".join(f"{t.name}={t.duration * 1000:.1f}ms({t.status})" for t in ordered)
+
+
+class StageGraph:
+    """Runs a set of stages concurrently, respecting their dependencies.
+
+    The wall time of a run is the longest dependency chain rather than the sum of all stages. The first failing
+    stage cancels everything still running and its exception is re-raised.
+    """
+
+    def __init__(self, stages: Iterable[Stage]) -> None:
+        self.stages: dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicated stage '{stage.name}'")
+            self.stages[stage.name] = stage
+        self._check_dependencies()
+
+    def _check_dependencies(self) -> None:
+        visiting: set[str] = set()
+        visited: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Stage dependency cycle through '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    async def run(
+        self, on_complete: Optional[StageCallback] = None, on_timing: Optional[Callable[[StageTiming], None]] = None
+    ) -> StageRun:
+        """Runs every stage and returns their results and timings.
+
+        `on_complete` is called with each stage's name and result as soon as it succeeds; `on_timing` with the
+        timing of every stage that started, whatever its outcome.
+        """
+        stage_run = StageRun()
+        origin = time.perf_counter()
+        tasks: dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage) -> Any:
+            inputs = {dependency: await tasks[dependency] for dependency in stage.depends_on}
+            started = time.perf_counter()
+            status = "error"
+            try:
+                if stage.timeout is None:
+                    result = await stage.run(**inputs)
+                else:
+                    # Not wait_for: on Python 3.11 it drops a cancellation that arrives as the stage finishes, and it
+                    # would report a TimeoutError raised by the stage itself (e.g. the request deadline) as its own.
+                    timeout = asyncio.timeout(stage.timeout)
+                    try:
+                        async with timeout:
+                            result = await stage.run(**inputs)
+                    except TimeoutError:
+                        if not timeout.expired():
+                            raise
+                        status = "timeout"
+                        raise StageTimeoutError(stage.name, stage.timeout)
+                status = "ok"
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            finally:
+                timing = StageTiming(stage.name, started - origin, time.perf_counter() - started, status)
+                stage_run.timings[stage.name] = timing
+                if on_timing is not None:
+                    on_timing(timing)
+            stage_run.results[stage.name] = result
+            if on_complete is not None:
+                callback_result = on_complete(stage.name, result)
+                if callback_result is not None:
+                    await callback_result
+            return result
+
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(run_stage(stage))
+        names = {task: name for name, task in tasks.items()}
+
+        try:
+            done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+            failed = [task for task in done if not task.cancelled() and task.exception() is not None]
+            if failed:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                # Dependents re-raise their dependency's error; report the stage where it actually happened.
+                root_causes = [task for task in failed if names[task] in stage_run.timings] or failed
+                raise root_causes[0].exception()  # type: ignore[misc]
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            stage_run.total = time.perf_counter() - origin
+            logger.debug(f"Stage graph finished in {stage_run.total * 1000:.1f}ms: {stage_run.describe_timings()}")
+
+        return stage_run
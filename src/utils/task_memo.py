@@ -0,0 +1,37 @@
+import asyncio
+from typing import Any, Callable, Coroutine, Hashable
+
+from utils.request_scope import start_shared_task, wait_shared
+
+
+class TaskMemo:
+    """Runs each distinct key's coroutine once and shares its result (or error) with every caller.
+
+    Results are kept for the lifetime of the memo, which is meant to be scoped to a single unit of work such as a
+    batch request. Cancelling one caller does not cancel the shared task, which runs without the deadline of the
+    caller that started it; every caller waits until its own.
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = start_shared_task(factory)
+            self._tasks[key] = task
+        return await wait_shared(task)
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    async def aclose(self) -> None:
+        """Cancels whatever is still running and waits for it to finish."""
+        pending = [task for task in self._tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        # Retrieve errors of tasks nobody awaited after a caller was cancelled, so they are not logged as lost.
+        for task in self._tasks.values():
+            if not task.cancelled():
+                task.exception()